@@ -14,6 +14,11 @@ from app.core.database import SessionDep
 
 router = APIRouter(prefix="/auth/oauth2/google")
 
+def store_token_expiry(request: Request, token: Token) -> None:
+    # Lets page loads check the token without a database round trip
+    request.session["access_token_expires_at"] = token.expires_at.replace(tzinfo=timezone.utc).timestamp()
+    request.session["refresh_token_expires_at"] = token.refresh_token_expires_at.replace(tzinfo=timezone.utc).timestamp()
+
 @router.get("/", response_class=RedirectResponse)
 def auth():
     url = oauth_service.get_google_oauth2_url()
@@ -55,7 +60,11 @@ def get_token(code: str, request: Request, session: SessionDep) -> TokenResponse
                     )
         tokens_service.insert_token(token, session)
     
+    else:
+        token = user.token
+    
     request.session["user_id"] = user.id
+    store_token_expiry(request, token)
     
     return RedirectResponse(url="/chat", status_code=302)
     
@@ -69,6 +78,7 @@ def refresh_token(request: Request, session: SessionDep) -> TokenResponse:
     if not token:
         raise HTTPException(status_code=404, detail="Token not found")
     
-    oauth_service.refresh_token(token_id=token.id, session=session)
+    token = oauth_service.refresh_token(token_id=token.id, session=session)
+    store_token_expiry(request, token)
     
     return RedirectResponse(url="/chat", status_code=302)
@@ -1,15 +1,21 @@
+import asyncio
+import json
+import math
+
 from fastapi import APIRouter, HTTPException
 from fastapi.requests import Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.models.chat import ChatMessage
-from langchain_core.messages import HumanMessage
-from app.core.database import SessionDep
+from app.models.chat import ChatMessage, PlanFeedback
+from app.models.job import JobKind
+from app.core.database import SessionDep, get_async_engine
 from app.core.config import get_settings
+import app.core.profiling as profiling
 import app.services.users as users_service
-from app.tools.registry import derive_access
-import app.services.tokens as tokens_service
-from app.graphs.supervisor import get_supervisor_graph
-from langgraph.types import Command
+import app.services.jobs as jobs_service
+import app.services.leases as leases_service
+from app.services.admission import AdmissionRejected
 
 settings = get_settings()
 
@@ -27,28 +33,129 @@ def chat(message: ChatMessage, request: Request, session: SessionDep):
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    token = tokens_service.get_token_by_user_id(user_id, session)
-    scopes = set(token.scope.split(" "))
-    user_domains, user_scopes = derive_access(scopes)
-    
-    agent = get_supervisor_graph(user_scopes, user_domains)
-    config = {"configurable": {"thread_id": user_id,
-                              "session": session}}
-    
-    for chunk in agent.stream({
-        "goal": message.message,
-        "user_id": user_id,
-        },
-     stream_mode="values",
-     config=config,
-    ):
-        print(chunk)
-    
-    state = agent.get_state(config=config)
-    print(f"\n\n\nINTERRUPTED:\n{state}")
-    
-    if state.next:
-        return {"steps": state.tasks[0].interrupts[0].value["steps"]}
-                              
-     
-    
\ No newline at end of file
+    if jobs_service.get_active_job(user_id, session):
+        raise HTTPException(status_code=409, detail="A previous message in this conversation is still being processed")
+    
+    # Shed load before a job row exists; the client retries after the hinted delay
+    try:
+        jobs_service.admission.admit(user_id)
+    
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=429,
+                            detail="Too many requests, please retry later",
+                            headers={"Retry-After": str(math.ceil(e.retry_after))})
+    
+    # The supervisor graph runs on the job worker pool; clients poll or subscribe for progress
+    profile = profiling.is_admin_request(request.headers.get("x-profile-token"))
+    job = jobs_service.enqueue_chat_job(user_id, message.message, session, profile=profile)
+    headers = {"X-Profile-Id": job.id} if profile else None
+    
+    return JSONResponse(jobs_service.job_view(job), status_code=202, headers=headers)
+
+@router.post("/resume")
+def resume(feedback: PlanFeedback, request: Request, session: SessionDep):
+    user_id = request.session.get("user_id")
+    
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    
+    if jobs_service.get_active_job(user_id, session):
+        raise HTTPException(status_code=409, detail="A previous message in this conversation is still being processed")
+    
+    try:
+        jobs_service.admission.admit(user_id)
+    
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=429,
+                            detail="Too many requests, please retry later",
+                            headers={"Retry-After": str(math.ceil(e.retry_after))})
+    
+    # Continues the checkpointed thread in place: approving runs no LLM call, so it is answered here;
+    # a revision runs the planner once, as a job that clients poll or subscribe to like a chat turn
+    try:
+        if feedback.feedback:
+            if not jobs_service.has_pending_plan(user_id, session):
+                raise jobs_service.NoPendingPlan()
+            
+            job = jobs_service.enqueue_chat_job(user_id, feedback.feedback, session, kind=JobKind.REVISION)
+            return JSONResponse(jobs_service.job_view(job), status_code=202)
+        
+        plan = jobs_service.resume_plan(user_id, "", session)
+    
+    # 404, not 409: the client leaves approval mode only when there is no plan, not when the thread is busy
+    except jobs_service.NoPendingPlan:
+        raise HTTPException(status_code=404, detail="No plan is waiting for approval")
+    
+    except leases_service.LeaseTimeoutError:
+        raise HTTPException(status_code=409, detail="A previous message in this conversation is still being processed")
+    
+    if plan:
+        return {"status": "revised", **plan}
+    
+    return {"status": "approved"}
+
+def get_user_job(job_id: str, request: Request, session: SessionDep):
+    user_id = request.session.get("user_id")
+    
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    
+    job = jobs_service.get_job(job_id, user_id, session)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return job
+
+@router.get("/jobs/{job_id}")
+def get_job(job_id: str, request: Request, session: SessionDep):
+    return jobs_service.job_view(get_user_job(job_id, request, session))
+
+@router.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, request: Request):
+    user_id = request.session.get("user_id")
+    
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    
+    async def events():
+        # Own session: the stream outlives the request's dependencies
+        async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+            last_view = None
+            
+            while not await request.is_disconnected():
+                job = await jobs_service.get_job_async(job_id, user_id, session)
+                
+                if not job:
+                    # Not "error": EventSource fires its own "error" on every dropped connection
+                    yield "event: failed\ndata: {\"detail\": \"Job not found\"}\n\n"
+                    return
+                
+                view = jobs_service.job_view(job)
+                
+                if view != last_view:
+                    yield f"event: progress\ndata: {json.dumps(view)}\n\n"
+                    last_view = view
+                
+                if job.status in jobs_service.TERMINAL_STATUSES:
+                    yield f"event: done\ndata: {json.dumps(view)}\n\n"
+                    return
+                
+                await asyncio.sleep(settings.job_poll_seconds)
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@router.post("/jobs/{job_id}/cancel")
+def cancel_job(job_id: str, request: Request, session: SessionDep):
+    job = jobs_service.cancel_job(get_user_job(job_id, request, session), session)
+    
+    return jobs_service.job_view(job)
+
+@router.post("/jobs/{job_id}/retry")
+def retry_job(job_id: str, request: Request, session: SessionDep):
+    job = get_user_job(job_id, request, session)
+    
+    if not jobs_service.retry_job(job, session):
+        raise HTTPException(status_code=409, detail="Only failed or cancelled jobs can be retried")
+    
+    return jobs_service.job_view(jobs_service.get_job(job_id, job.user_id, session))
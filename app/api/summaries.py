@@ -0,0 +1,19 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.requests import Request
+
+from app.core.database import SessionDep
+import app.services.scheduler as scheduler_service
+
+router = APIRouter(prefix="/api/summaries")
+
+@router.get("/")
+def list_summaries(request: Request, session: SessionDep, limit: int = 7):
+    user_id = request.session.get("user_id")
+    
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    
+    summaries = scheduler_service.get_delivered_summaries(user_id, session, min(max(limit, 1), 31))
+    
+    return [{"date": s.summary_date, "scheduled_for": s.scheduled_for, "delivered_at": s.delivered_at, "content": s.content}
+            for s in summaries]
@@ -0,0 +1,103 @@
+from typing import Dict, NamedTuple, Optional
+from pathlib import Path
+import gzip
+import hashlib
+import mimetypes
+
+from fastapi import Request, Response
+from jinja2 import Environment, FileSystemLoader
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+APP_DIR = Path(__file__).resolve().parent.parent
+STATIC_DIR = APP_DIR / "static"
+TEMPLATES_DIR = APP_DIR / "templates"
+STATIC_URL = "/static"
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+PAGE_CACHE_CONTROL = "private, no-cache"
+
+class Asset(NamedTuple):
+    media_type: str
+    etag: str
+    identity: bytes
+    gzip: bytes
+    brotli: Optional[bytes]
+
+def build_asset(content: bytes, media_type: str) -> Asset:
+    # Everything is compressed once up front, so requests only pick an encoding
+    return Asset(media_type=media_type,
+                 etag=f'"{hashlib.sha256(content).hexdigest()[:16]}"',
+                 identity=content,
+                 gzip=gzip.compress(content, compresslevel=9, mtime=0),
+                 brotli=brotli.compress(content, quality=11) if brotli else None)
+
+def fingerprinted_name(path: str, content: bytes) -> str:
+    stem, dot, suffix = path.rpartition(".")
+    return f"{stem}.{hashlib.sha256(content).hexdigest()[:12]}{dot}{suffix}"
+
+def load_static_assets() -> tuple[Dict[str, str], Dict[str, Asset]]:
+    manifest = {}
+    assets = {}
+
+    for file in sorted(STATIC_DIR.rglob("*")):
+        if not file.is_file():
+            continue
+
+        path = file.relative_to(STATIC_DIR).as_posix()
+        content = file.read_bytes()
+        media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        fingerprinted = fingerprinted_name(path, content)
+
+        manifest[path] = f"{STATIC_URL}/{fingerprinted}"
+        assets[fingerprinted] = build_asset(content, media_type)
+
+    return manifest, assets
+
+STATIC_MANIFEST, STATIC_ASSETS = load_static_assets()
+
+def asset_url(path: str) -> str:
+    return STATIC_MANIFEST[path]
+
+templates = Environment(loader=FileSystemLoader(TEMPLATES_DIR), autoescape=True)
+templates.globals["asset"] = asset_url
+
+_pages: Dict[str, Asset] = {}
+
+def get_page(name: str) -> Asset:
+    # Page shells carry no per-request data, so each is rendered exactly once
+    if name not in _pages:
+        html = templates.get_template(name).render().encode("utf-8")
+        _pages[name] = build_asset(html, "text/html; charset=utf-8")
+
+    return _pages[name]
+
+def asset_response(request: Request, asset: Asset, cache_control: str) -> Response:
+    headers = {"Cache-Control": cache_control, "ETag": asset.etag, "Vary": "Accept-Encoding"}
+
+    if request.headers.get("if-none-match") == asset.etag:
+        return Response(status_code=304, headers=headers)
+
+    accept_encoding = request.headers.get("accept-encoding", "")
+
+    if asset.brotli is not None and "br" in accept_encoding:
+        return Response(asset.brotli, media_type=asset.media_type, headers={**headers, "Content-Encoding": "br"})
+
+    if "gzip" in accept_encoding:
+        return Response(asset.gzip, media_type=asset.media_type, headers={**headers, "Content-Encoding": "gzip"})
+
+    return Response(asset.identity, media_type=asset.media_type, headers=headers)
+
+def page_response(request: Request, name: str) -> Response:
+    return asset_response(request, get_page(name), PAGE_CACHE_CONTROL)
+
+def static_response(request: Request, path: str) -> Response:
+    asset = STATIC_ASSETS.get(path)
+
+    if asset is None:
+        return Response(status_code=404)
+
+    return asset_response(request, asset, IMMUTABLE_CACHE_CONTROL)
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -6,6 +8,14 @@ class Settings(BaseSettings):
     redirect_uri: str
     scope: str
     db_url: str
+    async_db_url: str | None = None
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout_seconds: float = 30
+    db_pool_recycle_seconds: int = 1800
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size_kb: int = 64 * 1024
+    sqlite_busy_timeout_ms: int = 5000
     fernet_encryption_key: str
     openai_api_key: str | None = None
     gemini_api_key: str | None = None
@@ -21,11 +31,116 @@ class Settings(BaseSettings):
     google_tasks_tasklist_endpoint: str
     google_tasks_task_endpoint: str
     google_calendar_events_endpoint: str
+    google_calendar_list_endpoint: str = "https://www.googleapis.com/calendar/v3/users/me/calendarList"
+    google_calendar_calendars_endpoint: str = "https://www.googleapis.com/calendar/v3/calendars"
+    
+    background_workers: int = 4
+    background_result_ttl_seconds: int = 3600
+    summary_token_budget: int = 4000
+    summary_keep_tokens: int = 1000
+    context_max_tokens: int = 32000
+    context_keep_turns: int = 2
+    context_tool_result_chars: int = 500
+    checkpoint_db_path: str | None = None
+    thread_lease_ttl_seconds: int = 120
+    thread_lease_timeout_seconds: float = 30
+    thread_lease_poll_seconds: float = 0.05
+    cache_ttl_seconds: int = 300
+    cache_max_entries: int = 1024
+    # Tokens are refreshed by whichever worker sees them expire, and cache invalidation is per process
+    token_cache_ttl_seconds: int = 30
+    
+    # "compact" stores graph state with CompactSerializer, "jsonplus" with LangGraph's default;
+    # compact values of at least checkpoint_compress_min_bytes are zstd compressed if zstandard is installed
+    checkpoint_serializer: str = "compact"
+    checkpoint_compress_min_bytes: int = 4096
+    checkpoint_compress_level: int = 3
+    
+    # Comma separated node names whose LLM calls are cached, e.g. "formalize_plan,summarize_conversation"
+    llm_cache_nodes: str = ""
+    llm_cache_path: str = "llm_cache.sqlite"
+    llm_cache_max_bytes: int = 64 * 1024 * 1024
+    
+    # USD per million tokens, used for the llm_cost_usd_total metric
+    llm_input_cost_per_million: float = 0.30
+    llm_output_cost_per_million: float = 2.50
+    llm_cached_input_cost_per_million: float = 0.075
+    
+    # "implicit" relies on Gemini's automatic prefix caching, "gemini" also creates
+    # explicit context caches for long static prefixes, "local" is an offline stand-in
+    prompt_cache_mode: str = "implicit"
+    prompt_cache_min_tokens: int = 1024
+    prompt_cache_ttl_seconds: int = 3600
+    
+    # Daily summaries are generated within the lead window before each user's send time
+    daily_summary_enabled: bool = False
+    daily_summary_workers: int = 4
+    daily_summary_tick_seconds: float = 30
+    daily_summary_lead_minutes: int = 60
+    daily_summary_bucket_minutes: int = 5
+    daily_summary_max_lateness_minutes: int = 60
+    daily_summary_default_time: str = "08:00"
+    daily_summary_retry_seconds: int = 60
+    
+    # Running jobs heartbeat every job_stale_seconds / 3; startup requeues jobs whose heartbeat lapsed
+    job_workers: int = 4
+    job_max_attempts: int = 2
+    job_stale_seconds: int = 60
+    job_poll_seconds: float = 0.5
+    
+    # Admission control for /api/chat; admission_max_running 0 means one run slot per job worker
+    admission_max_running: int = 0
+    admission_max_queued: int = 100
+    admission_user_max_queued: int = 2
+    admission_user_rate_per_minute: float = 20
+    admission_user_burst: float = 5
+    admission_initial_run_seconds: float = 10
+    # Comma separated user_id:weight pairs for fair queuing, e.g. "12:2,40:0.5"
+    admission_user_weights: str = ""
+    # Client-side limit on Gemini requests per minute across the process; 0 disables it
+    llm_requests_per_minute: int = 0
+    
+    google_fanout_workers: int = 8
+    calendar_events_cache_ttl_seconds: int = 60
+    
+    # Search indexes are rebuilt from full listings once they are this old, dropping what was deleted elsewhere;
+    # the event index covers this many days around now, so recurring events expand over a bounded range
+    search_index_dir: str = "search_index"
+    search_index_rebuild_seconds: int = 6 * 3600
+    search_index_event_past_days: int = 90
+    search_index_event_future_days: int = 365
+    
+    # Bind only the best matching tools per LLM call; 0 disables selection. The min score is in units of
+    # one mention of a term unique to a single tool; weaker matches bind every tool
+    tool_selection_top_k: int = 6
+    tool_selection_min_score: float = 1.0
+    tool_selection_history_messages: int = 4
+    
+    # Long-term memory: archived conversation segments and facts retrieved by similarity
+    memory_dir: str = "memory"
+    memory_embedding_function: str = "app.services.memory.hashing_embedding"
+    memory_embedding_dim: int = 512
+    memory_top_k: int = 4
+    memory_min_score: float = 0.2
+    memory_duplicate_score: float = 0.95
+    
+    # Chat turns are profiled when sent with X-Profile-Token set to the admin token, or sampled at this rate
+    profiling_admin_token: str | None = None
+    profiling_sample_rate: float = 0.0
+    profiling_interval_ms: float = 5
+    profiling_dir: str = "profiles"
+    profiling_top_n: int = 15
+    
+    # Structured event log; per-turn debug events (graph chunks, raw LLM output) only at DEBUG
+    log_level: str = "INFO"
+    event_log_max_field_chars: int = 2000
+    event_log_queue_size: int = 10000
     
     
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
 
+@lru_cache
 def get_settings() -> Settings:
     return Settings()
\ No newline at end of file
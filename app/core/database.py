@@ -1,18 +1,164 @@
 from sqlmodel import create_engine, Session, SQLModel
-from typing import Annotated
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import Engine, delete, event, func, inspect, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from typing import Annotated, AsyncIterator, Optional
 from fastapi import Depends
+import time
 
 from app.core.config import get_settings
+from app.core.metrics import db_query_latency, db_query_errors
 
 settings = get_settings()
-connect_args = {"check_same_thread": False}
-engine = create_engine(settings.db_url, connect_args=connect_args)
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+def is_sqlite(db_url: str) -> bool:
+    return db_url.startswith("sqlite")
+
+def engine_options(db_url: str) -> dict:
+    options = {"pool_pre_ping": True}
+
+    if is_sqlite(db_url):
+        options["connect_args"] = {"check_same_thread": False}
+
+        # In-memory databases live on a single connection and cannot be pooled
+        if ":memory:" in db_url:
+            return options
+
+    options.update(pool_size=settings.db_pool_size,
+                   max_overflow=settings.db_max_overflow,
+                   pool_timeout=settings.db_pool_timeout_seconds,
+                   pool_recycle=settings.db_pool_recycle_seconds)
+    return options
+
+def async_db_url(db_url: str) -> str:
+    scheme, _, rest = db_url.partition("://")
+
+    if "+" in scheme:
+        return db_url
+
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}://{rest}"
+
+def statement_label(statement: str) -> str:
+    return statement.lstrip().split(" ", 1)[0].upper()
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA mmap_size={settings.sqlite_mmap_size}")
+    cursor.execute(f"PRAGMA cache_size=-{settings.sqlite_cache_size_kb}")
+    cursor.execute(f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+def record_query_time(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    db_query_latency.observe(elapsed, statement=statement_label(statement))
+
+def record_query_error(exception_context):
+    start_times = exception_context.connection.info.get("query_start_time") if exception_context.connection else None
+
+    if start_times:
+        start_times.pop()
+
+    db_query_errors.inc(statement=statement_label(exception_context.statement or ""))
+
+def configure_engine(sync_engine: Engine, db_url: str) -> None:
+    if is_sqlite(db_url):
+        event.listen(sync_engine, "connect", apply_sqlite_pragmas)
+
+    event.listen(sync_engine, "before_cursor_execute", start_query_timer)
+    event.listen(sync_engine, "after_cursor_execute", record_query_time)
+    event.listen(sync_engine, "handle_error", record_query_error)
+
+engine = create_engine(settings.db_url, **engine_options(settings.db_url))
+configure_engine(engine, settings.db_url)
+
+_async_engine: Optional[AsyncEngine] = None
+
+def get_async_engine() -> AsyncEngine:
+    # Built on first use so the async driver is only needed by deployments that use it
+    global _async_engine
+
+    if _async_engine is None:
+        db_url = settings.async_db_url or async_db_url(settings.db_url)
+        options = engine_options(db_url)
+        options.get("connect_args", {}).pop("check_same_thread", None)
+        _async_engine = create_async_engine(db_url, **options)
+        configure_engine(_async_engine.sync_engine, db_url)
+
+    return _async_engine
 
 def get_session():
     with Session(engine) as session:
         yield session
 
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+        yield session
+
+def deduplicate_user_preferences() -> None:
+    """Migration for the unique index on UserPreferences.user_id.
+
+    Databases created before the index can hold several preference rows per
+    user, which would make CREATE UNIQUE INDEX fail at startup. Until the
+    index exists, keep the row reads returned (the lowest id) and drop the
+    rest.
+    """
+    from app.models.user import UserPreferences
+
+    table = UserPreferences.__table__
+    existing = {index["name"] for index in inspect(engine).get_indexes(table.name)}
+
+    if all(index.name in existing for index in table.indexes if index.unique):
+        return
+
+    # Materialized first: MySQL cannot delete from a table its own subquery reads
+    with engine.begin() as connection:
+        keep = connection.execute(select(func.min(table.c.id)).group_by(table.c.user_id)).scalars().all()
+        connection.execute(delete(table).where(table.c.id.not_in(keep)))
+
+def add_job_kind_column() -> None:
+    """Migration for Job.kind.
+
+    create_all does not add columns to a table that already exists. Jobs
+    from before the column were all chat turns, so existing rows get CHAT.
+    """
+    from app.models.job import Job, JobKind
+
+    table = Job.__table__
+    inspector = inspect(engine)
+
+    # A missing table is created by create_all, column included
+    if not inspector.has_table(table.name) or "kind" in {column["name"] for column in inspector.get_columns(table.name)}:
+        return
+
+    kind = table.c.kind.type
+
+    with engine.begin() as connection:
+        # A named enum type on PostgreSQL; nothing to create elsewhere
+        kind.create(connection, checkfirst=True)
+        connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN kind {kind.compile(dialect=engine.dialect)} "
+                                f"NOT NULL DEFAULT '{JobKind.CHAT.name}'"))
+
 def create_db_and_tables():
+    add_job_kind_column()
     SQLModel.metadata.create_all(engine)
+    deduplicate_user_preferences()
+
+    # create_all skips indexes on tables that already exist
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
 
-SessionDep = Annotated[Session, Depends(get_session)]
\ No newline at end of file
+SessionDep = Annotated[Session, Depends(get_session)]
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_session)]
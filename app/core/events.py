@@ -0,0 +1,168 @@
+from typing import Any, Dict, Optional
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+import atexit
+import json
+import logging
+import queue
+import sys
+import threading
+
+from app.core.config import get_settings
+from app.core.metrics import Counter
+
+settings = get_settings()
+
+events_dropped = Counter("event_log_dropped_total", "Events dropped because the event log queue was full.")
+
+MAX_ITEMS = 20
+
+def bounded(value: Any, max_chars: int) -> Any:
+    """A JSON-ready copy of `value` cut down to `max_chars` per string and MAX_ITEMS per container."""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+
+    if isinstance(value, str):
+        return value if len(value) <= max_chars else value[:max_chars] + f"...[{len(value) - max_chars} more]"
+
+    if isinstance(value, dict):
+        items = list(value.items())
+        result = {str(k): bounded(v, max_chars) for k, v in items[:MAX_ITEMS]}
+
+        if len(items) > MAX_ITEMS:
+            result["..."] = f"{len(items) - MAX_ITEMS} more"
+
+        return result
+
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = list(value)
+        result = [bounded(v, max_chars) for v in items[:MAX_ITEMS]]
+
+        if len(items) > MAX_ITEMS:
+            result.append(f"...[{len(items) - MAX_ITEMS} more]")
+
+        return result
+
+    if isinstance(value, BaseException):
+        return bounded(f"{type(value).__name__}: {value}", max_chars)
+
+    if hasattr(value, "model_dump"):
+        return bounded(value.model_dump(mode="json"), max_chars)
+
+    return bounded(str(value), max_chars)
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per event; runs on the listener thread, so callers never pay for it."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = getattr(record, "fields", {})
+
+        # Callables are lazy fields, evaluated only once the event is known to be written
+        fields = {key: value() if callable(value) and not isinstance(value, type) else value for key, value in fields.items()}
+
+        event = {"ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+                 "level": record.levelname.lower(),
+                 "logger": record.name,
+                 "event": record.getMessage(),
+                 "thread": record.threadName,
+                 **bounded(fields, settings.event_log_max_field_chars)}
+
+        if record.exc_info:
+            event["traceback"] = bounded(self.formatException(record.exc_info), settings.event_log_max_field_chars * 4)
+
+        return json.dumps(event, default=str)
+
+class DeferredQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The stock handler formats here, on the caller's thread; leave that to the listener
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+
+        except queue.Full:
+            events_dropped.inc()
+
+class EventLogger:
+    """Structured, level-gated events: `log.info("job.finished", job_id=..., status=...)`.
+
+    Disabled levels return before touching the fields. Enabled events are
+    queued as is and serialized by a background listener, with every field
+    capped at `event_log_max_field_chars`. Pass a callable for a field that
+    is costly to compute.
+    """
+
+    def __init__(self, name: str):
+        self._logger = logging.getLogger(name)
+
+    def is_enabled(self, level: int) -> bool:
+        return self._logger.isEnabledFor(level)
+
+    def log(self, level: int, event: str, exc_info: bool = False, **fields) -> None:
+        if self._logger.isEnabledFor(level):
+            self._logger.log(level, event, exc_info=exc_info, extra={"fields": fields})
+
+    def debug(self, event: str, **fields) -> None:
+        self.log(logging.DEBUG, event, **fields)
+
+    def info(self, event: str, **fields) -> None:
+        self.log(logging.INFO, event, **fields)
+
+    def warning(self, event: str, **fields) -> None:
+        self.log(logging.WARNING, event, **fields)
+
+    def error(self, event: str, **fields) -> None:
+        self.log(logging.ERROR, event, **fields)
+
+    def exception(self, event: str, **fields) -> None:
+        self.log(logging.ERROR, event, exc_info=True, **fields)
+
+ROOT_LOGGER = "app"
+
+_listener: Optional[QueueListener] = None
+_handler: Optional[QueueHandler] = None
+_listener_lock = threading.Lock()
+
+def start_event_log() -> None:
+    global _listener, _handler
+
+    with _listener_lock:
+        if _listener is not None:
+            return
+
+        output = logging.StreamHandler(sys.stdout)
+        output.setFormatter(JsonFormatter())
+
+        records: queue.Queue = queue.Queue(maxsize=settings.event_log_queue_size)
+        root = logging.getLogger(ROOT_LOGGER)
+        root.setLevel(settings.log_level.upper())
+        _handler = DeferredQueueHandler(records)
+        root.addHandler(_handler)
+        root.propagate = False
+
+        _listener = QueueListener(records, output)
+        _listener.start()
+        atexit.register(stop_event_log)
+
+def stop_event_log() -> None:
+    """Flush queued events and stop the listener thread."""
+    global _listener, _handler
+
+    with _listener_lock:
+        if _listener is None:
+            return
+
+        logging.getLogger(ROOT_LOGGER).removeHandler(_handler)
+        _listener.stop()
+        _listener, _handler = None, None
+
+_loggers: Dict[str, EventLogger] = {}
+
+def get_event_logger(name: str) -> EventLogger:
+    start_event_log()
+
+    if name not in _loggers:
+        _loggers[name] = EventLogger(name)
+
+    return _loggers[name]
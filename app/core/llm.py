@@ -0,0 +1,64 @@
+from typing import TYPE_CHECKING, Optional
+from functools import lru_cache
+import threading
+
+from app.core.config import get_settings
+from app.core.llm_cache import get_llm_cache, get_shared_llm_cache
+
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
+    from langchain_core.rate_limiters import BaseRateLimiter
+    from langchain_tavily import TavilySearch
+
+settings = get_settings()
+
+_override: Optional["BaseChatModel"] = None
+_lock = threading.Lock()
+
+def override_chat_model(model: Optional["BaseChatModel"]) -> None:
+    """Route every get_chat_model() call to `model` (e.g. a scripted fake); None restores Gemini."""
+    global _override
+    _override = model
+
+@lru_cache
+def _build_chat_model(cached: bool) -> "BaseChatModel":
+    # Imported here so starting the app does not pay for the Gemini client
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    # The response cache is shared, so all nodes with caching enabled share one client
+    return ChatGoogleGenerativeAI(model=settings.gemini_model_name,
+                                  google_api_key=settings.gemini_api_key,
+                                  temperature=0,
+                                  cache=get_shared_llm_cache() if cached else None,
+                                  rate_limiter=get_rate_limiter())
+
+@lru_cache
+def get_rate_limiter() -> Optional["BaseRateLimiter"]:
+    """One limiter for every Gemini client, so the whole process stays within the provider's request quota."""
+    if not settings.llm_requests_per_minute:
+        return None
+
+    from langchain_core.rate_limiters import InMemoryRateLimiter
+
+    return InMemoryRateLimiter(requests_per_second=settings.llm_requests_per_minute / 60,
+                               check_every_n_seconds=0.05,
+                               max_bucket_size=max(1, settings.llm_requests_per_minute // 60))
+
+def get_chat_model(cache_node: Optional[str] = None) -> "BaseChatModel":
+    """Shared, lazily built chat model; `cache_node` opts into the LLM response cache if that node is enabled."""
+    if _override is not None:
+        return _override
+
+    cached = cache_node is not None and get_llm_cache(cache_node) is not None
+
+    with _lock:
+        return _build_chat_model(cached)
+
+@lru_cache
+def get_search_tool() -> "TavilySearch":
+    from langchain_tavily import TavilySearch
+
+    return TavilySearch(max_results=3,
+                        include_raw_content=True,
+                        include_favicon=False,
+                        tavily_api_key=settings.tavily_api_key)
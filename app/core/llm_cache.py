@@ -0,0 +1,149 @@
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.load import dumps, loads
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# Per-run message fields; they differ between two requests with the same content
+VOLATILE_MESSAGE_FIELDS = ("id", "response_metadata", "usage_metadata")
+
+class SQLiteLLMCache(BaseCache):
+    """LLM response cache for deterministic (temperature=0) calls.
+
+    LangChain passes the serialized messages as `prompt` and the model name,
+    parameters and bound tools/schema as `llm_string`, so the hash of both
+    identifies a request. Message ids and run metadata are dropped from the
+    prompt before hashing, so the same conversation hits however it was
+    produced. Least recently used entries are evicted once the
+    stored responses exceed `max_bytes`.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS llm_cache (
+                                key TEXT PRIMARY KEY,
+                                value TEXT NOT NULL,
+                                size INTEGER NOT NULL,
+                                last_used REAL NOT NULL)""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_last_used ON llm_cache (last_used)")
+        self._conn.commit()
+
+    @staticmethod
+    def _strip_volatile(value: Any) -> Any:
+        if isinstance(value, list):
+            return [SQLiteLLMCache._strip_volatile(item) for item in value]
+
+        if not isinstance(value, dict):
+            return value
+
+        # Serialized messages look like {"lc": 1, "type": "constructor", "id": [class path], "kwargs": {...}}
+        if value.get("type") == "constructor" and isinstance(value.get("kwargs"), dict):
+            kwargs = {k: v for k, v in value["kwargs"].items() if k not in VOLATILE_MESSAGE_FIELDS}
+            return {**value, "kwargs": SQLiteLLMCache._strip_volatile(kwargs)}
+
+        return {k: SQLiteLLMCache._strip_volatile(v) for k, v in value.items()}
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        try:
+            prompt = json.dumps(SQLiteLLMCache._strip_volatile(json.loads(prompt)), sort_keys=True)
+
+        except ValueError:
+            pass
+
+        return hashlib.sha256(f"{llm_string}\0{prompt}".encode()).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = self._key(prompt, llm_string)
+
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM llm_cache WHERE key = ?", (key,)).fetchone()
+
+            if not row:
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+
+        return loads(row[0])
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        key = self._key(prompt, llm_string)
+        value = dumps(list(return_val))
+
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO llm_cache (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                               (key, value, len(value), time.time()))
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        total_size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+
+        if total_size <= self.max_bytes:
+            return
+
+        rows = self._conn.execute("SELECT key, size FROM llm_cache ORDER BY last_used").fetchall()
+        evicted_keys = []
+
+        for key, size in rows:
+            if total_size <= self.max_bytes:
+                break
+
+            evicted_keys.append((key,))
+            total_size -= size
+
+        self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", evicted_keys)
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0}
+
+_llm_cache: Optional[SQLiteLLMCache] = None
+_llm_cache_lock = threading.Lock()
+
+def get_shared_llm_cache() -> SQLiteLLMCache:
+    global _llm_cache
+
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            _llm_cache = SQLiteLLMCache(settings.llm_cache_path, settings.llm_cache_max_bytes)
+
+    return _llm_cache
+
+def get_llm_cache(node: str) -> Optional[SQLiteLLMCache]:
+    """Return the shared cache if `node` is listed in `llm_cache_nodes`, else None."""
+    enabled_nodes = {n.strip() for n in settings.llm_cache_nodes.split(",") if n.strip()}
+
+    if node not in enabled_nodes:
+        return None
+
+    return get_shared_llm_cache()
+
+def get_llm_cache_stats() -> Dict[str, float]:
+    if _llm_cache is None:
+        return {"hits": 0, "misses": 0, "hit_rate": 0.0}
+
+    return _llm_cache.stats()
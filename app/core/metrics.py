@@ -0,0 +1,190 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from contextlib import contextmanager
+import threading
+import time
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labelnames: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(labelnames, values)]
+
+    if extra:
+        pairs.append(extra)
+
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Metric:
+    type_name = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+        REGISTRY.append(self)
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.type_name}"]
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = super().render()
+
+        with self._lock:
+            for key, value in self._values.items():
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+
+        return lines
+
+class Gauge(Counter):
+    type_name = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+class Histogram(Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+
+        with self._lock:
+            # Per-bucket counts followed by the +Inf count and the sum
+            values = self._values.setdefault(key, [0] * (len(self.buckets) + 2))
+
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    values[i] += 1
+
+            values[-2] += 1
+            values[-1] += value
+
+    @contextmanager
+    def time(self, errors: Optional[Counter] = None, **labels):
+        start = time.perf_counter()
+
+        try:
+            yield
+
+        except Exception:
+            if errors:
+                errors.inc(**labels)
+            raise
+
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+
+        with self._lock:
+            for key, values in self._values.items():
+                for bound, count in zip(self.buckets, values):
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, f'le="{bound}"')} {count}")
+
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, 'le="+Inf"')} {values[-2]}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {values[-2]}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {values[-1]}")
+
+        return lines
+
+REGISTRY: List[Metric] = []
+
+node_latency = Histogram("graph_node_duration_seconds", "LangGraph node latency.", ["node"])
+node_errors = Counter("graph_node_errors_total", "LangGraph node failures.", ["node"])
+
+llm_latency = Histogram("llm_request_duration_seconds", "LLM call latency.", ["node", "model"])
+llm_errors = Counter("llm_request_errors_total", "LLM call failures.", ["node", "model"])
+llm_prompt_tokens = Counter("llm_prompt_tokens_total", "Prompt tokens sent to the LLM.", ["node", "model"])
+llm_completion_tokens = Counter("llm_completion_tokens_total", "Completion tokens returned by the LLM.", ["node", "model"])
+llm_cached_prompt_tokens = Counter("llm_cached_prompt_tokens_total", "Prompt tokens served from the provider's context cache.", ["node", "model"])
+llm_cost = Counter("llm_cost_usd_total", "Estimated LLM spend in USD.", ["node", "model"])
+
+context_tokens_saved = Histogram("context_tokens_saved", "Prompt tokens trimmed from an LLM call by the context-window manager.", ["node"],
+                                 buckets=(0, 100, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000))
+
+tool_selection_tokens_saved = Histogram("tool_selection_tokens_saved", "Tool schema tokens left out of an LLM call by the tool selector.", ["node"],
+                                        buckets=(0, 100, 250, 500, 1000, 2500, 5000, 10000))
+tool_selection_fallbacks = Counter("tool_selection_fallbacks_total", "LLM calls that bound every tool because no tool scored high enough or the model requested more tools.", ["node"])
+
+tool_latency = Histogram("tool_call_duration_seconds", "Tool call latency.", ["node", "tool"])
+tool_errors = Counter("tool_call_errors_total", "Tool call failures.", ["node", "tool"])
+
+google_request_latency = Histogram("google_request_duration_seconds", "Google API request latency.", ["method", "endpoint"])
+google_request_errors = Counter("google_request_errors_total", "Failed Google API requests.", ["method", "endpoint"])
+
+db_query_latency = Histogram("db_query_duration_seconds", "Database statement latency.", ["statement"])
+db_query_errors = Counter("db_query_errors_total", "Failed database statements.", ["statement"])
+
+def cached_prompt_token_ratios() -> Dict[Tuple[str, ...], float]:
+    with llm_prompt_tokens._lock, llm_cached_prompt_tokens._lock:
+        return {labels: llm_cached_prompt_tokens._values.get(labels, 0) / prompt_tokens
+                for labels, prompt_tokens in llm_prompt_tokens._values.items() if prompt_tokens}
+
+def render_metrics() -> str:
+    # Imported here to keep the caches free of a metrics dependency
+    from app.core.cache import get_cache_stats
+    from app.core.llm_cache import get_llm_cache_stats
+    from app.core.prompt_cache import get_context_cache_stats
+
+    lines = []
+
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+
+    lines.append("# HELP cache_requests_total Entity cache lookups.")
+    lines.append("# TYPE cache_requests_total counter")
+
+    for name, stats in get_cache_stats().items():
+        lines.append(f'cache_requests_total{{cache="{name}",result="hit"}} {stats["hits"]}')
+        lines.append(f'cache_requests_total{{cache="{name}",result="miss"}} {stats["misses"]}')
+
+    llm_cache_stats = get_llm_cache_stats()
+    lines.append("# HELP llm_cache_requests_total LLM response cache lookups.")
+    lines.append("# TYPE llm_cache_requests_total counter")
+    lines.append(f'llm_cache_requests_total{{result="hit"}} {llm_cache_stats["hits"]}')
+    lines.append(f'llm_cache_requests_total{{result="miss"}} {llm_cache_stats["misses"]}')
+
+    lines.append("# HELP llm_cached_prompt_token_ratio Share of prompt tokens served from the provider's context cache.")
+    lines.append("# TYPE llm_cached_prompt_token_ratio gauge")
+
+    for labels, ratio in cached_prompt_token_ratios().items():
+        lines.append(f"llm_cached_prompt_token_ratio{_format_labels(llm_prompt_tokens.labelnames, labels)} {ratio}")
+
+    context_cache_stats = get_context_cache_stats()
+    lines.append("# HELP prompt_context_cache_requests_total Lookups of explicit context caches by static prefix fingerprint.")
+    lines.append("# TYPE prompt_context_cache_requests_total counter")
+    lines.append(f'prompt_context_cache_requests_total{{result="hit"}} {context_cache_stats["hits"]}')
+    lines.append(f'prompt_context_cache_requests_total{{result="miss"}} {context_cache_stats["misses"]}')
+
+    return "\n".join(lines) + "\n"
@@ -15,10 +15,14 @@ class ChatInsights(SQLModel):
     tone_preferences: Optional[str] = Field(default=None, description="The user's preferred tone of communication (e.g. formal, casual, concise).")
     
     # Scheduling Preferences
-    meeting_length_default: Optional[int] = Field(default=30, description="Default duration for meetings in minutes.")
-    buffer_time_default: Optional[int] = Field(default=15, description="Default buffer time between meetings in minutes.")
-    reminder_schedule_default: Optional[int] = Field(default=15, description="Default reminder time before events in minutes.")
+    meeting_length_default: Optional[int] = Field(default=None, description="Default duration for meetings in minutes.")
+    buffer_time_default: Optional[int] = Field(default=None, description="Default buffer time between meetings in minutes.")
+    reminder_schedule_default: Optional[int] = Field(default=None, description="Default reminder time before events in minutes.")
     
     # Notification Preferences
-    daily_summary_notification: Optional[bool] = Field(default=False, description="Whether the user wants a daily summary notification.")
+    daily_summary_notification: Optional[bool] = Field(default=None, description="Whether the user wants a daily summary notification.")
     daily_summary_notification_time: Optional[datetime] = Field(default=None, description="The time of day to send the daily summary notification (ISO 8601 format).")
+
+class ConversationDigest(SQLModel):
+    summary: str = Field(default="", description="The updated running summary of the conversation.")
+    facts: List[str] = Field(default_factory=list, description="Durable facts worth remembering long term (decisions, deadlines, people, project details), one short self-contained sentence each.")
@@ -0,0 +1,154 @@
+from typing import Dict, Iterator, List, Optional, Set
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+import hmac
+import json
+import random
+import sys
+import threading
+import time
+
+from app.core.config import get_settings
+from app.core.events import get_event_logger
+
+settings = get_settings()
+log = get_event_logger(__name__)
+
+# First match wins, scanning categories in this order over the whole stack
+CATEGORIES = (("llm", ("langchain_google_genai", "google.genai", "google.ai", "grpc")),
+              ("db", ("sqlalchemy", "sqlmodel", "sqlite3", "langgraph.checkpoint")),
+              ("http", ("requests", "urllib3", "httpx", "http.client", "ssl", "socket")),
+              ("serialization", ("pydantic", "json", "ormsgpack", "msgpack")))
+
+def frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{getattr(code, 'co_qualname', code.co_name)}"
+
+def category(stack: List[str]) -> str:
+    modules = [label.split(":", 1)[0] for label in stack]
+
+    for name, prefixes in CATEGORIES:
+        if any(module == prefix or module.startswith(prefix + ".") for module in modules for prefix in prefixes):
+            return name
+
+    return "python"
+
+class SamplingProfiler:
+    """Wall-clock sampling profiler for one thread.
+
+    A daemon thread snapshots the target thread's stack every `interval`
+    seconds via `sys._current_frames()`, so waiting on sockets, locks and
+    the database is counted like CPU time. Stacks are kept in folded form
+    (root;...;leaf -> count), which flamegraph.pl and speedscope read as is.
+    Work handed to other threads shows up as time waiting on them.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+
+            if frame is None:
+                continue
+
+            stack = []
+
+            while frame is not None:
+                stack.append(frame_label(frame))
+                frame = frame.f_back
+
+            self.stacks[tuple(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def folded(self) -> str:
+        return "\n".join(f"{';'.join(stack)} {count}" for stack, count in self.stacks.most_common())
+
+    def summary(self, top_n: int) -> Dict[str, object]:
+        self_counts: Counter = Counter()
+        total_counts: Counter = Counter()
+        categories: Counter = Counter()
+
+        for stack, count in self.stacks.items():
+            self_counts[stack[-1]] += count
+            categories[category(list(stack))] += count
+
+            # A recursive function counts once per sample
+            for label in set(stack):
+                total_counts[label] += count
+
+        def share(counts: Counter) -> List[Dict[str, object]]:
+            return [{"function": label, "samples": count, "percent": round(100 * count / self.samples, 1)}
+                    for label, count in counts.most_common(top_n)]
+
+        return {"samples": self.samples,
+                "interval_ms": self.interval * 1000,
+                "categories": {name: round(100 * count / self.samples, 1) for name, count in categories.most_common()} if self.samples else {},
+                "top_self": share(self_counts) if self.samples else [],
+                "top_total": share(total_counts) if self.samples else []}
+
+_requested: Set[str] = set()
+_requested_lock = threading.Lock()
+
+def is_admin_request(token: Optional[str]) -> bool:
+    return bool(settings.profiling_admin_token and token and hmac.compare_digest(token, settings.profiling_admin_token))
+
+def request_profile(request_id: str) -> None:
+    with _requested_lock:
+        _requested.add(request_id)
+
+def should_profile(request_id: str) -> bool:
+    with _requested_lock:
+        if request_id in _requested:
+            _requested.discard(request_id)
+            return True
+
+    return random.random() < settings.profiling_sample_rate
+
+@contextmanager
+def profile(request_id: str) -> Iterator[None]:
+    """Profile the current thread when the request asked for it or is sampled.
+
+    Writes `<request_id>.folded` and a `<request_id>.json` summary of the
+    hottest functions and the time split by category to `profiling_dir`.
+    """
+    if not should_profile(request_id):
+        yield
+        return
+
+    profiler = SamplingProfiler(threading.get_ident(), settings.profiling_interval_ms / 1000)
+    start = time.perf_counter()
+    profiler.start()
+
+    try:
+        yield
+
+    finally:
+        profiler.stop()
+        duration = time.perf_counter() - start
+
+        try:
+            directory = Path(settings.profiling_dir)
+            directory.mkdir(parents=True, exist_ok=True)
+            (directory / f"{request_id}.folded").write_text(profiler.folded(), encoding="utf-8")
+            summary = {"request_id": request_id, "duration_s": duration, **profiler.summary(settings.profiling_top_n)}
+            (directory / f"{request_id}.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
+            log.info("profile.written", request_id=request_id, duration_s=duration, samples=summary["samples"],
+                     categories=summary["categories"], top_self=summary["top_self"][:5])
+
+        except Exception:
+            log.exception("profile.write_failed", request_id=request_id)
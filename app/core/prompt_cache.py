@@ -0,0 +1,136 @@
+from typing import Dict, Optional, Tuple
+from abc import ABC, abstractmethod
+import hashlib
+import threading
+import time
+
+from app.core.config import get_settings
+from app.core.events import get_event_logger
+
+settings = get_settings()
+log = get_event_logger(__name__)
+
+def fingerprint(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+def approximate_tokens(text: str) -> int:
+    # Same 4 characters per token estimate as count_tokens_approximately
+    return len(text) // 4
+
+class ContextCache(ABC):
+    """Explicit provider-side caches for long static prompt prefixes.
+
+    A prefix is identified by the fingerprint of the model name and its
+    text. The first request for a fingerprint creates a cache entry with
+    the provider and later requests reuse its name until the TTL is close
+    to running out. Prefixes shorter than `prompt_cache_min_tokens` are
+    not worth caching and return None.
+    """
+
+    def __init__(self, ttl_seconds: int, min_tokens: int):
+        self.ttl_seconds = ttl_seconds
+        self.min_tokens = min_tokens
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def _create(self, prefix: str, model: str, key: str) -> str:
+        """Create the provider-side cache entry for `prefix` and return its name."""
+
+    def get_or_create(self, prefix: str, model: str) -> Optional[str]:
+        if approximate_tokens(prefix) < self.min_tokens:
+            return None
+
+        key = fingerprint(f"{model}\0{prefix}")
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            # Leave a margin so a request never lands on an entry expiring mid-flight
+            if entry and entry[1] - 60 > time.time():
+                self.hits += 1
+                return entry[0]
+
+            self.misses += 1
+
+        try:
+            name = self._create(prefix, model, key)
+
+        except Exception as e:
+            log.warning("prompt_cache.create_failed", key=key, model=model, error=e)
+            return None
+
+        with self._lock:
+            self._entries[key] = (name, time.time() + self.ttl_seconds)
+
+        return name
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0}
+
+class GeminiContextCache(ContextCache):
+    def __init__(self, ttl_seconds: int, min_tokens: int):
+        super().__init__(ttl_seconds, min_tokens)
+        self._client = None
+
+    def _create(self, prefix: str, model: str, key: str) -> str:
+        # Imported here so starting the app does not pay for the Gemini client
+        from google import genai
+        from google.genai import types
+
+        if self._client is None:
+            self._client = genai.Client(api_key=settings.gemini_api_key)
+
+        cache = self._client.caches.create(model=model,
+                                           config=types.CreateCachedContentConfig(system_instruction=prefix,
+                                                                                  display_name=f"prefix-{key}",
+                                                                                  ttl=f"{self.ttl_seconds}s"))
+        return cache.name
+
+class LocalContextCache(ContextCache):
+    """Offline stand-in for Gemini context caching, used by tests and benchmarks.
+
+    Names resolve back to their prefix through `contents`, so a fake chat
+    model can rebuild the full prompt the way Gemini would.
+    """
+
+    def __init__(self, ttl_seconds: int, min_tokens: int):
+        super().__init__(ttl_seconds, min_tokens)
+        self.contents: Dict[str, str] = {}
+
+    def _create(self, prefix: str, model: str, key: str) -> str:
+        name = f"cachedContents/local-{key}"
+        self.contents[name] = prefix
+        return name
+
+CONTEXT_CACHES = {"gemini": GeminiContextCache, "local": LocalContextCache}
+
+_context_cache: Optional[ContextCache] = None
+_context_cache_lock = threading.Lock()
+
+def get_context_cache() -> Optional[ContextCache]:
+    """The explicit context cache for `prompt_cache_mode`, or None when only implicit caching is used."""
+    global _context_cache
+
+    cache_class = CONTEXT_CACHES.get(settings.prompt_cache_mode)
+
+    if cache_class is None:
+        return None
+
+    with _context_cache_lock:
+        if _context_cache is None:
+            _context_cache = cache_class(settings.prompt_cache_ttl_seconds, settings.prompt_cache_min_tokens)
+
+    return _context_cache
+
+def get_context_cache_stats() -> Dict[str, float]:
+    if _context_cache is None:
+        return {"hits": 0, "misses": 0, "hit_rate": 0.0}
+
+    return _context_cache.stats()
@@ -0,0 +1,127 @@
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+import threading
+import time
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langgraph.errors import GraphBubbleUp
+
+from app.core.config import get_settings
+from app.core.metrics import (
+    node_latency,
+    node_errors,
+    llm_latency,
+    llm_errors,
+    llm_prompt_tokens,
+    llm_completion_tokens,
+    llm_cached_prompt_tokens,
+    llm_cost,
+    tool_latency,
+    tool_errors,
+)
+
+settings = get_settings()
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """Times graph nodes, LLM calls and tool calls from LangChain callback events."""
+
+    def __init__(self):
+        self._runs: Dict[UUID, Tuple[float, Dict[str, str]]] = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id: UUID, labels: Dict[str, str]) -> None:
+        with self._lock:
+            self._runs[run_id] = (time.perf_counter(), labels)
+
+    def _finish(self, run_id: UUID) -> Optional[Tuple[float, Dict[str, str]]]:
+        with self._lock:
+            run = self._runs.pop(run_id, None)
+
+        if not run:
+            return None
+
+        return time.perf_counter() - run[0], run[1]
+
+    def on_chain_start(self, serialized: Dict[str, Any], inputs: Any, *, run_id: UUID, metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        node = (metadata or {}).get("langgraph_node")
+
+        # Only the node runnable itself carries the node name as its run name
+        if node and kwargs.get("name") == node:
+            self._start(run_id, {"node": node})
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        finished = self._finish(run_id)
+
+        if finished:
+            node_latency.observe(finished[0], **finished[1])
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        finished = self._finish(run_id)
+
+        if finished:
+            node_latency.observe(finished[0], **finished[1])
+
+            # Interrupts and parent commands are control flow, not failures
+            if not isinstance(error, GraphBubbleUp):
+                node_errors.inc(**finished[1])
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: Any, *, run_id: UUID, metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        metadata = metadata or {}
+        self._start(run_id, {"node": metadata.get("langgraph_node", ""),
+                             "model": metadata.get("ls_model_name", "")})
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID, metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        self.on_chat_model_start(serialized, prompts, run_id=run_id, metadata=metadata)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        finished = self._finish(run_id)
+
+        if not finished:
+            return
+
+        elapsed, labels = finished
+        llm_latency.observe(elapsed, **labels)
+
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+
+                if not usage:
+                    continue
+
+                input_tokens = usage.get("input_tokens", 0)
+                output_tokens = usage.get("output_tokens", 0)
+                cached_tokens = (usage.get("input_token_details") or {}).get("cache_read", 0)
+                llm_prompt_tokens.inc(input_tokens, **labels)
+                llm_cached_prompt_tokens.inc(cached_tokens, **labels)
+                llm_completion_tokens.inc(output_tokens, **labels)
+                llm_cost.inc(((input_tokens - cached_tokens) * settings.llm_input_cost_per_million
+                              + cached_tokens * settings.llm_cached_input_cost_per_million
+                              + output_tokens * settings.llm_output_cost_per_million) / 1_000_000, **labels)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        finished = self._finish(run_id)
+
+        if finished:
+            llm_latency.observe(finished[0], **finished[1])
+            llm_errors.inc(**finished[1])
+
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID, metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        self._start(run_id, {"node": (metadata or {}).get("langgraph_node", ""),
+                             "tool": kwargs.get("name") or serialized.get("name", "")})
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        finished = self._finish(run_id)
+
+        if finished:
+            tool_latency.observe(finished[0], **finished[1])
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        finished = self._finish(run_id)
+
+        if finished:
+            tool_latency.observe(finished[0], **finished[1])
+            tool_errors.inc(**finished[1])
+
+metrics_callback = MetricsCallbackHandler()
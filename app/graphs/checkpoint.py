@@ -0,0 +1,30 @@
+import sqlite3
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+def get_serializer() -> SerializerProtocol:
+    # CompactSerializer still reads checkpoints written by JsonPlusSerializer, but not the other way round
+    if settings.checkpoint_serializer == "jsonplus":
+        return JsonPlusSerializer()
+
+    from app.graphs.serde import CompactSerializer
+
+    return CompactSerializer()
+
+def get_checkpointer() -> BaseCheckpointSaver:
+    # An in-memory saver is private to one worker; set checkpoint_db_path to share
+    # conversation state between uvicorn workers (needs langgraph-checkpoint-sqlite).
+    if settings.checkpoint_db_path:
+        from langgraph.checkpoint.sqlite import SqliteSaver
+
+        conn = sqlite3.connect(settings.checkpoint_db_path, check_same_thread=False)
+        return SqliteSaver(conn, serde=get_serializer())
+    
+    return InMemorySaver(serde=get_serializer())
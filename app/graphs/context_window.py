@@ -0,0 +1,128 @@
+from typing import List, Optional, Tuple
+
+from langchain_core.messages import BaseMessage, HumanMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+
+from app.core.config import get_settings
+from app.core.metrics import context_tokens_saved
+
+settings = get_settings()
+
+def _protected_start(messages: List[BaseMessage], keep_turns: int) -> int:
+    # Index of the HumanMessage that opens the oldest of the `keep_turns` recent turns
+    seen_turns = 0
+
+    for i in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[i], HumanMessage):
+            seen_turns += 1
+
+            if seen_turns == keep_turns:
+                return i
+
+    return 0
+
+def _compress_tool_message(message: ToolMessage, max_chars: int) -> ToolMessage:
+    content = str(message.content)
+
+    if len(content) <= max_chars:
+        return message
+
+    compressed = f"{content[:max_chars]}... [truncated {len(content) - max_chars} chars]"
+    return message.model_copy(update={"content": compressed})
+
+def _compress_tool_results(messages: List[BaseMessage], token_counts: List[int], indices: range, total_tokens: int, max_tokens: int) -> int:
+    # Compresses in place, oldest first, until the budget is met; returns the new total
+    for i in indices:
+        if total_tokens <= max_tokens:
+            break
+
+        if isinstance(messages[i], ToolMessage):
+            messages[i] = _compress_tool_message(messages[i], settings.context_tool_result_chars)
+            new_count = count_tokens_approximately([messages[i]])
+            total_tokens -= token_counts[i] - new_count
+            token_counts[i] = new_count
+
+    return total_tokens
+
+def _drop_turns(messages: List[BaseMessage], token_counts: List[int], start: int, end: int, total_tokens: int, max_tokens: int) -> Tuple[int, int]:
+    # Drop whole turns so tool calls are never separated from their results; returns the new start and total
+    while total_tokens > max_tokens and start < end:
+        turn_end = start + 1
+
+        while turn_end < end and not isinstance(messages[turn_end], HumanMessage):
+            turn_end += 1
+
+        total_tokens -= sum(token_counts[start:turn_end])
+        start = turn_end
+
+    return start, total_tokens
+
+def _turn_units(messages: List[BaseMessage], start: int, end: int) -> List[Tuple[int, int]]:
+    # [start, end) split into single messages, keeping each AIMessage with the ToolMessages that answer it
+    units = []
+    i = start
+
+    while i < end:
+        j = i + 1
+
+        while j < end and isinstance(messages[j], ToolMessage):
+            j += 1
+
+        units.append((i, j))
+        i = j
+
+    return units
+
+def fit_messages(prefix: List[BaseMessage],
+                 messages: List[BaseMessage],
+                 node: str,
+                 max_tokens: Optional[int] = None,
+                 keep_turns: Optional[int] = None) -> Tuple[List[BaseMessage], int]:
+    """Fit `prefix + messages` into the token budget.
+
+    Older tool results are compressed first, oldest first; if that is not
+    enough, the oldest whole turns are dropped. The most recent
+    `keep_turns` turns are touched only when the budget is still exceeded:
+    their tool results are compressed next, then the older kept turns are
+    dropped, and finally the oldest tool calls of the last turn, keeping the
+    message that opened it and its latest step. The prefix (system prompt)
+    is always kept. Returns the messages to send and the number of tokens
+    saved.
+    """
+    max_tokens = max_tokens or settings.context_max_tokens
+    keep_turns = keep_turns or settings.context_keep_turns
+
+    prefix_tokens = count_tokens_approximately(prefix)
+    token_counts = [count_tokens_approximately([m]) for m in messages]
+    original_tokens = prefix_tokens + sum(token_counts)
+    total_tokens = original_tokens
+
+    if total_tokens <= max_tokens:
+        context_tokens_saved.observe(0, node=node)
+        return prefix + messages, 0
+
+    messages = list(messages)
+    protected_start = _protected_start(messages, keep_turns)
+    last_turn_start = _protected_start(messages, 1)
+
+    total_tokens = _compress_tool_results(messages, token_counts, range(protected_start), total_tokens, max_tokens)
+    drop_until, total_tokens = _drop_turns(messages, token_counts, 0, protected_start, total_tokens, max_tokens)
+
+    # Still over budget: the kept turns give way too, the last turn's opening message never does
+    total_tokens = _compress_tool_results(messages, token_counts, range(protected_start, len(messages)), total_tokens, max_tokens)
+    drop_until, total_tokens = _drop_turns(messages, token_counts, drop_until, last_turn_start, total_tokens, max_tokens)
+
+    dropped = set()
+    units = _turn_units(messages, last_turn_start + 1, len(messages))
+
+    for unit_start, unit_end in units[:-1]:
+        if total_tokens <= max_tokens:
+            break
+
+        dropped.update(range(unit_start, unit_end))
+        total_tokens -= sum(token_counts[unit_start:unit_end])
+
+    saved_tokens = original_tokens - total_tokens
+    context_tokens_saved.observe(saved_tokens, node=node)
+
+    return prefix + [m for i, m in enumerate(messages) if i >= drop_until and i not in dropped], saved_tokens
@@ -0,0 +1,49 @@
+from typing import Any, Dict, List, Tuple
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+from app.core.config import get_settings
+from app.core.prompt_cache import get_context_cache
+
+settings = get_settings()
+
+def with_dynamic_context(messages: List[BaseMessage], context: str) -> List[BaseMessage]:
+    """Attach per-call context (summary, preferences, clock) to the latest HumanMessage.
+
+    The system prompt, the bound tools and earlier turns then stay identical
+    from call to call, which is the prefix the provider can cache.
+    """
+    if not context:
+        return messages
+
+    for i in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[i], HumanMessage):
+            message = messages[i]
+
+            if isinstance(message.content, str):
+                content = f"{context}\n\n{message.content}"
+            else:
+                content = [{"type": "text", "text": context}, *message.content]
+
+            return messages[:i] + [message.model_copy(update={"content": content})] + messages[i + 1:]
+
+    return messages + [HumanMessage(content=context)]
+
+def use_context_cache(messages: List[BaseMessage]) -> Tuple[List[BaseMessage], Dict[str, Any]]:
+    """Serve a leading SystemMessage from an explicit context cache when one is configured.
+
+    Returns the messages to send and the extra invoke kwargs. Only for calls
+    without bound tools: Gemini rejects tools or a system instruction next
+    to cached content.
+    """
+    cache = get_context_cache()
+
+    if cache is None or not messages or not isinstance(messages[0], SystemMessage):
+        return messages, {}
+
+    name = cache.get_or_create(str(messages[0].content), settings.gemini_model_name)
+
+    if name is None:
+        return messages, {}
+
+    return messages[1:], {"cached_content": name}
@@ -0,0 +1,118 @@
+from typing import Any, Dict, List, Optional, Tuple, Type
+from functools import lru_cache
+import time
+
+import ormsgpack
+from pydantic import BaseModel
+from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage, SystemMessage, ToolMessage
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer, _msgpack_default, _msgpack_ext_hook
+
+from app.core.config import get_settings
+from app.core.metrics import Histogram
+from app.graphs.models import AgentConfig, Plan, PlanStep, Resource, SearchQuery, SearchQueryList, UserConfig
+from app.models.user import UserPreferences
+
+settings = get_settings()
+
+checkpoint_bytes = Histogram("checkpoint_serialized_bytes", "Size of a serialized checkpoint value.", ["encoding"],
+                             buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304))
+checkpoint_cpu = Histogram("checkpoint_serialize_cpu_seconds", "CPU time spent serializing a checkpoint value.", ["encoding"],
+                           buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5))
+
+# Append only: a type's position is its id in stored checkpoints
+COMPACT_TYPES: List[Type[BaseModel]] = [Plan, PlanStep, AgentConfig, UserConfig, Resource, SearchQuery, SearchQueryList,
+                                        UserPreferences,
+                                        HumanMessage, AIMessage, SystemMessage, ToolMessage, RemoveMessage]
+TYPE_IDS: Dict[type, int] = {cls: i for i, cls in enumerate(COMPACT_TYPES)}
+
+# Outside the ext codes used by JsonPlusSerializer
+EXT_COMPACT_MODEL = 64
+
+# Same passthroughs as JsonPlusSerializer, so datetimes, enums and UUIDs keep their types
+OPTIONS = (ormsgpack.OPT_PASSTHROUGH_DATACLASS | ormsgpack.OPT_PASSTHROUGH_DATETIME | ormsgpack.OPT_PASSTHROUGH_ENUM
+           | ormsgpack.OPT_PASSTHROUGH_UUID | ormsgpack.OPT_REPLACE_SURROGATES | ormsgpack.OPT_NON_STR_KEYS)
+
+@lru_cache
+def zstd() -> Optional[Any]:
+    # Optional dependency; without it large values are stored uncompressed
+    try:
+        import zstandard
+
+    except ImportError:
+        return None
+
+    return zstandard
+
+def _default(obj: Any) -> Any:
+    type_id = TYPE_IDS.get(type(obj))
+
+    if type_id is None:
+        return _msgpack_default(obj)
+
+    # Only fields that differ from their defaults, keyed by name so added fields stay readable. One
+    # model_dump covers the nested models too, and model_validate on load rebuilds them from their dicts
+    fields = obj.model_dump(exclude_defaults=True)
+    return ormsgpack.Ext(EXT_COMPACT_MODEL, ormsgpack.packb([type_id, fields], default=_default, option=OPTIONS))
+
+def _ext_hook(code: int, data: bytes) -> Any:
+    if code != EXT_COMPACT_MODEL:
+        return _msgpack_ext_hook(code, data)
+
+    type_id, fields = ormsgpack.unpackb(data, ext_hook=_ext_hook, option=ormsgpack.OPT_NON_STR_KEYS)
+    return COMPACT_TYPES[type_id].model_validate(fields)
+
+class CompactSerializer(JsonPlusSerializer):
+    """Checkpoint serializer with a compact msgpack encoding for our state types.
+
+    Plans, preferences and messages are written as a small type id plus the
+    fields that differ from their defaults, instead of module and class
+    names plus every field. Values of `compress_min_bytes` or more are zstd
+    compressed when `zstandard` is installed. Anything else, and checkpoints
+    written by the stock serializer, go through JsonPlusSerializer.
+    """
+
+    def __init__(self, compress_min_bytes: Optional[int] = None, compress_level: Optional[int] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.compress_min_bytes = settings.checkpoint_compress_min_bytes if compress_min_bytes is None else compress_min_bytes
+        self.compress_level = settings.checkpoint_compress_level if compress_level is None else compress_level
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        if obj is None or isinstance(obj, (bytes, bytearray)):
+            return super().dumps_typed(obj)
+
+        start = time.thread_time()
+
+        try:
+            data = ormsgpack.packb(obj, default=_default, option=OPTIONS)
+
+        except TypeError:
+            return super().dumps_typed(obj)
+
+        encoding = "compact"
+        compressor = zstd()
+
+        if compressor and len(data) >= self.compress_min_bytes:
+            data = compressor.ZstdCompressor(level=self.compress_level).compress(data)
+            encoding = "compact+zstd"
+
+        checkpoint_cpu.observe(time.thread_time() - start, encoding=encoding)
+        checkpoint_bytes.observe(len(data), encoding=encoding)
+
+        return encoding, data
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        encoding, payload = data
+
+        if encoding == "compact+zstd":
+            decompressor = zstd()
+
+            # Writing falls back to uncompressed values, but stored compressed ones cannot be read back
+            if decompressor is None:
+                raise RuntimeError("Checkpoint value is zstd compressed; install the 'zstandard' package to load it")
+
+            encoding, payload = "compact", decompressor.ZstdDecompressor().decompress(payload)
+
+        if encoding == "compact":
+            return ormsgpack.unpackb(payload, ext_hook=_ext_hook, option=ormsgpack.OPT_NON_STR_KEYS)
+
+        return super().loads_typed(data)
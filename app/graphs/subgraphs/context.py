@@ -1,10 +1,8 @@
 from typing import List
 
 from langchain_core.messages import SystemMessage, HumanMessage
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langgraph.graph import StateGraph, START, END
 from langgraph.types import Send
-from langchain_tavily import TavilySearch
 
 from app.graphs.prompts import (
     QUERIES_SYSTEM_PROMPT,
@@ -14,15 +12,9 @@ from app.graphs.prompts import (
 from app.graphs.state import ContextState
 from app.core.config import get_settings
 from app.graphs.models import SearchQueryList
+from app.core.llm import get_chat_model, get_search_tool
 
 settings = get_settings()
-model = ChatGoogleGenerativeAI(model=settings.gemini_model_name,
-                              google_api_key=settings.gemini_api_key,
-                              temperature=0)
-tavily_search = TavilySearch(max_results=3,
-                            include_raw_content=True,
-                            include_favicon=False,
-                             tavily_api_key=settings.tavily_api_key)
 
 def generate_search_queries(state: ContextState) -> ContextState:
     system_message = SystemMessage(content=QUERIES_SYSTEM_PROMPT.format(
@@ -30,7 +22,7 @@ def generate_search_queries(state: ContextState) -> ContextState:
         NUM_QUERIES=3
     ))
     human_message = HumanMessage(content=f"User's goal: {state.get("goal")}")
-    model_with_structured_output = model.with_structured_output(SearchQueryList)
+    model_with_structured_output = get_chat_model("generate_search_queries").with_structured_output(SearchQueryList)
     
     queries = model_with_structured_output.invoke([system_message, human_message])
     
@@ -43,14 +35,14 @@ def map_queries(state: ContextState):
 
 def write_section(state: ContextState) -> ContextState:
     query = state.get("search_query").query
-    data = tavily_search.invoke({"query": query})
+    data = get_search_tool().invoke({"query": query})
     results = data.get("results")
     
     formatted_search_docs = "\n\n".join([f"title: {doc.get('title')}\nurl: {doc.get('url')}\ncontent: {doc.get('raw_content')}" for doc in results])
     system_message = SystemMessage(content=SECTION_WRITING_SYSTEM_PROMPT.format(query=query))
     human_message = HumanMessage(content=f"Use and analyze the following documents: {formatted_search_docs}")
     
-    section = model.invoke([system_message, human_message])
+    section = get_chat_model().invoke([system_message, human_message])
     
     
     return {"sections": [section.content]}
@@ -62,7 +54,7 @@ def final_context(state: ContextState) -> ContextState:
     system_message = SystemMessage(content=FINAL_CONTEXT_SYSTEM_PROMPT.format(goal=goal))
     human_message = HumanMessage(content=f"Use and analyze the following memos: {sections}")
     
-    final_context = model.invoke([system_message, human_message])
+    final_context = get_chat_model().invoke([system_message, human_message])
     return {"output_context": final_context.content}
 
 def get_context_graph() -> StateGraph:
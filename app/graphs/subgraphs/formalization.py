@@ -5,7 +5,6 @@ import re
 
 from langchain_core.messages import HumanMessage
 from langchain.tools import BaseTool
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langgraph.graph import StateGraph, START, END
 from langgraph.types import interrupt, Command
 
@@ -14,26 +13,28 @@ from app.graphs.models import Plan
 from app.graphs.state import PlanFormalizationState
 from app.core.config import get_settings
 from app.graphs.utils import is_plan_dag, refine_formalization_messages, format_agentkit_manifest
+from app.core.llm import get_chat_model
+from app.core.events import get_event_logger
+from app.graphs.prompt_assembly import use_context_cache
 
 settings = get_settings()
-model = ChatGoogleGenerativeAI(model=settings.gemini_model_name,
-                              google_api_key=settings.gemini_api_key,
-                              temperature=0)
+log = get_event_logger(__name__)
 
 def formalize_plan(state: PlanFormalizationState, tools: List[BaseTool]) -> PlanFormalizationState:
     agentkit_manifest = format_agentkit_manifest(tools)
     messages = refine_formalization_messages(state, 
                                              FORMALIZATION_SYSTEM_PROMPT.format(
-                                                 plan_json_schema=Plan.model_json_schema(),
                                                  agentkit_manifest=agentkit_manifest
                                                  )
                                              )
     
-    response = model.invoke(messages)
+    # No tools are bound here, so the long system prompt can be served from an explicit context cache
+    messages, cache_kwargs = use_context_cache(messages)
+    response = get_chat_model("formalize_plan").invoke(messages, **cache_kwargs)
     
     split_pattern = r"\s*### PLAN ###\s*"
     parts = re.split(split_pattern, response.content, maxsplit=1)
-    print(parts)
+    log.debug("formalize_plan.response", parts=parts)
 
     if len(parts) == 2:
         reasoning_trace, plan_json = parts
@@ -4,37 +4,40 @@ from functools import partial
 
 from langchain_core.messages import SystemMessage
 from langchain.tools import BaseTool
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langgraph.prebuilt import ToolNode
 from langgraph.graph import StateGraph, START, END
 
-from app.graphs.prompts import OPS_SYSTEM_PROMPT
+from app.graphs.prompts import OPS_SYSTEM_PROMPT, OPS_CONTEXT_PROMPT
 from app.graphs.state import OpsState
 from app.core.config import get_settings
+from app.graphs.context_window import fit_messages
+from app.graphs.tool_selection import ToolSelector, request_more_tools
+from app.graphs.prompt_assembly import with_dynamic_context
 
 settings = get_settings()
 
-model = ChatGoogleGenerativeAI(model=settings.gemini_model_name,
-                              google_api_key=settings.gemini_api_key,
-                              temperature=0)
-
 def tool_router(state: OpsState) -> Literal["tools", END]:
     if state.get("messages")[-1].tool_calls:
         return "tools"
     return END
 
-def call_llm(state: OpsState, tools: List[BaseTool]) -> OpsState:
-    model_with_tools = model.bind_tools(tools)
-    formated_system_prompt = OPS_SYSTEM_PROMPT.format(current_time_utc=datetime.now(timezone.utc).isoformat(),
-                                             user_timezone=state.get("user_preferences").timezone)
-    messages = [SystemMessage(content=formated_system_prompt)] + state.get("messages")
+def call_llm(state: OpsState, tool_selector: ToolSelector) -> OpsState:
+    model_with_tools = tool_selector.bind(state.get("messages"), node="call_llm")
+    dynamic_context = OPS_CONTEXT_PROMPT.format(current_time_utc=datetime.now(timezone.utc).isoformat(),
+                                                user_timezone=state.get("user_preferences").timezone)
+    messages, _ = fit_messages([SystemMessage(content=OPS_SYSTEM_PROMPT)], state.get("messages"), node="call_llm")
+    messages = with_dynamic_context(messages, dynamic_context)
     result = model_with_tools.invoke(messages)
+    
+    if not result.tool_calls:
+        tool_selector.record_turn(state.get("messages") + [result])
+    
     return {"messages": result}
 
 def get_ops_graph(tools: List[BaseTool]) -> StateGraph:
-    call_llm_node = partial(call_llm, tools=tools)
+    call_llm_node = partial(call_llm, tool_selector=ToolSelector(tools))
     workflow = StateGraph(OpsState)
-    workflow.add_node("tools", ToolNode(tools))
+    workflow.add_node("tools", ToolNode(tools + [request_more_tools]))
     workflow.add_node("call_llm", call_llm_node)
     
     workflow.add_edge(START, "call_llm")
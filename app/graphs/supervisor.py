@@ -1,18 +1,24 @@
 from typing import List
+from functools import lru_cache
 
 from langchain.tools import BaseTool
 from langgraph.graph import StateGraph, START, END
-from langgraph.checkpoint.memory import InMemorySaver
 
 from app.graphs.state import SupervisorState
 from app.graphs.subgraphs.formalization import get_formalization_graph
 from app.graphs.subgraphs.context import get_context_graph
 from app.graphs.subgraphs.ops import get_ops_graph
 from app.tools.registry import load_tools
+from app.graphs.checkpoint import get_checkpointer
 
-checkpointer = InMemorySaver()
+checkpointer = get_checkpointer()
 
 def get_supervisor_graph(user_scopes: set[str], user_domains: set[str]) -> StateGraph:
+    # Compiling loads tools and builds every subgraph; reuse it for each access set
+    return compile_supervisor_graph(frozenset(user_scopes), frozenset(user_domains))
+
+@lru_cache(maxsize=32)
+def compile_supervisor_graph(user_scopes: frozenset[str], user_domains: frozenset[str]) -> StateGraph:
     tools = load_tools(user_scopes, user_domains)
     workflow = StateGraph(SupervisorState)
     
@@ -0,0 +1,190 @@
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set
+from collections import Counter
+import json
+import math
+import re
+import threading
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.runnables import Runnable
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from langchain.tools import BaseTool, tool
+
+from app.core.config import get_settings
+from app.core.llm import get_chat_model
+from app.core.metrics import tool_selection_tokens_saved, tool_selection_fallbacks
+
+settings = get_settings()
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = {"a", "an", "the", "and", "or", "to", "of", "in", "on", "for", "my", "me", "i", "is", "it", "this", "that",
+             "with", "be", "by", "as", "at", "from", "all", "any", "use", "if", "not", "do", "please", "can", "you"}
+
+# User wording that rarely appears in the tool docstrings
+SYNONYMS = {"done": "complete", "finish": "complete", "finished": "complete", "check": "complete",
+            "remove": "delete", "erase": "delete", "cancel": "delete",
+            "todo": "task", "todos": "task", "reminder": "task",
+            "meeting": "event", "appointment": "event", "schedule": "event", "calendar": "event",
+            "rename": "update", "change": "update", "edit": "update", "reschedule": "update",
+            "find": "search", "look": "search", "where": "search",
+            "add": "insert", "create": "insert", "new": "insert", "book": "insert"}
+
+NAME_WEIGHT = 3.0
+CO_USAGE_WEIGHT = 2.0
+
+MORE_TOOLS = "request_more_tools"
+
+@tool(MORE_TOOLS)
+def request_more_tools() -> str:
+    """Make every tool available when none of the current tools can do what the user asked.
+
+    Returns:
+        str: Confirmation; all tools are bound on the next step.
+
+    Note:
+        Call this instead of telling the user something cannot be done.
+    """
+    return "Every tool is now available. Call the one you need."
+
+def terms(text: str) -> List[str]:
+    result = []
+
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+
+        token = SYNONYMS.get(token, token)
+
+        # Light stemming so "tasks"/"task" and "events"/"event" meet
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+
+        result.append(token)
+
+    return result
+
+def schema_tokens(tool: BaseTool) -> int:
+    # Same 4 characters per token estimate as count_tokens_approximately
+    return math.ceil(len(json.dumps(convert_to_openai_tool(tool))) / 4)
+
+def turn_tool_calls(messages: List[BaseMessage]) -> Set[str]:
+    """Names of the tools called since the last HumanMessage."""
+    names = set()
+
+    for message in reversed(messages):
+        if isinstance(message, HumanMessage):
+            break
+
+        if isinstance(message, AIMessage):
+            names.update(call["name"] for call in message.tool_calls)
+
+    return names
+
+class CoUsageStats:
+    """Counts of tools called within the same turn, learned as conversations run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.tool_counts: Counter = Counter()
+        self.pair_counts: Counter = Counter()
+
+    def record(self, names: Iterable[str]) -> None:
+        names = sorted(set(names))
+
+        with self._lock:
+            self.tool_counts.update(names)
+            self.pair_counts.update((a, b) for a in names for b in names if a != b)
+
+    def affinity(self, name: str, anchors: Iterable[str]) -> float:
+        # Highest P(name | anchor) over the anchors
+        with self._lock:
+            return max((self.pair_counts[(anchor, name)] / self.tool_counts[anchor]
+                        for anchor in anchors if self.tool_counts[anchor]), default=0.0)
+
+co_usage = CoUsageStats()
+
+class ToolSelector:
+    """Binds only the tools relevant to the current request.
+
+    Tools are scored against the text of the latest user and assistant
+    messages (tool results are left out, their field names would swamp the
+    scores) with TF-IDF over tool names (weighted up) and descriptions,
+    plus how often they were used together with the best lexical match or
+    with tools already called this turn. The top `top_k` are bound along
+    with the tools already called and `request_more_tools`, which the model
+    calls to get every tool on its next step. `min_score` is in units of
+    one mention of a term unique to a single tool; below it the full set
+    is bound instead. Graphs must add `request_more_tools` to their ToolNode.
+    """
+
+    def __init__(self, tools: List[BaseTool], top_k: Optional[int] = None, min_score: Optional[float] = None):
+        self.tools = list(tools)
+        self.top_k = settings.tool_selection_top_k if top_k is None else top_k
+        self.min_score = settings.tool_selection_min_score if min_score is None else min_score
+        self.schema_tokens = {candidate.name: schema_tokens(candidate) for candidate in self.tools}
+        self.threshold = self.min_score * math.log(1 + len(self.tools))
+        self._bound: Dict[FrozenSet[str], Runnable] = {}
+
+        documents = {}
+
+        for candidate in self.tools:
+            weights = Counter(terms(candidate.description))
+
+            for term in terms(candidate.name.replace("_", " ")):
+                weights[term] += NAME_WEIGHT
+
+            documents[candidate.name] = weights
+
+        document_frequency = Counter(term for weights in documents.values() for term in weights)
+        tool_count = len(self.tools)
+        self.weights = {name: {term: (1 + math.log(weight)) * math.log(1 + tool_count / document_frequency[term])
+                               for term, weight in weights.items()}
+                        for name, weights in documents.items()}
+
+    def scores(self, messages: List[BaseMessage]) -> Dict[str, float]:
+        recent = [m for m in messages if isinstance(m, (HumanMessage, AIMessage))][-settings.tool_selection_history_messages:]
+        query_terms = terms(" ".join(str(m.content) for m in recent))
+        lexical = {name: sum(weights.get(term, 0.0) for term in query_terms) for name, weights in self.weights.items()}
+
+        anchors = turn_tool_calls(messages)
+
+        if lexical:
+            anchors.add(max(lexical, key=lexical.get))
+
+        return {name: score + CO_USAGE_WEIGHT * co_usage.affinity(name, anchors) for name, score in lexical.items()}
+
+    def select(self, messages: List[BaseMessage], node: str) -> List[BaseTool]:
+        if not self.top_k or len(self.tools) <= self.top_k:
+            return self.tools
+
+        called = turn_tool_calls(messages)
+        scores = self.scores(messages)
+        ranked = sorted(scores, key=scores.get, reverse=True)
+
+        if MORE_TOOLS in called or scores[ranked[0]] < self.threshold:
+            tool_selection_fallbacks.inc(node=node)
+            tool_selection_tokens_saved.observe(0, node=node)
+            return self.tools
+
+        selected = set(ranked[:self.top_k]) | called
+        tool_selection_tokens_saved.observe(sum(tokens for name, tokens in self.schema_tokens.items() if name not in selected),
+                                            node=node)
+
+        # Registry order keeps the bound schema, and any prompt caching on it, stable
+        return [candidate for candidate in self.tools if candidate.name in selected] + [request_more_tools]
+
+    def bind(self, messages: List[BaseMessage], node: str) -> Runnable:
+        tools = self.select(messages, node)
+        key = frozenset(candidate.name for candidate in tools)
+
+        if key not in self._bound:
+            self._bound[key] = get_chat_model().bind_tools(tools)
+
+        return self._bound[key]
+
+    def record_turn(self, messages: List[BaseMessage]) -> None:
+        """Learn co-usage from a finished turn; call with the final answer appended."""
+        names = turn_tool_calls(messages) - {MORE_TOOLS}
+
+        if names:
+            co_usage.record(names)
@@ -1,7 +1,7 @@
 from typing import Optional, List
 from datetime import datetime
 
-from sqlmodel import SQLModel
+from sqlmodel import SQLModel, Field
 
 
 class EventTime(SQLModel):
@@ -23,4 +23,24 @@ class CalendarEvent(SQLModel):
     start: EventTime
     end: EventTime
     attendees: Optional[List[Attendee]]
-    
\ No newline at end of file
+    calendarId: Optional[str] = Field(default=None, description="The calendar the event belongs to; set on listed events, not sent to Google.")
+
+class CalendarListEntry(SQLModel):
+    id: str
+    summary: Optional[str] = None
+    primary: bool = False
+    accessRole: Optional[str] = None
+    selected: Optional[bool] = None
+
+class EventSearchHit(SQLModel):
+    id: str
+    calendarId: str = Field(default="primary", description="The calendar the event belongs to; pass it as `calendar_id`.")
+    summary: str
+    start: Optional[str] = None
+    end: Optional[str] = None
+    location: Optional[str] = None
+    description: Optional[str] = Field(default=None, description="The part of the description that matched the query.")
+
+class EventSearchResult(SQLModel):
+    hits: List[EventSearchHit] = Field(default_factory=list)
+    next_page: Optional[int] = Field(default=None, description="Pass as `page` to get more results; None when there are no more.")
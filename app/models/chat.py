@@ -1,4 +1,10 @@
+from typing import Optional
+
 from sqlmodel import SQLModel
 
 class ChatMessage(SQLModel):
-    message: str
\ No newline at end of file
+    message: str
+
+class PlanFeedback(SQLModel):
+    # Empty or missing feedback approves the pending plan as is
+    feedback: Optional[str] = None
@@ -0,0 +1,38 @@
+from typing import Optional
+from datetime import datetime
+from enum import Enum
+
+from sqlalchemy import TEXT
+from sqlmodel import SQLModel, Field
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+class JobKind(str, Enum):
+    # A chat turn runs the supervisor graph on `message`; a revision resumes the
+    # pending plan with `message` as the feedback
+    CHAT = "chat"
+    REVISION = "revision"
+
+class Job(SQLModel, table=True):
+    id: str = Field(primary_key=True)
+    user_id: int = Field(foreign_key="user.id", index=True)
+    status: JobStatus = Field(default=JobStatus.QUEUED, index=True)
+    kind: JobKind = Field(default=JobKind.CHAT)
+    message: str = Field(sa_type=TEXT)
+    owner: Optional[str] = Field(default=None)
+    attempts: int = Field(default=0)
+    steps_completed: int = Field(default=0)
+    current_node: Optional[str] = Field(default=None)
+    start_checkpoint_id: Optional[str] = Field(default=None)
+    cancel_requested: bool = Field(default=False)
+    result: Optional[str] = Field(default=None, sa_type=TEXT)
+    error: Optional[str] = Field(default=None, sa_type=TEXT)
+    created_at: datetime
+    updated_at: datetime = Field(index=True)
+    started_at: Optional[datetime] = Field(default=None)
+    finished_at: Optional[datetime] = Field(default=None)
@@ -0,0 +1,8 @@
+from datetime import datetime
+
+from sqlmodel import SQLModel, Field
+
+class ThreadLease(SQLModel, table=True):
+    thread_id: str = Field(primary_key=True)
+    owner: str
+    expires_at: datetime = Field(index=True)
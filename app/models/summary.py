@@ -0,0 +1,16 @@
+from typing import Optional
+from datetime import date, datetime
+
+from sqlalchemy import TEXT, UniqueConstraint
+from sqlmodel import SQLModel, Field
+
+class DailySummary(SQLModel, table=True):
+    __table_args__ = (UniqueConstraint("user_id", "summary_date"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id", index=True)
+    summary_date: date
+    scheduled_for: datetime = Field(index=True)
+    generated_at: Optional[datetime] = Field(default=None)
+    delivered_at: Optional[datetime] = Field(default=None, index=True)
+    content: Optional[str] = Field(default=None, sa_type=TEXT)
@@ -1,6 +1,6 @@
 from typing import Optional, List
 
-from sqlmodel import SQLModel
+from sqlmodel import SQLModel, Field
 
 class Link(SQLModel):
     type: str
@@ -14,12 +14,35 @@ class Task(SQLModel):
     notes: Optional[str] = None
     completed: Optional[str] = None
     updated: Optional[str] = None
+    due: Optional[str] = None
     links: Optional[List[Link]] = None
 
 class TaskList(SQLModel):
     id: Optional[str]
     title: str
     updated: Optional[str] = None
-    
-    
-    
\ No newline at end of file
+
+class TaskFilter(SQLModel):
+    title_contains: Optional[str] = Field(default=None, description="Only tasks whose title contains this text (case insensitive).")
+    status: Optional[str] = Field(default=None, description="Only tasks with this status: 'needsAction' or 'completed'.")
+    due_after: Optional[str] = Field(default=None, description="Only tasks due on or after this RFC 3339 timestamp.")
+    due_before: Optional[str] = Field(default=None, description="Only tasks due before this RFC 3339 timestamp.")
+
+class BulkTaskResult(SQLModel):
+    tasklist_id: Optional[str] = None
+    matched: int = 0
+    succeeded: List[str] = Field(default_factory=list, description="Titles of the tasks that were changed.")
+    failed: List[str] = Field(default_factory=list, description="Titles of the tasks that could not be changed.")
+    error: Optional[str] = Field(default=None, description="Why nothing was attempted, e.g. the list name was not an exact match.")
+
+class TaskSearchHit(SQLModel):
+    id: str
+    tasklist_id: str
+    title: str
+    status: Optional[str] = None
+    due: Optional[str] = None
+    notes: Optional[str] = Field(default=None, description="The part of the notes that matched the query.")
+
+class TaskSearchResult(SQLModel):
+    hits: List[TaskSearchHit] = Field(default_factory=list)
+    next_page: Optional[int] = Field(default=None, description="Pass as `page` to get more results; None when there are no more.")
@@ -5,7 +5,7 @@ from sqlmodel import SQLModel, Field, Relationship
 
 class UserPreferences(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    user_id: int = Field(foreign_key="user.id")
+    user_id: int = Field(foreign_key="user.id", unique=True, index=True)
     
     # Identity
     nickname: Optional[str] = Field(default=None)
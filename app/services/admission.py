@@ -0,0 +1,147 @@
+from typing import Callable, Dict, List, Tuple
+from collections import Counter as CounterDict
+from concurrent.futures import Executor
+import heapq
+import itertools
+import math
+import threading
+import time
+
+from app.core.config import get_settings
+from app.core.metrics import Counter, Gauge, Histogram
+
+settings = get_settings()
+
+admission_rejections = Counter("admission_rejections_total", "Chat requests shed with a 429 by the admission controller.", ["reason"])
+admission_queued = Gauge("admission_queued_jobs", "Chat jobs admitted and waiting for a run slot.")
+admission_running = Gauge("admission_running_jobs", "Chat jobs holding one of the global run slots.")
+admission_queue_wait = Histogram("admission_queue_wait_seconds", "Time an admitted chat job waited for a run slot.")
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+def parse_weights(value: str) -> Dict[int, float]:
+    # "12:2,40:0.5" -> {12: 2.0, 40: 0.5}; unlisted users weigh 1
+    weights = {}
+
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        user_id, _, weight = item.partition(":")
+        weights[int(user_id)] = float(weight)
+
+    return weights
+
+class TokenBucket:
+    def __init__(self, rate_per_second: float, burst: float):
+        self.rate = rate_per_second
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Take one token; return 0 on success or the seconds until one is available."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+
+        return (1 - self.tokens) / self.rate
+
+class AdmissionController:
+    """Admission control and weighted fair queuing in front of the job workers.
+
+    `admit` applies the per-user rate limit and the queue limits and raises
+    AdmissionRejected, with a retry-after estimate, when a request must be
+    shed. Admitted jobs wait in a weighted fair queue: each user's jobs are
+    tagged with a virtual finish time advanced by the expected run time
+    divided by the user's weight, so a user who keeps the workers busy falls
+    behind users who have not. At most `max_running` jobs run at once,
+    which keeps the number of concurrent LLM calls within provider quota.
+    """
+
+    def __init__(self, executor: Executor, run: Callable[[str], None]):
+        self.executor = executor
+        self.run = run
+        self.max_running = settings.admission_max_running or settings.job_workers
+        self.weights = parse_weights(settings.admission_user_weights)
+
+        self._lock = threading.Lock()
+        self._buckets: Dict[int, TokenBucket] = {}
+        self._queue: List[Tuple[float, int, float, int, str, float]] = []
+        self._queued_by_user: CounterDict = CounterDict()
+        self._last_finish: Dict[int, float] = {}
+        self._virtual_time = 0.0
+        self._running = 0
+        self._sequence = itertools.count()
+
+        # Moving average of job run time, for finish tags and retry-after hints
+        self._run_seconds = settings.admission_initial_run_seconds
+
+    def _queue_delay(self) -> float:
+        return math.ceil((len(self._queue) + 1) / self.max_running) * self._run_seconds
+
+    def admit(self, user_id: int) -> None:
+        with self._lock:
+            if len(self._queue) >= settings.admission_max_queued:
+                reason, retry_after = "queue_full", self._queue_delay()
+
+            elif self._queued_by_user[user_id] >= settings.admission_user_max_queued:
+                reason, retry_after = "user_queue_full", self._queue_delay()
+
+            else:
+                bucket = self._buckets.get(user_id)
+
+                if bucket is None:
+                    bucket = self._buckets[user_id] = TokenBucket(settings.admission_user_rate_per_minute / 60,
+                                                                  settings.admission_user_burst)
+
+                reason, retry_after = "rate_limited", bucket.take()
+
+                if not retry_after:
+                    return
+
+        admission_rejections.inc(reason=reason)
+        raise AdmissionRejected(reason, retry_after)
+
+    def submit(self, user_id: int, job_id: str) -> None:
+        """Queue a job for a run slot; admission limits are checked by `admit`, not here."""
+        with self._lock:
+            start = max(self._virtual_time, self._last_finish.get(user_id, 0.0))
+            finish = start + self._run_seconds / self.weights.get(user_id, 1.0)
+            self._last_finish[user_id] = finish
+            self._queued_by_user[user_id] += 1
+            heapq.heappush(self._queue, (finish, next(self._sequence), start, user_id, job_id, time.monotonic()))
+            admission_queued.set(len(self._queue))
+
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        with self._lock:
+            while self._queue and self._running < self.max_running:
+                _, _, start, user_id, job_id, queued_at = heapq.heappop(self._queue)
+                self._queued_by_user[user_id] -= 1
+                self._virtual_time = max(self._virtual_time, start)
+                self._running += 1
+                admission_queue_wait.observe(time.monotonic() - queued_at)
+                self.executor.submit(self._run_job, job_id)
+
+            admission_queued.set(len(self._queue))
+            admission_running.set(self._running)
+
+    def _run_job(self, job_id: str) -> None:
+        start = time.monotonic()
+
+        try:
+            self.run(job_id)
+
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._run_seconds = 0.8 * self._run_seconds + 0.2 * (time.monotonic() - start)
+
+            self._dispatch()
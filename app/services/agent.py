@@ -1,8 +1,8 @@
-from typing import List
+from typing import List, Optional
 
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langgraph.graph import MessagesState, StateGraph, START, END
-from langchain_core.messages import SystemMessage, HumanMessage, RemoveMessage
+from langchain_core.messages import SystemMessage, HumanMessage, RemoveMessage, BaseMessage
+from langchain_core.messages.utils import count_tokens_approximately
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.runnables import Runnable
 from sqlmodel import Session
@@ -15,11 +15,21 @@ from app.core.config import get_settings
 from app.tools.registry import load_tools
 from app.models.user import UserPreferences
 import app.services.users as users_service
-from app.core.output import ChatInsights
-from langgraph.checkpoint.memory import InMemorySaver
+import app.services.background as background
+import app.services.preferences as preferences_service
+import app.services.memory as memory_service
+from app.core.database import engine
+from app.core.events import get_event_logger
+from app.core.llm import get_chat_model
+from app.graphs.context_window import fit_messages
+from app.graphs.tool_selection import ToolSelector, request_more_tools
+from app.graphs.prompt_assembly import with_dynamic_context
+from app.core.output import ChatInsights, ConversationDigest
+from app.graphs.checkpoint import get_checkpointer
 from langchain_core.runnables import RunnableConfig
 
 settings = get_settings()
+log = get_event_logger(__name__)
 
 SYSTEM_PROMPT = """
                 ### ROLE & OBJECTIVE
@@ -34,12 +44,13 @@ SYSTEM_PROMPT = """
                    - Do NOT answer questions about general trivia, biology (e.g., "tell me about orcas"), pop culture, or news unless it directly relates to a specific task or project in the user's context.
                    - If a user asks an out-of-scope question, politely refuse: "I am designed to help with your operations and technical stack. I cannot assist with general topics."
                 ### INSTRUCTIONS FOR DYNAMIC DATA
-                You will be provided with two dynamic inputs appended to this instruction set:
+                You will be provided with these dynamic inputs at the top of the latest user message:
                 1. **Conversation Summary:** Use this to recall past decisions, project states, and user context.
                 2. **User Preferences (JSON):** Treat this as your configuration file.
                   - If `communication_style` is defined, mimic it exactly.
                   - If `tech_stack` is defined, prioritize those tools in recommendations.
                   - If `constraints` are listed, treat them as hard blockers.
+                3. **Relevant Memories:** Facts and past exchanges retrieved from long-term memory for this message. Use them when they apply; ignore them otherwise.
 
                 ### FORMATTING STANDARDS
                 - **Code:** Always use markdown blocks with language identifiers.
@@ -47,13 +58,9 @@ SYSTEM_PROMPT = """
                 - **Brevity:** If the user asks a yes/no question, provide a yes/no answer followed by a single sentence of context if necessary.
 
                 ---
-                ### END OF SYSTEM INSTRUCTIONS. DYNAMIC CONTEXT FOLLOWS:
+                ### END OF SYSTEM INSTRUCTIONS.
 """
 
-model = ChatGoogleGenerativeAI(model="gemini-2.5-flash",
-                              google_api_key=settings.gemini_api_key,
-                              temperature=0)
-
 extract_preferences_prompt = ChatPromptTemplate.from_messages([
     ("system", """You are a helpful assistant that maintains user profiles. 
     Analyze the conversation history below. 
@@ -66,9 +73,7 @@ extract_preferences_prompt = ChatPromptTemplate.from_messages([
     MessagesPlaceholder(variable_name="messages") 
 ])
 
-preferences_extractor = extract_preferences_prompt | model.with_structured_output(ChatInsights)
-
-checkpointer = InMemorySaver()
+checkpointer = get_checkpointer()
 
 class State(MessagesState):
   summary: str
@@ -76,89 +81,177 @@ class State(MessagesState):
   user_preferences: UserPreferences
   
 def load_data(state: State, config: RunnableConfig) -> State:
-  if not state.get("user_preferences"):
+  updates = {}
+  thread_id = str(config["configurable"]["thread_id"])
+  
+  # Merge a summary finished in the background since the previous turn
+  summarized = background.collect("summary", thread_id)
+  
+  if summarized:
+    summary, summarized_ids = summarized
+    current_ids = {m.id for m in state.get("messages")}
+    updates["summary"] = summary
+    updates["messages"] = [RemoveMessage(id=m_id) for m_id in summarized_ids if m_id in current_ids]
+  
+  updated_preferences = background.collect("preferences", thread_id)
+  
+  if updated_preferences:
+    updates["user_preferences"] = updated_preferences
+  
+  elif not state.get("user_preferences"):
     user_preferences = users_service.get_user_preferences(state.get("user_id"), config["configurable"]["session"])
-    return {"user_preferences": user_preferences}
-  return {}
+    updates["user_preferences"] = user_preferences
+  
+  return updates
 
-def summarize_conversation(state: State) -> State:
-  summary = state.get("summary", "")
+def find_summary_cutoff(messages: List[BaseMessage]) -> int:
+  # Keep the newest turns up to the keep budget, cutting only before a HumanMessage
+  # so tool calls are never separated from their results.
+  cutoff = 0
+  kept_tokens = 0
   
+  for i in range(len(messages) - 1, 0, -1):
+    kept_tokens += count_tokens_approximately([messages[i]])
+    
+    if isinstance(messages[i], HumanMessage):
+      cutoff = i
+      
+      if kept_tokens >= settings.summary_keep_tokens:
+        break
+  
+  return cutoff
+
+def build_summary(user_id: int, summary: str, messages: List[BaseMessage]) -> tuple[str, List[str]]:
   if summary:
     summary_message = f"Summary of earlier conversation: {summary}\n\nExtend the summary with the messages above."
   
   else:
     summary_message = "Summarize the conversation above."
   
-  messages = state.get("messages") + [HumanMessage(content=summary_message)]
-  result = model.invoke(messages)
+  summary_message += " Also list the key facts worth remembering long term."
+  
+  summarizer = get_chat_model("summarize_conversation").with_structured_output(ConversationDigest)
+  digest = summarizer.invoke(messages + [HumanMessage(content=summary_message)])
+  
+  # The summarized messages leave the context window; archive them so call_llm can still recall them
+  try:
+    memory_service.archive_conversation(user_id, messages, digest.facts)
   
-  trim_messages = [RemoveMessage(id=m.id) for m in messages[:-2]]
-  return {"summary": result.content, "messages": trim_messages}
+  except Exception:
+    log.exception("memory.archive_failed", user_id=user_id)
+  
+  return digest.summary or summary, [m.id for m in messages]
 
-def update_user_preferences(state: State, config: RunnableConfig) -> State:
-  current_prefs = state.get("user_preferences")
-  session = config["configurable"]["session"]
+def summarize_conversation(state: State, config: RunnableConfig) -> State:
+  messages = state.get("messages")
+  cutoff = find_summary_cutoff(messages)
+  
+  if cutoff:
+    background.submit("summary",
+                      str(config["configurable"]["thread_id"]),
+                      build_summary,
+                      state.get("user_id"),
+                      state.get("summary", ""),
+                      messages[:cutoff])
+  
+  return {}
+
+def extract_user_preferences(current_prefs: UserPreferences, messages: List[BaseMessage]) -> Optional[UserPreferences]:
   current_prefs_json = current_prefs.model_dump_json(exclude_none=True,
                                                      exclude={"id", "user_id"})
   
   # Gemini requires the chat history to end with a HumanMessage
-  messages = state.get("messages")[-2:]
   analyze_messages = messages + [HumanMessage(content="Extract preferences from the conversation above.")]
   
+  preferences_extractor = extract_preferences_prompt | get_chat_model().with_structured_output(ChatInsights)
   extracted_prefs = preferences_extractor.invoke({"current_prefs": current_prefs_json,
                                                   "messages": analyze_messages})
+  changes = preferences_service.diff_preferences(current_prefs, extracted_prefs)
+  
+  if not changes:
+    return None
+  
+  with Session(engine) as session:
+    return users_service.update_user_preferences(current_prefs.id, changes, session)
 
-  # if updates_for_prefs:
-  users_service.update_user_preferences(current_prefs.id, extracted_prefs, session)
-  return {"user_preferences": users_service.get_user_preferences(state.get("user_id"), session)}
+def update_user_preferences(state: State, config: RunnableConfig) -> State:
+  messages = state.get("messages")[-2:]
+  
+  if not preferences_service.has_preference_signal(messages):
+    return {}
+  
+  # Runs after the response is sent; load_data merges the result on the next turn
+  background.submit("preferences",
+                    str(config["configurable"]["thread_id"]),
+                    extract_user_preferences,
+                    state.get("user_preferences"),
+                    messages)
+  
+  return {}
 
 def post_conversation_router(state: State) -> List[str]:
-  if state.get("messages")[-1].tool_calls:
-    return "tools"
+  messages = state.get("messages")
   
-  dest = ["update_user_preferences"]
-  num_messages = len(state.get("messages"))
+  if messages[-1].tool_calls:
+    dest = ["tools"]
   
-  if num_messages > 5:
+  else:
+    dest = ["update_user_preferences"]
+  
+  if count_tokens_approximately(messages) > settings.summary_token_budget:
     dest.append("summarize_conversation")
   
   return dest
 
-def call_llm(state: State, model_with_tools: Runnable) -> State:
+def call_llm(state: State, tool_selector: ToolSelector) -> State:
     summary = state.get("summary")
     user_preferences = state.get("user_preferences", None)
     
-    system_prompt = SYSTEM_PROMPT
+    # Summary and preferences change between turns, so they ride on the latest message and the system prompt stays a cacheable prefix
+    dynamic_context = []
     
     if summary:
-      system_prompt += f"Summary of earlier conversation: {summary}"
+      dynamic_context.append(f"Summary of earlier conversation: {summary}")
       
     if user_preferences:
       user_preferences_dict = user_preferences.model_dump(exclude_none=True,
                                                           exclude={"id", "user_id"})
       if user_preferences_dict:
-        system_prompt += f"User preferences: {json.dumps(user_preferences_dict)}"
+        dynamic_context.append(f"User preferences: {json.dumps(user_preferences_dict)}")
+    
+    query = next((str(m.content) for m in reversed(state.get("messages")) if isinstance(m, HumanMessage)), "")
     
-    if system_prompt:
-      messages = [SystemMessage(content=system_prompt)] + state.get("messages") 
+    # Memory is an extra; a broken store must not fail the turn
+    try:
+      memories = memory_service.recall(state.get("user_id"), query)
     
-    else:
-      messages = state.get("messages")
+    except Exception:
+      log.exception("memory.recall_failed", user_id=state.get("user_id"))
+      memories = []
     
+    if memories:
+      dynamic_context.append("Relevant memories:\n" + "\n".join(f"- {memory}" for memory in memories))
+    
+    messages, _ = fit_messages([SystemMessage(content=SYSTEM_PROMPT)], state.get("messages"), node="conversation")
+    messages = with_dynamic_context(messages, "\n".join(dynamic_context))
+    
+    model_with_tools = tool_selector.bind(state.get("messages"), node="conversation")
     result = model_with_tools.invoke(messages)
-    print(f"RESULT: {result}")
+    log.debug("conversation.response", user_id=state.get("user_id"), result=result)
+    
+    if not result.tool_calls:
+      tool_selector.record_turn(state.get("messages") + [result])
+    
     return {"messages": result}
 
 def get_agent(user_scopes: set[str], user_domains: set[str]):
   tools = load_tools(user_scopes, user_domains)
-  model_with_tools = model.bind_tools(tools)
-  call_llm_node = partial(call_llm, model_with_tools=model_with_tools)
+  call_llm_node = partial(call_llm, tool_selector=ToolSelector(tools))
 
   workflow = StateGraph(State)
   workflow.add_node("load_data", load_data)
   workflow.add_node("conversation", call_llm_node)
-  workflow.add_node("tools", ToolNode(tools))
+  workflow.add_node("tools", ToolNode(tools + [request_more_tools]))
   workflow.add_node("summarize_conversation", summarize_conversation)
   workflow.add_node("update_user_preferences", update_user_preferences)
 
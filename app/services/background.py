@@ -0,0 +1,72 @@
+from typing import Any, Callable, Dict, Optional, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+import threading
+import time
+
+from app.core.config import get_settings
+from app.core.events import get_event_logger
+
+settings = get_settings()
+log = get_event_logger(__name__)
+
+executor = ThreadPoolExecutor(max_workers=settings.background_workers,
+                              thread_name_prefix="background")
+
+# (kind, key) -> (future, monotonic submit time). Results stay in this process only: with several
+# uvicorn workers the next turn of a thread may land in another one and never collect them, so
+# finished results are dropped after background_result_ttl_seconds. Nothing is lost for good:
+# preference updates are saved to the database by the job itself, and an unmerged summary is
+# recomputed by a later turn, because its messages are still in the thread.
+_pending: Dict[Tuple[str, str], Tuple[Future, float]] = {}
+_lock = threading.Lock()
+
+def _expire() -> None:
+    # Called with _lock held
+    now = time.monotonic()
+
+    for (kind, key), (future, submitted_at) in list(_pending.items()):
+        if future.done() and now - submitted_at > settings.background_result_ttl_seconds:
+            del _pending[(kind, key)]
+            log.info("background.expired", kind=kind, key=key)
+
+def submit(kind: str, key: str, fn: Callable[..., Any], *args, **kwargs) -> bool:
+    """Run `fn` off the request path, keeping at most one pending job per (kind, key).
+
+    A result that finished but was not yet collected is kept rather than
+    recomputed, until it expires; only a failed job is replaced.
+    """
+    with _lock:
+        _expire()
+        future, _ = _pending.get((kind, key), (None, None))
+
+        if future and (not future.done() or future.exception() is None):
+            return False
+
+        if future:
+            log.error("background.failed", kind=kind, key=key, error=future.exception())
+
+        _pending[(kind, key)] = (executor.submit(fn, *args, **kwargs), time.monotonic())
+
+    return True
+
+def collect(kind: str, key: str) -> Optional[Any]:
+    """Pop the result of a finished job, or return None if it is missing, running, failed or expired."""
+    with _lock:
+        _expire()
+        future, _ = _pending.get((kind, key), (None, None))
+
+        if not future or not future.done():
+            return None
+
+        del _pending[(kind, key)]
+
+    if future.exception():
+        log.error("background.failed", kind=kind, key=key, error=future.exception())
+        return None
+
+    return future.result()
+
+def is_pending(kind: str, key: str) -> bool:
+    with _lock:
+        future, _ = _pending.get((kind, key), (None, None))
+        return bool(future) and not future.done()
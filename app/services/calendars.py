@@ -0,0 +1,163 @@
+from typing import Any, Dict, Iterator, List, Optional
+from datetime import datetime, timezone
+from urllib.parse import quote
+import heapq
+import itertools
+
+from sqlmodel import Session
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.models.calendar import CalendarListEntry
+from app.tools.google.api_client import fanout_executor, make_google_request, request_in_own_session
+
+settings = get_settings()
+
+PRIMARY = "primary"
+
+class CalendarUnavailable(Exception):
+    pass
+
+calendar_list_cache = TTLCache("calendar_list", settings.cache_ttl_seconds, settings.cache_max_entries)
+calendar_events_cache = TTLCache("calendar_events", settings.calendar_events_cache_ttl_seconds, settings.cache_max_entries)
+
+def rfc3339(value: datetime) -> str:
+    return value.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+def parse_time(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+def events_url(calendar_id: str) -> str:
+    # The primary calendar keeps its configured endpoint, which the search index follows
+    if calendar_id == PRIMARY:
+        return settings.google_calendar_events_endpoint
+
+    return f"{settings.google_calendar_calendars_endpoint}/{quote(calendar_id, safe='')}/events"
+
+def list_calendars(user_id: int, session: Session) -> List[CalendarListEntry]:
+    cached = calendar_list_cache.get(user_id)
+
+    if cached is not None:
+        return cached
+
+    calendars = []
+    params = {"maxResults": 250}
+
+    while True:
+        calendar_list_data = make_google_request(user_id,
+                                                 session,
+                                                 "GET",
+                                                 settings.google_calendar_list_endpoint,
+                                                 params=dict(params))
+
+        # Without the calendar list the primary calendar still answers; do not cache the fallback
+        if calendar_list_data is None:
+            return [CalendarListEntry(id=PRIMARY, summary="Primary", primary=True)]
+
+        calendars.extend(CalendarListEntry.model_validate(c) for c in calendar_list_data.get("items", []))
+
+        if not calendar_list_data.get("nextPageToken"):
+            break
+
+        params["pageToken"] = calendar_list_data["nextPageToken"]
+
+    # The primary calendar's list entry is keyed by the user's email; address it as "primary"
+    calendars = [c.model_copy(update={"id": PRIMARY}) if c.primary else c for c in calendars]
+    calendar_list_cache.set(user_id, calendars)
+
+    return calendars
+
+def resolve_calendars(wanted: Optional[List[str]], calendars: List[CalendarListEntry]) -> List[CalendarListEntry]:
+    """Calendars matching the ids or names in `wanted`, or every calendar shown in the user's UI when empty."""
+    if not wanted:
+        return [c for c in calendars if c.selected is not False or c.primary]
+
+    resolved = []
+
+    for name in wanted:
+        lowered = name.strip().lower()
+
+        # Exact id, then exact name, then partial name
+        for matches in (lambda c: c.id == name,
+                        lambda c: (c.summary or "").lower() == lowered,
+                        lambda c: lowered in (c.summary or "").lower()):
+            found = [c for c in calendars if matches(c)]
+
+            if found:
+                resolved.extend(c for c in found if c not in resolved)
+                break
+
+    return resolved
+
+def invalidate_events(user_id: int, calendar_id: str) -> None:
+    calendar_events_cache.invalidate((user_id, calendar_id))
+
+def start_key(event: Dict[str, Any]) -> datetime:
+    start = event.get("start") or {}
+
+    try:
+        return parse_time(start.get("dateTime") or start.get("date"))
+
+    except (TypeError, ValueError):
+        return datetime.max.replace(tzinfo=timezone.utc)
+
+def _first_page(user_id: int, calendar_id: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    # Each calendar caches its recent first pages by query, so one changed calendar does not refetch the rest
+    key = tuple(sorted(params.items()))
+    pages = calendar_events_cache.get((user_id, calendar_id)) or {}
+
+    if key in pages:
+        return pages[key]
+
+    page = request_in_own_session(user_id, "GET", events_url(calendar_id), {"params": params})
+
+    if page is not None:
+        calendar_events_cache.set((user_id, calendar_id), {**pages, key: page})
+
+    return page
+
+def _calendar_events(user_id: int, calendar_id: str, params: Dict[str, Any], page: Optional[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    # Later pages are fetched only if the merge gets that far into this calendar
+    while page:
+        for event in page.get("items", []):
+            yield {**event, "calendarId": calendar_id}
+
+        if not page.get("nextPageToken"):
+            return
+
+        page = request_in_own_session(user_id, "GET", events_url(calendar_id), {"params": {**params, "pageToken": page["nextPageToken"]}})
+
+def merged_events(user_id: int,
+                  session: Session,
+                  calendar_ids: Optional[List[str]],
+                  time_min: datetime,
+                  time_max: Optional[datetime],
+                  max_results: int,
+                  strict: bool = False) -> List[Dict[str, Any]]:
+    """The first `max_results` events across the user's calendars, ordered by start time.
+
+    First pages are fetched concurrently, so several calendars cost about
+    as much as one. Google returns each calendar ordered by start time, so a
+    heap-based k-way merge produces the combined order without a full sort.
+    A calendar whose first page fails is left out, or raises
+    CalendarUnavailable when `strict` is set.
+    """
+    calendars = resolve_calendars(calendar_ids, list_calendars(user_id, session))
+    params = {"singleEvents": "true", "orderBy": "startTime", "timeMin": rfc3339(time_min), "maxResults": max_results}
+
+    if time_max:
+        params["timeMax"] = rfc3339(time_max)
+
+    futures = [fanout_executor.submit(_first_page, user_id, c.id, params) for c in calendars]
+    pages = [future.result() for future in futures]
+
+    if strict:
+        failed = [c.id for c, page in zip(calendars, pages) if page is None]
+
+        if failed:
+            raise CalendarUnavailable(f"Events of calendars {', '.join(failed)} could not be loaded")
+
+    streams = [_calendar_events(user_id, c.id, params, page) for c, page in zip(calendars, pages)]
+
+    return list(itertools.islice(heapq.merge(*streams, key=start_key), max_results))
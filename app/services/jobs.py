@@ -0,0 +1,349 @@
+from typing import Any, Dict, Iterator, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+import json
+import threading
+import uuid
+
+from sqlalchemy import update
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.job import Job, JobKind, JobStatus
+from app.core.config import get_settings
+from app.core.database import engine
+from app.core.metrics import Counter, Gauge, Histogram
+import app.core.profiling as profiling
+from app.core.events import get_event_logger
+from app.tools.registry import derive_access
+import app.services.tokens as tokens_service
+import app.services.leases as leases_service
+from app.services.admission import AdmissionController
+
+settings = get_settings()
+log = get_event_logger(__name__)
+
+ACTIVE_STATUSES = (JobStatus.QUEUED, JobStatus.RUNNING)
+TERMINAL_STATUSES = (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+executor = ThreadPoolExecutor(max_workers=settings.job_workers, thread_name_prefix="job")
+admission = AdmissionController(executor, lambda job_id: run_job(job_id))
+
+jobs_finished = Counter("jobs_finished_total", "Chat jobs that reached a terminal status.", ["status"])
+jobs_retried = Counter("jobs_retried_total", "Chat job attempts that were retried.", ["trigger"])
+jobs_running = Gauge("jobs_running", "Chat jobs currently executing on this worker.")
+job_queue_wait = Histogram("job_queue_wait_seconds", "Time a chat job waited in the queue before it started.")
+job_run_time = Histogram("job_run_seconds", "Time spent executing one chat job attempt.",
+                         buckets=(0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600))
+plan_resumes = Counter("plan_resumes_total", "Plan approvals and revision requests resumed from an interrupt.", ["decision"])
+plan_resume_time = Histogram("plan_resume_seconds", "Time spent resuming a thread from its plan-approval interrupt.")
+
+JOB_FAILED_ERROR = "Something went wrong while processing this message."
+JOB_BUSY_ERROR = "A previous message in this conversation is still being processed."
+NO_PLAN_ERROR = "No plan is waiting for approval."
+
+class JobCancelled(Exception):
+    pass
+
+class NoPendingPlan(Exception):
+    pass
+
+def utc_now() -> datetime:
+    return datetime.now(tz=timezone.utc)
+
+def as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+def job_view(job: Job) -> Dict[str, Any]:
+    return {"job_id": job.id,
+            "status": job.status,
+            "attempts": job.attempts,
+            "steps_completed": job.steps_completed,
+            "current_node": job.current_node,
+            "result": json.loads(job.result) if job.result else None,
+            "error": job.error}
+
+def get_active_job(user_id: int, session: Session) -> Optional[Job]:
+    query = select(Job).where(Job.user_id == user_id, Job.status.in_(ACTIVE_STATUSES))
+    return session.exec(query).first()
+
+def get_job(job_id: str, user_id: int, session: Session) -> Optional[Job]:
+    job = session.get(Job, job_id, populate_existing=True)
+    return job if job and job.user_id == user_id else None
+
+async def get_job_async(job_id: str, user_id: int, session: AsyncSession) -> Optional[Job]:
+    job = await session.get(Job, job_id, populate_existing=True)
+    return job if job and job.user_id == user_id else None
+
+def enqueue_chat_job(user_id: int, message: str, session: Session, profile: bool = False,
+                     kind: JobKind = JobKind.CHAT) -> Job:
+    now = utc_now()
+    job = Job(id=uuid.uuid4().hex, user_id=user_id, kind=kind, message=message, created_at=now, updated_at=now)
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+
+    if profile:
+        profiling.request_profile(job.id)
+
+    admission.submit(user_id, job.id)
+
+    return job
+
+def cancel_job(job: Job, session: Session) -> Job:
+    """Cancel a queued job at once; a running job stops after the node it is executing."""
+    now = utc_now()
+    result = session.execute(update(Job)
+                             .where(Job.id == job.id, Job.status == JobStatus.QUEUED)
+                             .values(status=JobStatus.CANCELLED, cancel_requested=True, updated_at=now, finished_at=now))
+
+    if result.rowcount:
+        jobs_finished.inc(status=JobStatus.CANCELLED.value)
+
+    else:
+        session.execute(update(Job)
+                        .where(Job.id == job.id, Job.status == JobStatus.RUNNING)
+                        .values(cancel_requested=True))
+
+    session.commit()
+    session.refresh(job)
+
+    return job
+
+def retry_job(job: Job, session: Session) -> bool:
+    """Requeue a failed or cancelled job; it resumes from its last checkpoint."""
+    result = session.execute(update(Job)
+                             .where(Job.id == job.id, Job.status.in_((JobStatus.FAILED, JobStatus.CANCELLED)))
+                             .values(status=JobStatus.QUEUED, cancel_requested=False, error=None,
+                                     updated_at=utc_now(), finished_at=None))
+    session.commit()
+
+    if not result.rowcount:
+        return False
+
+    jobs_retried.inc(trigger="manual")
+    admission.submit(job.user_id, job.id)
+
+    return True
+
+def recover_jobs() -> int:
+    """Requeue running jobs whose heartbeat lapsed and resubmit everything queued; called at startup.
+
+    A live worker renews `updated_at` every `job_stale_seconds / 3`, so only
+    jobs whose worker died are reclaimed, not long runs on other workers.
+    """
+    stale_before = utc_now() - timedelta(seconds=settings.job_stale_seconds)
+
+    with Session(engine) as session:
+        session.execute(update(Job)
+                        .where(Job.status == JobStatus.RUNNING, Job.updated_at < stale_before)
+                        .values(status=JobStatus.QUEUED, owner=None))
+        session.commit()
+        queued = session.exec(select(Job.user_id, Job.id).where(Job.status == JobStatus.QUEUED).order_by(Job.created_at)).all()
+
+    for user_id, job_id in queued:
+        admission.submit(user_id, job_id)
+
+    return len(queued)
+
+def claim_job(job_id: str, session: Session) -> Optional[Job]:
+    # Only one worker moves a job out of the queue, even if it was submitted twice
+    now = utc_now()
+    result = session.execute(update(Job)
+                             .where(Job.id == job_id, Job.status == JobStatus.QUEUED)
+                             .values(status=JobStatus.RUNNING, owner=leases_service.WORKER_ID,
+                                     attempts=Job.attempts + 1, updated_at=now, started_at=now))
+    session.commit()
+
+    if not result.rowcount:
+        return None
+
+    return session.get(Job, job_id, populate_existing=True)
+
+def renew_job(job_id: str, session: Session) -> bool:
+    result = session.execute(update(Job)
+                             .where(Job.id == job_id, Job.status == JobStatus.RUNNING, Job.owner == leases_service.WORKER_ID)
+                             .values(updated_at=utc_now()))
+    session.commit()
+
+    return bool(result.rowcount)
+
+def _heartbeat(job_id: str, stop: threading.Event) -> None:
+    interval = settings.job_stale_seconds / 3
+
+    while not stop.wait(interval):
+        with Session(engine) as session:
+            if not renew_job(job_id, session):
+                return
+
+@contextmanager
+def job_heartbeat(job_id: str) -> Iterator[None]:
+    """Keep a claimed job's `updated_at` fresh while it runs, however long its nodes take."""
+    stop = threading.Event()
+    keep_alive = threading.Thread(target=_heartbeat, args=(job_id, stop), daemon=True)
+    keep_alive.start()
+
+    try:
+        yield
+
+    finally:
+        stop.set()
+        keep_alive.join()
+
+def finish_job(job: Job, status: JobStatus, session: Session, result: Optional[Dict[str, Any]] = None,
+               error: Optional[str] = None) -> None:
+    now = utc_now()
+    job.status = status
+    job.result = json.dumps(result) if result is not None else None
+    job.error = error
+    job.updated_at = now
+    job.finished_at = now
+    session.add(job)
+    session.commit()
+    jobs_finished.inc(status=status.value)
+
+def record_progress(job: Job, node: str, session: Session) -> None:
+    job.steps_completed += 1
+    job.current_node = node
+    job.updated_at = utc_now()
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+
+    if job.cancel_requested:
+        raise JobCancelled()
+
+def node_path(namespace: Tuple[str, ...], node: str) -> str:
+    # ("formalization_graph:<task id>",), "validate_plan" -> "formalization_graph/validate_plan"
+    return "/".join([part.split(":", 1)[0] for part in namespace] + [node])
+
+def supervisor_run(user_id: int, session: Session) -> Tuple[Any, Dict[str, Any]]:
+    token = tokens_service.get_token_by_user_id(user_id, session)
+    user_domains, user_scopes = derive_access(set(token.scope.split(" ")))
+
+    # Deferred so that importing the app does not load LangChain/LangGraph
+    from app.graphs.supervisor import get_supervisor_graph
+    from app.graphs.callbacks import metrics_callback
+
+    agent = get_supervisor_graph(user_scopes, user_domains)
+    config = {"configurable": {"thread_id": user_id,
+                               "session": session},
+              "callbacks": [metrics_callback]}
+
+    return agent, config
+
+def interrupt_payload(state: Any) -> Optional[Dict[str, Any]]:
+    """The plan awaiting approval when the thread is paused in the feedback node, else None."""
+    if state.next and state.tasks and state.tasks[0].interrupts:
+        steps = state.tasks[0].interrupts[0].value["steps"]
+        return {"steps": [step.model_dump(mode="json") for step in steps]}
+
+    return None
+
+def execute_job(job: Job, session: Session) -> Optional[Dict[str, Any]]:
+    if job.kind == JobKind.REVISION:
+        return resume_plan(job.user_id, job.message, session, job=job)
+
+    agent, config = supervisor_run(job.user_id, session)
+
+    with leases_service.thread_lease(str(job.user_id)):
+        state = agent.get_state(config=config)
+        checkpoint_id = state.config.get("configurable", {}).get("checkpoint_id")
+
+        if job.attempts == 1:
+            job.start_checkpoint_id = checkpoint_id
+            session.add(job)
+            session.commit()
+
+        # A retry resumes from the last checkpoint written by this job, so finished steps are not run again
+        if job.attempts > 1 and checkpoint_id != job.start_checkpoint_id and state.next:
+            graph_input = None
+        else:
+            graph_input = {"goal": job.message, "user_id": job.user_id}
+
+        # Subgraph updates too, so progress and cancellation are checked after every inner node, not once per run
+        for namespace, chunk in agent.stream(graph_input, stream_mode="updates", config=config, subgraphs=True):
+            log.debug("job.chunk", job_id=job.id, namespace=namespace, chunk=chunk)
+            record_progress(job, node_path(namespace, next(iter(chunk))), session)
+
+        state = agent.get_state(config=config)
+
+    return interrupt_payload(state)
+
+def has_pending_plan(user_id: int, session: Session) -> bool:
+    agent, config = supervisor_run(user_id, session)
+    return interrupt_payload(agent.get_state(config=config)) is not None
+
+def resume_plan(user_id: int, feedback: str, session: Session, job: Optional[Job] = None) -> Optional[Dict[str, Any]]:
+    """Continue the conversation from its plan-approval interrupt.
+
+    Empty feedback approves the plan as is and only records the decision,
+    without an LLM call; any other text sends the plan back to the planner
+    for one revision, which runs as a REVISION job so that progress and
+    cancellation go through `job`. Returns the revised plan awaiting
+    approval, or None once the plan is approved. Raises NoPendingPlan when
+    the thread is not waiting for approval.
+    """
+    from langgraph.types import Command
+
+    agent, config = supervisor_run(user_id, session)
+
+    with leases_service.thread_lease(str(user_id)):
+        if not interrupt_payload(agent.get_state(config=config)):
+            raise NoPendingPlan()
+
+        with plan_resume_time.time():
+            for namespace, chunk in agent.stream(Command(resume=feedback), stream_mode="updates", config=config, subgraphs=True):
+                log.debug("plan.resume.chunk", user_id=user_id, namespace=namespace, chunk=chunk)
+
+                if job:
+                    record_progress(job, node_path(namespace, next(iter(chunk))), session)
+
+        plan_resumes.inc(decision="revise" if feedback else "approve")
+
+        return interrupt_payload(agent.get_state(config=config))
+
+def run_job(job_id: str) -> None:
+    with Session(engine) as session:
+        job = claim_job(job_id, session)
+
+        if not job:
+            return
+
+        job_queue_wait.observe((as_utc(job.started_at) - as_utc(job.created_at)).total_seconds())
+        jobs_running.inc()
+
+        try:
+            with job_run_time.time(), job_heartbeat(job_id), profiling.profile(job_id):
+                result = execute_job(job, session)
+
+            finish_job(job, JobStatus.SUCCEEDED, session, result=result)
+
+        except JobCancelled:
+            finish_job(job, JobStatus.CANCELLED, session)
+
+        # A revision whose plan was approved or replaced meanwhile; retrying cannot help
+        except NoPendingPlan:
+            finish_job(job, JobStatus.FAILED, session, error=NO_PLAN_ERROR)
+
+        except Exception as e:
+            session.rollback()
+            # The detail stays in the event log; clients only see a generic message
+            log.warning("job.attempt_failed", job_id=job_id, attempt=job.attempts, error=e)
+            error = JOB_BUSY_ERROR if isinstance(e, leases_service.LeaseTimeoutError) else JOB_FAILED_ERROR
+
+            if job.attempts < settings.job_max_attempts and not isinstance(e, leases_service.LeaseTimeoutError):
+                job.status = JobStatus.QUEUED
+                job.error = error
+                job.updated_at = utc_now()
+                session.add(job)
+                session.commit()
+                jobs_retried.inc(trigger="automatic")
+                admission.submit(job.user_id, job_id)
+
+            else:
+                finish_job(job, JobStatus.FAILED, session, error=error)
+
+        finally:
+            jobs_running.dec()
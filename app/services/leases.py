@@ -0,0 +1,112 @@
+from typing import Iterator, Optional
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+import os
+import socket
+import threading
+import time
+import uuid
+
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+
+from app.models.lease import ThreadLease
+from app.core.config import get_settings
+from app.core.database import engine
+from app.core.metrics import Counter, Gauge, Histogram
+
+settings = get_settings()
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+lease_waiting = Gauge("thread_lease_waiting", "Turns waiting for their conversation's lease.")
+lease_wait_time = Histogram("thread_lease_wait_seconds", "Time spent waiting for a conversation lease.")
+lease_timeouts = Counter("thread_lease_timeouts_total", "Turns rejected because their conversation stayed busy.")
+
+class LeaseTimeoutError(Exception):
+    pass
+
+def acquire_lease(thread_id: str, owner: str, ttl_seconds: float, session: Session) -> bool:
+    now = datetime.now(tz=timezone.utc)
+    expires_at = now + timedelta(seconds=ttl_seconds)
+
+    # Take over an expired lease left behind by a crashed worker
+    result = session.execute(update(ThreadLease)
+                             .where(ThreadLease.thread_id == thread_id, ThreadLease.expires_at < now)
+                             .values(owner=owner, expires_at=expires_at))
+    session.commit()
+
+    if result.rowcount:
+        return True
+
+    try:
+        session.add(ThreadLease(thread_id=thread_id, owner=owner, expires_at=expires_at))
+        session.commit()
+        return True
+
+    except IntegrityError:
+        session.rollback()
+        return False
+
+def renew_lease(thread_id: str, owner: str, ttl_seconds: float, session: Session) -> bool:
+    expires_at = datetime.now(tz=timezone.utc) + timedelta(seconds=ttl_seconds)
+    result = session.execute(update(ThreadLease)
+                             .where(ThreadLease.thread_id == thread_id, ThreadLease.owner == owner)
+                             .values(expires_at=expires_at))
+    session.commit()
+
+    return bool(result.rowcount)
+
+def release_lease(thread_id: str, owner: str, session: Session) -> None:
+    session.execute(delete(ThreadLease).where(ThreadLease.thread_id == thread_id, ThreadLease.owner == owner))
+    session.commit()
+
+def _keep_alive(thread_id: str, owner: str, stop: threading.Event) -> None:
+    interval = settings.thread_lease_ttl_seconds / 3
+
+    while not stop.wait(interval):
+        with Session(engine) as session:
+            renew_lease(thread_id, owner, settings.thread_lease_ttl_seconds, session)
+
+@contextmanager
+def thread_lease(thread_id: str, timeout: Optional[float] = None) -> Iterator[str]:
+    """Serialize turns of one conversation across threads and workers.
+
+    Waits up to `timeout` seconds for the lease and raises LeaseTimeoutError if
+    another turn still holds it. The lease is renewed while held and expires on
+    its own if the holder dies.
+    """
+    timeout = settings.thread_lease_timeout_seconds if timeout is None else timeout
+    owner = f"{WORKER_ID}:{uuid.uuid4().hex}"
+    start = time.monotonic()
+    poll_interval = settings.thread_lease_poll_seconds
+
+    lease_waiting.inc()
+    try:
+        with Session(engine) as session:
+            while not acquire_lease(thread_id, owner, settings.thread_lease_ttl_seconds, session):
+                if time.monotonic() - start >= timeout:
+                    lease_timeouts.inc()
+                    raise LeaseTimeoutError(f"Conversation {thread_id} is busy")
+
+                time.sleep(poll_interval)
+                poll_interval = min(poll_interval * 2, 1.0)
+
+    finally:
+        lease_waiting.dec()
+        lease_wait_time.observe(time.monotonic() - start)
+
+    stop = threading.Event()
+    keep_alive = threading.Thread(target=_keep_alive, args=(thread_id, owner, stop), daemon=True)
+    keep_alive.start()
+
+    try:
+        yield owner
+
+    finally:
+        stop.set()
+        keep_alive.join()
+
+        with Session(engine) as session:
+            release_lease(thread_id, owner, session)
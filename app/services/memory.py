@@ -0,0 +1,187 @@
+from typing import Any, Callable, Dict, List
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+import importlib
+import json
+import os
+import re
+import threading
+import zlib
+
+import numpy as np
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+SEGMENT_MAX_CHARS = 1000
+
+EmbeddingFunction = Callable[[List[str]], np.ndarray]
+
+def hashing_embedding(texts: List[str]) -> np.ndarray:
+    """Offline embedding: signed feature hashing of words and word pairs.
+
+    Needs no model or network, is stable across processes (crc32, not
+    `hash`) and is good enough to match memories sharing vocabulary with
+    the query. Swap in a real model through `memory_embedding_function`.
+    """
+    vectors = np.zeros((len(texts), settings.memory_embedding_dim), dtype=np.float32)
+
+    for row, text in enumerate(texts):
+        tokens = TOKEN_PATTERN.findall(text.lower())
+
+        for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+            h = zlib.crc32(feature.encode("utf-8"))
+            vectors[row, h % settings.memory_embedding_dim] += 1.0 if h & 0x80000000 else -1.0
+
+    # Sublinear term frequency so one repeated word does not dominate
+    return np.sign(vectors) * np.log1p(np.abs(vectors))
+
+@lru_cache
+def get_embedding_function(path: str) -> EmbeddingFunction:
+    module_name, _, attribute = path.rpartition(".")
+    return getattr(importlib.import_module(module_name), attribute)
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+class MemoryStore:
+    """Per-user long-term memory backed by a NumPy matrix of unit vectors.
+
+    Vectors live in `<name>.npy` and the records they index in
+    `<name>.json`; both are rewritten atomically on every add. Search is a
+    single matrix-vector product (cosine similarity) followed by a partial
+    sort. Near-duplicates of stored memories are skipped, and records are
+    re-embedded from their text when the embedding function or dimension
+    changes.
+    """
+
+    def __init__(self, path: Path, embedding_function: str, embedding_dim: int):
+        self.path = path
+        self.embedding_function = embedding_function
+        self.embedding_dim = embedding_dim
+        self._embed = get_embedding_function(embedding_function)
+        self._lock = threading.Lock()
+        self.records: List[Dict[str, Any]] = []
+        self.vectors = np.zeros((0, 0), dtype=np.float32)
+
+        vectors_path, records_path = self.path.with_suffix(".npy"), self.path.with_suffix(".json")
+
+        if vectors_path.exists() and records_path.exists():
+            stored = json.loads(records_path.read_text(encoding="utf-8"))
+            self.records = stored["records"]
+
+            if stored["embedding_function"] == embedding_function and stored.get("embedding_dim") == embedding_dim:
+                self.vectors = np.load(vectors_path)
+
+            elif self.records:
+                self.vectors = normalize(self._embed([record["text"] for record in self.records]))
+                self._save()
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def _save(self) -> None:
+        vectors_path, records_path = self.path.with_suffix(".npy"), self.path.with_suffix(".json")
+        tmp_vectors, tmp_records = vectors_path.with_suffix(".npy.tmp"), records_path.with_suffix(".json.tmp")
+
+        with open(tmp_vectors, "wb") as f:
+            np.save(f, self.vectors)
+
+        tmp_records.write_text(json.dumps({"embedding_function": self.embedding_function,
+                                           "embedding_dim": self.embedding_dim,
+                                           "records": self.records}),
+                               encoding="utf-8")
+
+        os.replace(tmp_vectors, vectors_path)
+        os.replace(tmp_records, records_path)
+
+    def add(self, texts: List[str], kind: str) -> int:
+        texts = [text.strip() for text in texts if text and text.strip()]
+
+        if not texts:
+            return 0
+
+        vectors = normalize(self._embed(texts))
+        created_at = datetime.now(tz=timezone.utc).isoformat()
+
+        with self._lock:
+            existing = self.vectors if len(self.vectors) else np.zeros((0, vectors.shape[1]), dtype=np.float32)
+            keep = []
+
+            for i, vector in enumerate(vectors):
+                known = np.vstack([existing, vectors[keep]])
+
+                if len(known) and float(np.max(known @ vector)) >= settings.memory_duplicate_score:
+                    continue
+
+                keep.append(i)
+
+            if not keep:
+                return 0
+
+            self.vectors = np.vstack([existing, vectors[keep]])
+            self.records.extend({"kind": kind, "text": texts[i], "created_at": created_at} for i in keep)
+            self._save()
+
+        return len(keep)
+
+    def search(self, query: str, k: int, min_score: float = 0.0) -> List[Dict[str, Any]]:
+        with self._lock:
+            vectors, records = self.vectors, list(self.records)
+
+        if not records or not query.strip() or k <= 0:
+            return []
+
+        scores = vectors @ normalize(self._embed([query]))[0]
+        k = min(k, len(records))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return [{**records[i], "score": float(scores[i])} for i in top if scores[i] >= min_score]
+
+_stores: Dict[int, MemoryStore] = {}
+_stores_lock = threading.Lock()
+
+def get_memory_store(user_id: int) -> MemoryStore:
+    with _stores_lock:
+        if user_id not in _stores:
+            Path(settings.memory_dir).mkdir(parents=True, exist_ok=True)
+            _stores[user_id] = MemoryStore(Path(settings.memory_dir) / f"user_{user_id}",
+                                           settings.memory_embedding_function,
+                                           settings.memory_embedding_dim)
+
+    return _stores[user_id]
+
+def conversation_segments(messages: List[BaseMessage]) -> List[str]:
+    """One text per turn: the user's message and the final assistant answer, without tool traffic."""
+    segments = []
+    question, answer = None, None
+
+    for message in messages + [HumanMessage(content="")]:
+        if isinstance(message, HumanMessage):
+            if question:
+                segment = f"User: {question}" + (f"\nAssistant: {answer}" if answer else "")
+                segments.append(segment[:SEGMENT_MAX_CHARS])
+
+            question, answer = str(message.content), None
+
+        elif isinstance(message, AIMessage) and message.content and not message.tool_calls:
+            answer = str(message.content)
+
+    return segments
+
+def archive_conversation(user_id: int, messages: List[BaseMessage], facts: List[str]) -> int:
+    """Store the key facts and per-turn segments of messages that are about to be summarized away."""
+    store = get_memory_store(user_id)
+    return store.add(facts, "fact") + store.add(conversation_segments(messages), "segment")
+
+def recall(user_id: int, query: str) -> List[str]:
+    return [memory["text"] for memory in get_memory_store(user_id).search(query,
+                                                                           settings.memory_top_k,
+                                                                           settings.memory_min_score)]
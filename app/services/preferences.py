@@ -0,0 +1,64 @@
+from typing import Any, Callable, Dict, List
+import re
+
+from langchain_core.messages import BaseMessage, HumanMessage
+
+from app.models.user import UserPreferences
+from app.core.output import ChatInsights
+
+PreferenceClassifier = Callable[[List[BaseMessage]], bool]
+
+# Phrases that state a standing preference; words that also appear in one-off requests
+# ("I want to...", "email Bob", "set reminders") only count inside such a phrase
+PREFERENCE_PATTERNS = [
+    r"\bcall me\b",
+    r"\bmy name is\b",
+    r"\bmy (pro)?nouns\b",
+    r"\b(he/him|she/her|they/them)\b",
+    r"\bi(?:'d| would)? (really )?(prefer|hate|dislike)\b",
+    r"\b(from now on|going forward|by default)\b",
+    r"\b(always|never|don't|do not|stop) (call|use|send|remind|schedule|book)\b",
+    r"\btime ?zone\b",
+    r"\bi(?:'m| am) (based|located|living) in\b",
+    r"\bi live in\b",
+    r"\b(utc|gmt|est|pst|cet)\b",
+    r"\b(be|keep it|more|less) (formal|casual|concise|brief|detailed)\b",
+    r"\b(via|by|over|through) (email|slack|whatsapp|sms|telegram)\b",
+    r"\b(daily summary|every morning|each morning|every evening)\b",
+    r"\b\d+\s*(min|mins|minutes|hours?)\s+(before|buffer|between|long)\b",
+    r"\b(buffer time|default reminders?|meeting length)\b",
+]
+
+_preference_regex = re.compile("|".join(PREFERENCE_PATTERNS), re.IGNORECASE)
+
+def keyword_preference_classifier(messages: List[BaseMessage]) -> bool:
+    for message in messages:
+        if isinstance(message, HumanMessage) and _preference_regex.search(str(message.content)):
+            return True
+
+    return False
+
+_classifier: PreferenceClassifier = keyword_preference_classifier
+
+def set_preference_classifier(classifier: PreferenceClassifier) -> None:
+    global _classifier
+    _classifier = classifier
+
+def has_preference_signal(messages: List[BaseMessage]) -> bool:
+    return _classifier(messages)
+
+def diff_preferences(current: UserPreferences, extracted: ChatInsights) -> Dict[str, Any]:
+    changes = {}
+
+    for field, value in extracted.model_dump(exclude_unset=True, exclude_none=True).items():
+        if field not in UserPreferences.model_fields:
+            continue
+
+        # UserPreferences stores list preferences as comma separated text
+        if isinstance(value, list):
+            value = ", ".join(value)
+
+        if getattr(current, field) != value:
+            changes[field] = value
+
+    return changes
@@ -0,0 +1,376 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import json
+import threading
+import time
+import zlib
+
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from app.models.summary import DailySummary
+from app.models.user import UserPreferences
+from app.core.config import get_settings
+from app.core.events import get_event_logger
+from app.core.database import engine
+from app.core.metrics import Counter, Gauge, Histogram
+import app.services.calendars as calendars_service
+
+settings = get_settings()
+log = get_event_logger(__name__)
+
+Clock = Callable[[], datetime]
+Deliver = Callable[[DailySummary], None]
+
+LAG_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600)
+LEAD_BUCKETS = (60, 300, 600, 900, 1800, 2700, 3600, 7200)
+
+summaries_generated = Counter("daily_summary_generated_total", "Daily summaries generated.")
+summary_failures = Counter("daily_summary_failures_total", "Daily summaries that failed to generate or deliver.", ["stage"])
+generation_latency = Histogram("daily_summary_generation_seconds", "Time to gather data for and write one daily summary.")
+generation_lead = Histogram("daily_summary_generation_lead_seconds", "How long before its send time a summary was ready.",
+                            buckets=LEAD_BUCKETS)
+delivery_lag = Histogram("daily_summary_delivery_lag_seconds", "Delay between a summary's send time and its delivery.",
+                         buckets=LAG_BUCKETS)
+bucket_size = Histogram("daily_summary_bucket_size", "Summaries claimed per send-time bucket in one tick.",
+                        buckets=(1, 5, 10, 50, 100, 500, 1000))
+summaries_in_flight = Gauge("daily_summary_in_flight", "Daily summaries being generated.")
+
+class SummaryDataUnavailable(Exception):
+    pass
+
+def utc_now() -> datetime:
+    return datetime.now(tz=timezone.utc)
+
+def as_utc(value: datetime) -> datetime:
+    # SQLite returns datetimes without tzinfo; everything is stored in UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+def rfc3339(value: datetime) -> str:
+    return value.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+def user_timezone(preferences: UserPreferences) -> ZoneInfo:
+    try:
+        return ZoneInfo(preferences.timezone or "UTC")
+
+    except (ZoneInfoNotFoundError, ValueError):
+        return ZoneInfo("UTC")
+
+def send_time(preferences: UserPreferences, day: date) -> datetime:
+    """UTC instant of the user's send time on their local `day`."""
+    if preferences.daily_summary_notification_time:
+        local_time = preferences.daily_summary_notification_time.time()
+    else:
+        local_time = dt_time.fromisoformat(settings.daily_summary_default_time)
+
+    return datetime.combine(day, local_time, tzinfo=user_timezone(preferences)).astimezone(timezone.utc)
+
+def generation_time(user_id: int, scheduled_for: datetime) -> datetime:
+    # Each user gets a stable slot in the first three quarters of the lead window,
+    # so generation is spread out instead of spiking on the hour; the last quarter
+    # is slack for retries and slow calls
+    window = max(int(settings.daily_summary_lead_minutes * 60 * 0.75), 1)
+    offset = zlib.crc32(str(user_id).encode()) % window
+
+    return scheduled_for - timedelta(minutes=settings.daily_summary_lead_minutes) + timedelta(seconds=offset)
+
+def send_bucket(scheduled_for: datetime) -> datetime:
+    bucket_seconds = settings.daily_summary_bucket_minutes * 60
+    return datetime.fromtimestamp(scheduled_for.timestamp() // bucket_seconds * bucket_seconds, tz=timezone.utc)
+
+def due_summaries(preferences: UserPreferences, now: datetime) -> List[Tuple[date, datetime]]:
+    """(local day, send time) pairs whose generation slot has come and whose send time is not too far gone."""
+    local_today = now.astimezone(user_timezone(preferences)).date()
+    max_lateness = timedelta(minutes=settings.daily_summary_max_lateness_minutes)
+    due = []
+
+    for day in (local_today - timedelta(days=1), local_today, local_today + timedelta(days=1)):
+        scheduled_for = send_time(preferences, day)
+
+        if generation_time(preferences.user_id, scheduled_for) <= now and now - scheduled_for <= max_lateness:
+            due.append((day, scheduled_for))
+
+    return due
+
+def fetch_due_tasks(user_id: int, session: Session, until: datetime) -> List[Dict[str, Any]]:
+    """Every open task due by `until`, across all pages of every list.
+
+    Raises SummaryDataUnavailable when Google fails, so a failed fetch is
+    retried instead of being summarized as a day without tasks.
+    """
+    # Deferred: the task tools module loads LangChain
+    from app.tools.google.tasks import _list_tasklists, _list_tasks
+
+    tasklists = _list_tasklists(user_id, session)
+
+    if tasklists is None:
+        raise SummaryDataUnavailable("Task lists could not be loaded")
+
+    tasks = []
+
+    for tasklist in tasklists:
+        due = _list_tasks(tasklist.id, {"showCompleted": "false", "dueMax": rfc3339(until)}, user_id, session)
+
+        if due is None:
+            raise SummaryDataUnavailable(f"Tasks of list {tasklist.id} could not be loaded")
+
+        tasks.extend({"list": tasklist.title, "title": t.title, "due": t.due, "notes": t.notes} for t in due)
+
+    return tasks
+
+def fetch_events(user_id: int, session: Session, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+    """The day's events across the user's calendars; raises SummaryDataUnavailable if any calendar fails."""
+    try:
+        events = calendars_service.merged_events(user_id, session, None, start, end, max_results=250, strict=True)
+
+    except calendars_service.CalendarUnavailable as e:
+        raise SummaryDataUnavailable(str(e)) from e
+
+    return [{"summary": e.get("summary"), "start": e.get("start"), "end": e.get("end"), "location": e.get("location"),
+             "calendar": e.get("calendarId")}
+            for e in events]
+
+def write_summary(preferences: UserPreferences, day: date, tasks: List[Dict[str, Any]], events: List[Dict[str, Any]]) -> str:
+    from langchain_core.messages import HumanMessage, SystemMessage
+
+    from app.core.llm import get_chat_model
+    from app.graphs.prompts import DAILY_SUMMARY_PROMPT
+
+    system_prompt = DAILY_SUMMARY_PROMPT.format(date=day.isoformat(),
+                                                summary_preferences=preferences.summary_preferences or "none",
+                                                tone_preferences=preferences.tone_preferences or "none",
+                                                timezone=preferences.timezone or "UTC")
+    data = json.dumps({"due_tasks": tasks, "events": events}, default=str)
+    response = get_chat_model("daily_summary").invoke([SystemMessage(content=system_prompt), HumanMessage(content=data)])
+
+    return response.content
+
+def log_delivery(summary: DailySummary) -> None:
+    # Users read delivered summaries through GET /api/summaries; this only records the delivery
+    log.info("daily_summary.delivered", user_id=summary.user_id, summary_date=summary.summary_date)
+
+def get_delivered_summaries(user_id: int, session: Session, limit: int) -> List[DailySummary]:
+    return session.exec(select(DailySummary)
+                        .where(DailySummary.user_id == user_id, DailySummary.delivered_at != None)
+                        .order_by(DailySummary.summary_date.desc())
+                        .limit(limit)).all()
+
+class DailySummaryScheduler:
+    """Generates each opted-in user's daily summary ahead of their local send time and delivers it on time.
+
+    Every `tick()` claims the summaries whose generation slot has come, soonest
+    send-time bucket first, and hands them to a bounded worker pool; summaries
+    that are ready and due are then delivered. Generation claims are
+    DailySummary rows and delivery is claimed by setting `delivered_at`, so
+    several workers can run the scheduler side by side. A failed
+    generation drops its claim and is retried after an exponential backoff,
+    starting at `daily_summary_retry_seconds`.
+    The clock is injectable so a fake clock can drive it in tests and benchmarks.
+    """
+
+    def __init__(self, clock: Clock = utc_now, deliver: Deliver = log_delivery, workers: Optional[int] = None):
+        self.clock = clock
+        self.deliver = deliver
+        self.executor = ThreadPoolExecutor(max_workers=workers or settings.daily_summary_workers,
+                                           thread_name_prefix="daily-summary")
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # (user_id, day) -> (failed attempts, earliest retry)
+        self._retries: Dict[Tuple[int, date], Tuple[int, datetime]] = {}
+        self._retries_lock = threading.Lock()
+
+    def _backing_off(self, user_id: int, day: date, now: datetime) -> bool:
+        with self._retries_lock:
+            retry = self._retries.get((user_id, day))
+
+        return retry is not None and retry[1] > now
+
+    def _record_failure(self, user_id: int, day: date) -> None:
+        with self._retries_lock:
+            failures = self._retries.get((user_id, day), (0, None))[0] + 1
+            delay = settings.daily_summary_retry_seconds * 2 ** min(failures - 1, 5)
+            self._retries[(user_id, day)] = (failures, self.clock() + timedelta(seconds=delay))
+
+    def tick(self) -> List[Future]:
+        now = self.clock()
+        futures = self.schedule_generation(now)
+        self.deliver_due(now)
+
+        return futures
+
+    def schedule_generation(self, now: datetime) -> List[Future]:
+        buckets: Dict[datetime, List[Tuple[UserPreferences, date, datetime]]] = {}
+
+        # Days past their lateness window are never retried again
+        with self._retries_lock:
+            self._retries = {key: retry for key, retry in self._retries.items() if key[1] >= (now - timedelta(days=2)).date()}
+
+        with Session(engine) as session:
+            # Detached copies: every claim commits this session, which expires the loaded rows
+            opted_in = [UserPreferences(**preferences.model_dump())
+                        for preferences in session.exec(select(UserPreferences)
+                                                        .where(UserPreferences.daily_summary_notification == True)).all()]
+            claimed = set(session.exec(select(DailySummary.user_id, DailySummary.summary_date)
+                                       .where(DailySummary.summary_date >= (now - timedelta(days=2)).date())).all())
+
+            for preferences in opted_in:
+                for day, scheduled_for in due_summaries(preferences, now):
+                    if (preferences.user_id, day) not in claimed and not self._backing_off(preferences.user_id, day, now):
+                        buckets.setdefault(send_bucket(scheduled_for), []).append((preferences, day, scheduled_for))
+
+            futures = []
+
+            for bucket in sorted(buckets):
+                claims = [claim for claim in buckets[bucket] if self._claim(claim[0].user_id, claim[1], claim[2], session)]
+                bucket_size.observe(len(claims))
+
+                for preferences, day, scheduled_for in claims:
+                    futures.append(self.executor.submit(self._generate, preferences, day, scheduled_for))
+
+        return futures
+
+    def _claim(self, user_id: int, day: date, scheduled_for: datetime, session: Session) -> bool:
+        try:
+            session.add(DailySummary(user_id=user_id, summary_date=day, scheduled_for=scheduled_for))
+            session.commit()
+            return True
+
+        except IntegrityError:
+            session.rollback()
+            return False
+
+    def _generate(self, preferences: UserPreferences, day: date, scheduled_for: datetime) -> Optional[str]:
+        user_id = preferences.user_id
+        tz = user_timezone(preferences)
+        day_start = datetime.combine(day, dt_time.min, tzinfo=tz)
+        day_end = day_start + timedelta(days=1)
+        start = time.perf_counter()
+
+        summaries_in_flight.inc()
+        try:
+            with Session(engine) as session:
+                tasks = fetch_due_tasks(user_id, session, day_end)
+                events = fetch_events(user_id, session, day_start, day_end)
+
+            content = write_summary(preferences, day, tasks, events)
+
+        except Exception:
+            summary_failures.inc(stage="generate")
+            log.exception("daily_summary.generate_failed", user_id=user_id, summary_date=day)
+            self._record_failure(user_id, day)
+
+            # Drop the claim so a later tick retries within the lead window
+            with Session(engine) as session:
+                session.execute(delete(DailySummary).where(DailySummary.user_id == user_id, DailySummary.summary_date == day))
+                session.commit()
+
+            return None
+
+        finally:
+            summaries_in_flight.dec()
+
+        generated_at = self.clock()
+
+        with self._retries_lock:
+            self._retries.pop((user_id, day), None)
+
+        with Session(engine) as session:
+            summary = session.exec(select(DailySummary)
+                                   .where(DailySummary.user_id == user_id, DailySummary.summary_date == day)).first()
+            summary.content = content
+            summary.generated_at = generated_at
+            session.add(summary)
+            session.commit()
+
+        generation_latency.observe(time.perf_counter() - start)
+        generation_lead.observe(max((scheduled_for - generated_at).total_seconds(), 0))
+        summaries_generated.inc()
+
+        return content
+
+    def deliver_due(self, now: datetime) -> int:
+        delivered = 0
+
+        with Session(engine) as session:
+            ready = session.exec(select(DailySummary)
+                                 .where(DailySummary.delivered_at == None,
+                                        DailySummary.generated_at != None,
+                                        DailySummary.scheduled_for <= now)
+                                 .order_by(DailySummary.scheduled_for)).all()
+
+            for summary in ready:
+                # Another worker may have delivered it since the query
+                if not self._claim_delivery(summary.id, now, session):
+                    continue
+
+                try:
+                    self.deliver(summary)
+
+                except Exception:
+                    summary_failures.inc(stage="deliver")
+                    log.exception("daily_summary.deliver_failed", summary_id=summary.id)
+                    self._release_delivery(summary.id, now, session)
+                    continue
+
+                delivery_lag.observe((now - as_utc(summary.scheduled_for)).total_seconds())
+                delivered += 1
+
+        return delivered
+
+    def _claim_delivery(self, summary_id: int, now: datetime, session: Session) -> bool:
+        result = session.execute(update(DailySummary)
+                                 .where(DailySummary.id == summary_id, DailySummary.delivered_at == None)
+                                 .values(delivered_at=now))
+        session.commit()
+
+        return result.rowcount == 1
+
+    def _release_delivery(self, summary_id: int, now: datetime, session: Session) -> None:
+        # A later tick retries the delivery
+        session.execute(update(DailySummary)
+                        .where(DailySummary.id == summary_id, DailySummary.delivered_at == now)
+                        .values(delivered_at=None))
+        session.commit()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.tick()
+
+            except Exception:
+                log.exception("daily_summary.tick_failed")
+
+            self._stop.wait(settings.daily_summary_tick_seconds)
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="daily-summary-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+        if self._thread:
+            self._thread.join()
+
+        self.executor.shutdown(wait=True)
+
+scheduler: Optional[DailySummaryScheduler] = None
+
+def start_scheduler() -> None:
+    global scheduler
+
+    if settings.daily_summary_enabled and scheduler is None:
+        scheduler = DailySummaryScheduler()
+        scheduler.start()
+
+def stop_scheduler() -> None:
+    global scheduler
+
+    if scheduler is not None:
+        scheduler.stop()
+        scheduler = None
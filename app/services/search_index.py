@@ -0,0 +1,282 @@
+from typing import Any, Collection, Dict, List, Optional, Tuple
+from pathlib import Path
+from urllib.parse import unquote
+import re
+import sqlite3
+import threading
+import time
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+class SearchIndex:
+    """Per-user SQLite FTS5 index over task and event text.
+
+    Rows are upserted by resource id as Google responses pass through
+    `record_google_response`, so the index follows what the tools see. A
+    complete listing of a task list or calendar replaces its rows, which
+    drops what was deleted outside the agent, and each domain counts as
+    built for `search_index_rebuild_seconds` before it is listed again.
+    Matching uses prefix terms and BM25 ranking with titles weighted
+    above the free text.
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+
+        # Indexes written before events carried their calendar are dropped and rebuilt on the next search
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(events_fts)")]
+
+        if columns and "calendar_id" not in columns:
+            self._conn.executescript("""
+                DROP TABLE events_fts;
+                DELETE FROM index_state WHERE domain = 'events';
+            """)
+
+        self._conn.executescript("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+                id UNINDEXED, tasklist_id UNINDEXED, status UNINDEXED, due UNINDEXED,
+                title, notes, tokenize='porter unicode61');
+            CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(
+                id UNINDEXED, calendar_id UNINDEXED, start UNINDEXED, end UNINDEXED,
+                summary, description, location, tokenize='porter unicode61');
+            CREATE TABLE IF NOT EXISTS index_state (domain TEXT PRIMARY KEY, built_at REAL NOT NULL);
+        """)
+        self._conn.commit()
+
+    def upsert_tasks(self, tasklist_id: str, tasks: List[Dict[str, Any]], replace: bool = False) -> None:
+        """Index `tasks`; with `replace` they are the whole list and every other row of it is dropped."""
+        rows = [(t["id"], tasklist_id, t.get("status"), t.get("due"), t.get("title") or "", t.get("notes") or "")
+                for t in tasks if t.get("id")]
+
+        with self._lock:
+            if replace:
+                self._conn.execute("DELETE FROM tasks_fts WHERE tasklist_id = ?", (tasklist_id,))
+
+            self._conn.executemany("DELETE FROM tasks_fts WHERE id = ?", [(row[0],) for row in rows])
+            self._conn.executemany("INSERT INTO tasks_fts (id, tasklist_id, status, due, title, notes) VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+
+    def remove_tasklist(self, tasklist_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM tasks_fts WHERE tasklist_id = ?", (tasklist_id,))
+            self._conn.commit()
+
+    def retain_tasklists(self, tasklist_ids: Collection[str]) -> None:
+        """Drop every task whose list is not in `tasklist_ids`, e.g. lists deleted in another app."""
+        with self._lock:
+            self._conn.execute(f"DELETE FROM tasks_fts WHERE tasklist_id NOT IN ({', '.join('?' * len(tasklist_ids))})",
+                               tuple(tasklist_ids))
+            self._conn.commit()
+
+    def remove_task(self, task_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM tasks_fts WHERE id = ?", (task_id,))
+            self._conn.commit()
+
+    def remove_completed_tasks(self, tasklist_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM tasks_fts WHERE tasklist_id = ? AND status = 'completed'", (tasklist_id,))
+            self._conn.commit()
+
+    def upsert_events(self, calendar_id: str, events: List[Dict[str, Any]], replace: bool = False) -> None:
+        """Index `events`; with `replace` they are the whole calendar and every other row of it is dropped."""
+        rows = []
+
+        for e in events:
+            if not e.get("id"):
+                continue
+
+            # Cancelled instances come back in incremental listings and should disappear
+            if e.get("status") == "cancelled":
+                rows.append((e["id"], None))
+                continue
+
+            start = e.get("start") or {}
+            end = e.get("end") or {}
+            rows.append((e["id"], (start.get("dateTime") or start.get("date"), end.get("dateTime") or end.get("date"),
+                                   e.get("summary") or "", e.get("description") or "", e.get("location") or "")))
+
+        # Shared events keep one id across calendars, so rows are keyed by both
+        with self._lock:
+            if replace:
+                self._conn.execute("DELETE FROM events_fts WHERE calendar_id = ?", (calendar_id,))
+
+            self._conn.executemany("DELETE FROM events_fts WHERE id = ? AND calendar_id = ?",
+                                   [(event_id, calendar_id) for event_id, _ in rows])
+            self._conn.executemany("INSERT INTO events_fts (id, calendar_id, start, end, summary, description, location) "
+                                   "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                   [(event_id, calendar_id, *values) for event_id, values in rows if values])
+            self._conn.commit()
+
+    def remove_event(self, calendar_id: str, event_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM events_fts WHERE id = ? AND calendar_id = ?", (event_id, calendar_id))
+            self._conn.commit()
+
+    def retain_calendars(self, calendar_ids: Collection[str]) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM events_fts WHERE calendar_id NOT IN ({', '.join('?' * len(calendar_ids))})",
+                               tuple(calendar_ids))
+            self._conn.commit()
+
+    def is_built(self, domain: str) -> bool:
+        """Whether `domain` was fully listed within the last `search_index_rebuild_seconds`."""
+        with self._lock:
+            row = self._conn.execute("SELECT built_at FROM index_state WHERE domain = ?", (domain,)).fetchone()
+
+        return row is not None and time.time() - row[0] < settings.search_index_rebuild_seconds
+
+    def mark_built(self, domain: str) -> None:
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO index_state (domain, built_at) VALUES (?, ?)", (domain, time.time()))
+            self._conn.commit()
+
+    def _match(self, table: str, query: str) -> Optional[str]:
+        # Every word must match; if nothing does, fall back to any word and let BM25 rank it
+        all_terms = match_expression(query, " AND ")
+
+        if not all_terms:
+            return None
+
+        found = self._conn.execute(f"SELECT 1 FROM {table} WHERE {table} MATCH ? LIMIT 1", (all_terms,)).fetchone()
+        return all_terms if found else match_expression(query, " OR ")
+
+    def search_tasks(self, query: str, limit: int, offset: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            match = self._match("tasks_fts", query)
+
+            if not match:
+                return []
+
+            rows = self._conn.execute("""SELECT id, tasklist_id, status, due, title,
+                                                snippet(tasks_fts, 5, '', '', '...', 12)
+                                         FROM tasks_fts WHERE tasks_fts MATCH ?
+                                         ORDER BY bm25(tasks_fts, 0, 0, 0, 0, 10.0, 1.0)
+                                         LIMIT ? OFFSET ?""", (match, limit, offset)).fetchall()
+
+        return [{"id": r[0], "tasklist_id": r[1], "status": r[2], "due": r[3], "title": r[4], "notes": r[5] or None}
+                for r in rows]
+
+    def search_events(self, query: str, limit: int, offset: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            match = self._match("events_fts", query)
+
+            if not match:
+                return []
+
+            rows = self._conn.execute("""SELECT id, calendar_id, start, end, summary, location,
+                                                snippet(events_fts, 5, '', '', '...', 12)
+                                         FROM events_fts WHERE events_fts MATCH ?
+                                         ORDER BY bm25(events_fts, 0, 0, 0, 0, 10.0, 1.0, 2.0)
+                                         LIMIT ? OFFSET ?""", (match, limit, offset)).fetchall()
+
+        return [{"id": r[0], "calendarId": r[1], "start": r[2], "end": r[3], "summary": r[4], "location": r[5] or None,
+                 "description": r[6] or None}
+                for r in rows]
+
+def match_expression(query: str, operator: str) -> str:
+    # Quote every word so user text cannot inject FTS5 syntax, and prefix-match it
+    return operator.join(f'"{token}"*' for token in TOKEN_PATTERN.findall(query.lower()))
+
+_indexes: Dict[int, SearchIndex] = {}
+_indexes_lock = threading.Lock()
+
+def get_search_index(user_id: int) -> SearchIndex:
+    with _indexes_lock:
+        if user_id not in _indexes:
+            Path(settings.search_index_dir).mkdir(parents=True, exist_ok=True)
+            _indexes[user_id] = SearchIndex(str(Path(settings.search_index_dir) / f"user_{user_id}.sqlite"))
+
+    return _indexes[user_id]
+
+def _task_path(url: str) -> Optional[List[str]]:
+    prefix = settings.google_tasks_task_endpoint.rstrip("/") + "/"
+    return url[len(prefix):].strip("/").split("/") if url.startswith(prefix) else None
+
+def _tasklist_path(url: str) -> Optional[List[str]]:
+    prefix = settings.google_tasks_tasklist_endpoint.rstrip("/") + "/"
+    return url[len(prefix):].strip("/").split("/") if url.startswith(prefix) else None
+
+# A task listing with only these parameters, on a single page, is the whole list
+UNFILTERED_TASK_PARAMS = {"maxResults", "showHidden", "showCompleted"}
+
+def _complete_listing(params: Dict[str, Any], data: Dict[str, Any], unfiltered: Collection[str]) -> bool:
+    return ("pageToken" not in params and not data.get("nextPageToken") and set(params) <= set(unfiltered)
+            and str(params.get("showCompleted", "true")).lower() != "false")
+
+def _event_path(url: str) -> Optional[Tuple[str, List[str]]]:
+    # The primary calendar's configured endpoint, or {calendars endpoint}/{calendar id}/events as built by events_url
+    endpoint = settings.google_calendar_events_endpoint.rstrip("/")
+
+    if url == endpoint or url.startswith(endpoint + "/"):
+        rest = url[len(endpoint):].strip("/")
+        return "primary", rest.split("/") if rest else []
+
+    prefix = settings.google_calendar_calendars_endpoint.rstrip("/") + "/"
+
+    if not url.startswith(prefix):
+        return None
+
+    calendar_id, _, rest = url[len(prefix):].partition("/")
+    parts = rest.strip("/").split("/")
+
+    if not calendar_id or parts[0] != "events":
+        return None
+
+    return unquote(calendar_id), parts[1:]
+
+def record_google_response(user_id: int, method: str, url: str, params: Dict[str, Any], data: Dict[str, Any]) -> None:
+    """Apply a successful Google Tasks/Calendar response to the user's search index."""
+    index = get_search_index(user_id)
+    tasklist_path = _tasklist_path(url)
+
+    # users/@me/lists/{tasklist_id}
+    if tasklist_path:
+        if method == "DELETE":
+            index.remove_tasklist(tasklist_path[0])
+
+        return
+
+    task_path = _task_path(url)
+
+    # {tasklist_id}/tasks[/{task_id}[/move]] or {tasklist_id}/clear
+    if task_path:
+        tasklist_id = task_path[0]
+
+        if task_path[1:] == ["clear"]:
+            index.remove_completed_tasks(tasklist_id)
+
+        elif task_path[1:] == ["tasks"] and method == "GET":
+            index.upsert_tasks(tasklist_id, data.get("items", []), replace=_complete_listing(params, data, UNFILTERED_TASK_PARAMS))
+
+        elif len(task_path) >= 3 and method == "DELETE":
+            index.remove_task(task_path[2])
+
+        elif task_path[3:] == ["move"]:
+            index.upsert_tasks(params.get("destinationTasklist", tasklist_id), [data])
+
+        elif len(task_path) >= 3 or method == "POST":
+            index.upsert_tasks(tasklist_id, [data])
+
+        return
+
+    event_path = _event_path(url)
+
+    if event_path is None:
+        return
+
+    calendar_id, event_path = event_path
+
+    if not event_path and method == "GET":
+        index.upsert_events(calendar_id, data.get("items", []))
+
+    elif event_path and method == "DELETE":
+        index.remove_event(calendar_id, event_path[0])
+
+    else:
+        index.upsert_events(calendar_id, [data])
@@ -1,12 +1,23 @@
 from datetime import datetime
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.models.token import Token
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# Keyed by user_id; entries are field dicts and every hit builds a fresh, detached Token. The constructor
+# skips validation, so the stored refresh token is not encrypted again. Invalidation is per process,
+# so a token refreshed by another worker is seen here after token_cache_ttl_seconds.
+token_cache = TTLCache("token", settings.token_cache_ttl_seconds, settings.cache_max_entries)
 
 def insert_token(token: Token, session: Session) -> Token:
     session.add(token)
     session.commit()
     session.refresh(token)
+    token_cache.invalidate(token.user_id)
     
     return token
 
@@ -14,9 +25,17 @@ def get_token(token_id: int, session: Session) -> Token:
     return session.get(Token, token_id)
 
 def get_token_by_user_id(user_id: int, session: Session) -> Token:
+    cached = token_cache.get(user_id)
+    
+    if cached is not None:
+        return Token(**cached)
+    
     query = select(Token).where(Token.user_id == user_id)
     token = session.exec(query).first()
     
+    if token:
+        token_cache.set(user_id, token.model_dump())
+    
     return token
 
 def update_token(token_id: int, token: Token, session: Session) -> Token:
@@ -26,5 +45,42 @@ def update_token(token_id: int, token: Token, session: Session) -> Token:
     session.add(db_token)
     session.commit()
     session.refresh(db_token)
+    token_cache.invalidate(db_token.user_id)
+    
+    return db_token
+
+async def insert_token_async(token: Token, session: AsyncSession) -> Token:
+    session.add(token)
+    await session.commit()
+    await session.refresh(token)
+    token_cache.invalidate(token.user_id)
+    
+    return token
+
+async def get_token_async(token_id: int, session: AsyncSession) -> Token:
+    return await session.get(Token, token_id)
+
+async def get_token_by_user_id_async(user_id: int, session: AsyncSession) -> Token:
+    cached = token_cache.get(user_id)
+    
+    if cached is not None:
+        return Token(**cached)
+    
+    query = select(Token).where(Token.user_id == user_id)
+    token = (await session.exec(query)).first()
+    
+    if token:
+        token_cache.set(user_id, token.model_dump())
+    
+    return token
+
+async def update_token_async(token_id: int, token: Token, session: AsyncSession) -> Token:
+    db_token = await session.get(Token, token_id)
+    updates = token.model_dump(exclude_unset=True)
+    db_token.sqlmodel_update(updates)
+    session.add(db_token)
+    await session.commit()
+    await session.refresh(db_token)
+    token_cache.invalidate(db_token.user_id)
     
-    return db_token
\ No newline at end of file
+    return db_token
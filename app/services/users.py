@@ -1,8 +1,19 @@
-from typing import Optional, Union
+from typing import Any, Dict, Optional, Union
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.models.user import User, UserPreferences
 from app.core.output import ChatInsights
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# Entries are plain field dicts and every hit builds a fresh, detached instance, so callers never
+# share or mutate a cached object. Invalidation only reaches this process's cache; other workers
+# serve their copy until it expires after cache_ttl_seconds.
+user_cache = TTLCache("user", settings.cache_ttl_seconds, settings.cache_max_entries)
+preferences_cache = TTLCache("user_preferences", settings.cache_ttl_seconds, settings.cache_max_entries)
 
 def insert_user(user: User, session: Session) -> User:
     session.add(user)
@@ -12,7 +23,17 @@ def insert_user(user: User, session: Session) -> User:
     return user
 
 def get_user(user_id: int, session: Session) -> User:
-    return session.get(User, user_id)
+    cached = user_cache.get(user_id)
+    
+    if cached is not None:
+        return User(**cached)
+    
+    user = session.get(User, user_id)
+    
+    if user:
+        user_cache.set(user_id, user.model_dump())
+    
+    return user
 
 def get_user_by_email(email: str, session: Session) -> User:
     query = select(User).where(User.email == email)
@@ -28,18 +49,86 @@ def insert_user_preferences(preferences: UserPreferences, session: Session) -> U
     return preferences
 
 def get_user_preferences(user_id: int, session: Session) -> UserPreferences:
+    cached = preferences_cache.get(user_id)
+    
+    if cached is not None:
+        return UserPreferences(**cached)
+    
     query = select(UserPreferences).where(UserPreferences.user_id == user_id)
     preferences = session.exec(query).first()
     
+    if preferences:
+        preferences_cache.set(user_id, preferences.model_dump())
+    
     return preferences
 
-def update_user_preferences(preferences_id: int, preferences: Union[UserPreferences, ChatInsights], session: Session) -> Optional[UserPreferences]:
+def update_user_preferences(preferences_id: int, preferences: Union[UserPreferences, ChatInsights, Dict[str, Any]], session: Session) -> Optional[UserPreferences]:
     db_preferences = session.get(UserPreferences, preferences_id)
-    updates = preferences.model_dump(exclude_unset=True)
+    updates = preferences if isinstance(preferences, dict) else preferences.model_dump(exclude_unset=True)
     
     db_preferences.sqlmodel_update(updates)
     session.add(db_preferences)
     session.commit()
     session.refresh(db_preferences)
+    preferences_cache.invalidate(db_preferences.user_id)
+    
+    return db_preferences
+
+async def insert_user_async(user: User, session: AsyncSession) -> User:
+    session.add(user)
+    await session.commit()
+    await session.refresh(user)
+    
+    return user
+
+async def get_user_async(user_id: int, session: AsyncSession) -> User:
+    cached = user_cache.get(user_id)
+    
+    if cached is not None:
+        return User(**cached)
+    
+    user = await session.get(User, user_id)
+    
+    if user:
+        user_cache.set(user_id, user.model_dump())
+    
+    return user
+
+async def get_user_by_email_async(email: str, session: AsyncSession) -> User:
+    query = select(User).where(User.email == email)
+    user = (await session.exec(query)).first()
+    
+    return user
+
+async def insert_user_preferences_async(preferences: UserPreferences, session: AsyncSession) -> UserPreferences:
+    session.add(preferences)
+    await session.commit()
+    await session.refresh(preferences)
+    
+    return preferences
+
+async def get_user_preferences_async(user_id: int, session: AsyncSession) -> UserPreferences:
+    cached = preferences_cache.get(user_id)
+    
+    if cached is not None:
+        return UserPreferences(**cached)
+    
+    query = select(UserPreferences).where(UserPreferences.user_id == user_id)
+    preferences = (await session.exec(query)).first()
+    
+    if preferences:
+        preferences_cache.set(user_id, preferences.model_dump())
+    
+    return preferences
+
+async def update_user_preferences_async(preferences_id: int, preferences: Union[UserPreferences, ChatInsights, Dict[str, Any]], session: AsyncSession) -> Optional[UserPreferences]:
+    db_preferences = await session.get(UserPreferences, preferences_id)
+    updates = preferences if isinstance(preferences, dict) else preferences.model_dump(exclude_unset=True)
+    
+    db_preferences.sqlmodel_update(updates)
+    session.add(db_preferences)
+    await session.commit()
+    await session.refresh(db_preferences)
+    preferences_cache.invalidate(db_preferences.user_id)
     
-    return db_preferences
\ No newline at end of file
+    return db_preferences
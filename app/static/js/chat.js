@@ -0,0 +1,387 @@
+// Simple JS for Mobile Toggle
+function toggleSidebar() {
+    document.body.classList.toggle('sidebar-open');
+    document.body.classList.remove('panel-open');
+}
+
+function togglePanel() {
+    document.body.classList.toggle('panel-open');
+    document.body.classList.remove('sidebar-open');
+}
+
+function closeDrawers() {
+    document.body.classList.remove('sidebar-open');
+    document.body.classList.remove('panel-open');
+}
+
+// Auto-scroll to bottom of chat on load
+const chatStream = document.querySelector('.chat-stream');
+chatStream.scrollTop = chatStream.scrollHeight;
+
+// Set while a plan waits for approval; the next message approves or revises it
+let awaitingApproval = false;
+const APPROVAL_WORDS = /^(approve|approved|ok|okay|yes|lgtm)$/i;
+
+// 1. Select the input element
+const inputField = document.querySelector('.input-textarea');
+
+// 2. Listen for the 'Enter' key
+inputField.addEventListener('keydown', async (e) => {
+    if (e.key === 'Enter' && !e.shiftKey) {
+        e.preventDefault(); // Prevent new line
+        const userText = inputField.value.trim();
+
+        if (!userText) return;
+
+        // Clear input immediately for better UX
+        inputField.value = '';
+        inputField.style.height = 'auto'; // Reset height
+
+        // Call your API
+        if (awaitingApproval) {
+            await resumePlan(userText);
+        } else {
+            await sendMessageToLLM(userText);
+        }
+    }
+});
+
+// 3. The API Call function
+async function sendMessageToLLM(message) {
+    try {
+        // Optimistic UI Update: Show user message immediately
+        addMessageToUI('user', message);
+
+        const response = await fetch('/api/chat', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ message: message })
+        });
+
+        const job = await response.json();
+
+        if (!response.ok) {
+            addMessageToUI('agent', job.detail || "Something went wrong, please try again.");
+            return;
+        }
+
+        const data = await waitForJob(job.job_id);
+
+        if (data.status === 'failed') {
+            addMessageToUI('agent', "I couldn't finish that request: " + data.error);
+        }
+
+        if (data.result && data.result.steps) {
+            console.log(data.result.steps);
+            awaitingApproval = true;
+            parseAndRender(data.result.steps);
+        }
+
+    } catch (error) {
+        console.error("Error calling chat API:", error);
+        // Fallback for demo/testing without backend
+        setTimeout(() => {
+            addMessageToUI('agent', "I'm having trouble connecting to the server, but I received your message: " + message);
+        }, 1000);
+    }
+}
+
+// Continue the paused plan: approval is instant, other text starts a job that asks the planner for one revision
+async function resumePlan(text) {
+    addMessageToUI('user', text);
+
+    const feedback = APPROVAL_WORDS.test(text) ? null : text;
+    const response = await fetch('/api/chat/resume', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ feedback: feedback })
+    });
+
+    const data = await response.json();
+
+    if (!response.ok) {
+        addMessageToUI('agent', data.detail || "Something went wrong, please try again.");
+
+        // Only a missing plan ends approval mode; busy or rate-limited resumes keep the plan pending
+        if (response.status === 404) awaitingApproval = false;
+        return;
+    }
+
+    if (data.status === 'approved') {
+        awaitingApproval = false;
+        addMessageToUI('agent', "Plan approved.");
+        return;
+    }
+
+    if (data.steps) {
+        parseAndRender(data.steps);
+        return;
+    }
+
+    // A revision runs as a job; the plan stays pending unless the job finds none left to revise
+    const job = await waitForJob(data.job_id);
+
+    if (job.status === 'failed') {
+        addMessageToUI('agent', "I couldn't revise the plan: " + job.error);
+    }
+
+    if (job.result && job.result.steps) {
+        parseAndRender(job.result.steps);
+    } else if (job.status === 'succeeded') {
+        awaitingApproval = false;
+    }
+}
+
+const TERMINAL_STATUSES = ['succeeded', 'failed', 'cancelled'];
+
+// Poll the job until it finishes; used when the progress stream cannot be kept open
+async function pollJob(jobId) {
+    while (true) {
+        const response = await fetch(`/api/chat/jobs/${jobId}`);
+        const job = await response.json();
+
+        if (!response.ok) throw new Error(job.detail || `Job ${jobId} could not be loaded`);
+        if (TERMINAL_STATUSES.includes(job.status)) return job;
+
+        await new Promise(resolve => setTimeout(resolve, 1000));
+    }
+}
+
+// Follow the job's progress stream until it finishes
+function waitForJob(jobId) {
+    return new Promise((resolve, reject) => {
+        const events = new EventSource(`/api/chat/jobs/${jobId}/events`);
+
+        events.addEventListener('progress', (e) => {
+            const job = JSON.parse(e.data);
+            console.log(`Job ${jobId}: ${job.status} (${job.steps_completed} steps, at ${job.current_node})`);
+        });
+
+        events.addEventListener('done', (e) => {
+            events.close();
+            resolve(JSON.parse(e.data));
+        });
+
+        // Sent by the server, e.g. when the job does not exist
+        events.addEventListener('failed', (e) => {
+            events.close();
+            reject(new Error(JSON.parse(e.data).detail));
+        });
+
+        // The browser's own event for a dropped connection: EventSource reconnects by itself
+        // unless it gave up, in which case the job keeps running and is polled instead
+        events.addEventListener('error', () => {
+            if (events.readyState === EventSource.CLOSED) {
+                pollJob(jobId).then(resolve, reject);
+            }
+        });
+    });
+}
+
+function parseAndRender(steps) {
+    if (!steps) return;
+
+    const agentTasks = []
+    const userTasks = []
+    const edges = []
+
+    steps.forEach(step => {
+        if ("action_type" in step.config)
+            userTasks.push([step.id, step.title]);
+        else
+            agentTasks.push([step.id, step.title]);
+
+        if (step.dependencies) {
+            step.dependencies.forEach(depId => {
+                edges.push([depId, step.id]);
+            });
+        }
+    });
+
+    renderWorkflow(agentTasks, userTasks, edges);
+}
+
+// 4. Dynamic Message Rendering Function
+function addMessageToUI(role, text, thoughtProcess = null, toolCalls = null) {
+    const stream = document.querySelector('.chat-stream');
+    const row = document.createElement('div');
+    row.className = `message-row ${role} animate-entry`;
+
+    let contentHtml = '';
+
+    if (role === 'user') {
+        contentHtml = `
+            <div class="message-content">
+                <div class="message-bubble">${text}</div>
+            </div>
+        `;
+    } else {
+        // Agent Logic
+        const avatar = `<div class="avatar"><i class="ph ph-robot"></i></div>`;
+
+        let toolHtml = '';
+        if (toolCalls) {
+            toolHtml = `<div class="tool-chip"><i class="ph ph-lightning"></i> ${toolCalls.join(', ')}</div>`;
+        }
+
+        let thoughtHtml = '';
+        if (thoughtProcess) {
+            thoughtHtml = `
+                <details class="thinking-process">
+                    <summary><i class="ph ph-caret-right"></i> Thought Process</summary>
+                    <div class="thinking-content">${thoughtProcess}</div>
+                </details>
+            `;
+        }
+
+        contentHtml = `
+            ${avatar}
+            <div class="message-content">
+                ${toolHtml}
+                ${thoughtHtml}
+                <div class="message-bubble">${text}</div>
+            </div>
+        `;
+    }
+
+    row.innerHTML = contentHtml;
+    stream.appendChild(row);
+
+    // Scroll to bottom
+    stream.scrollTop = stream.scrollHeight;
+}
+
+function renderWorkflow(agentTasks, userTasks, edges) {
+    document.querySelector('.chat-stream').style.display = 'none';
+    const workspace = document.getElementById('planWorkspace');
+    workspace.style.display = 'flex';
+
+    const agentContainer = document.getElementById('agent-tasks-container');
+    const userContainer = document.getElementById('user-tasks-container');
+    const svgLayer = document.getElementById('connections-layer');
+
+    // 1. Clear previous render
+    agentContainer.innerHTML = '';
+    userContainer.innerHTML = '';
+    svgLayer.innerHTML = '';
+
+    // 2. Helper to create DOM elements
+    const createTaskElement = (id, text, type) => {
+        const el = document.createElement('div');
+        el.id = id; // Important for linking
+
+        if (type === 'agent') {
+            el.className = 'agent-card';
+            el.innerText = text;
+        } else {
+            el.className = 'user-card';
+            // Add mock checkbox for user
+            el.innerHTML = `<span class="checkbox-mock"></span> ${text}`;
+        }
+        return el;
+    };
+
+    // 3. Render Nodes
+    agentTasks.forEach(task => {
+        const [id, text] = task;
+        agentContainer.appendChild(createTaskElement(id, text, 'agent'));
+    });
+
+    userTasks.forEach(task => {
+        const [id, text] = task;
+        userContainer.appendChild(createTaskElement(id, text, 'user'));
+    });
+
+    // 4. Render Edges (Wait for DOM layout to calculate positions)
+    // We use setTimeout to ensure elements are painted and have dimensions
+    setTimeout(() => {
+        drawEdges(edges);
+    }, 50);
+
+    // Redraw on resize
+    window.addEventListener('resize', () => drawEdges(edges));
+}
+
+function drawEdges(edges) {
+    const svgLayer = document.getElementById('connections-layer');
+    svgLayer.innerHTML = ''; // Clear existing lines
+
+    // Get the offset of the drawing layer relative to the viewport
+    const svgRect = svgLayer.getBoundingClientRect();
+
+    edges.forEach(edge => {
+        const [startId, endId] = edge;
+        const startEl = document.getElementById(startId);
+        const endEl = document.getElementById(endId);
+
+        if (startEl && endEl) {
+            const line = createPath(startEl, endEl, svgRect);
+            svgLayer.appendChild(line);
+        }
+    });
+}
+
+function createPath(startEl, endEl, svgRect) {
+    const startRect = startEl.getBoundingClientRect();
+    const endRect = endEl.getBoundingClientRect();
+
+    // Calculate coordinates relative to the SVG container
+    // We subtract svgRect.left/top from the element's viewport coordinates
+
+    const isStartAgent = startEl.closest('#agent-pane') !== null;
+    let x1, y1;
+
+    // Start Point
+    if (isStartAgent) {
+        // Agent (Left Pane) -> Connect from Right Side
+        x1 = startRect.right - svgRect.left;
+        y1 = (startRect.top + startRect.height / 2) - svgRect.top;
+    } else {
+        // User (Right Pane) -> Connect from Left Side
+        x1 = startRect.left - svgRect.left;
+        y1 = (startRect.top + startRect.height / 2) - svgRect.top;
+    }
+
+    const isEndAgent = endEl.closest('#agent-pane') !== null;
+    let x2, y2;
+
+    // End Point
+    if (isEndAgent) {
+        // Target is Agent -> Connect at Right Side
+        x2 = endRect.right - svgRect.left;
+        y2 = (endRect.top + endRect.height / 2) - svgRect.top;
+    } else {
+        // Target is User -> Connect at Left Side
+        x2 = endRect.left - svgRect.left;
+        y2 = (endRect.top + endRect.height / 2) - svgRect.top;
+    }
+
+    // Bezier Control Points
+    // Logic: Lines should flow through the center channel.
+    // If Start is Agent (Left) and End is User (Right): Flow is Left -> Right.
+    // If Start is User (Right) and End is Agent (Left): Flow is Right -> Left.
+
+    // We pull the control points towards the "center" (the gap).
+    // Agent side points pull Right (+), User side points pull Left (-).
+
+    const dist = Math.abs(x2 - x1) * 0.5; // Curvature factor
+
+    // CP1 (Start Control Point)
+    const cp1x = isStartAgent ? x1 + dist : x1 - dist;
+    const cp1y = y1;
+
+    // CP2 (End Control Point)
+    const cp2x = isEndAgent ? x2 + dist : x2 - dist;
+    const cp2y = y2;
+
+    const pathData = `M ${x1} ${y1} C ${cp1x} ${cp1y}, ${cp2x} ${cp2y}, ${x2} ${y2}`;
+
+    const path = document.createElementNS("http://www.w3.org/2000/svg", "path");
+    path.setAttribute("d", pathData);
+    path.setAttribute("stroke", "#64748b"); // Slate color for lines
+    path.setAttribute("stroke-width", "2");
+    path.setAttribute("fill", "none");
+    path.setAttribute("stroke-dasharray", "5,5"); // Dashed line style
+
+    return path;
+}
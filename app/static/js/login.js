@@ -0,0 +1,3 @@
+function handleLogin() {
+    window.location.href = "/auth/oauth2/google";
+}
@@ -1,21 +1,65 @@
+from typing import Any, Dict, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+
 from sqlmodel import Session
 import requests
 import app.services.tokens as tokens_service
+import app.services.search_index as search_index
 from app.core.config import get_settings
+from app.core.database import engine
+from app.core.events import get_event_logger
+from app.core.metrics import google_request_latency, google_request_errors
 
 settings = get_settings()
+log = get_event_logger(__name__)
+
+fanout_executor = ThreadPoolExecutor(max_workers=settings.google_fanout_workers, thread_name_prefix="google-fanout")
+
+GoogleCall = Tuple[str, str, Dict[str, Any]]
+
+def endpoint_label(url: str) -> str:
+    if url.startswith((settings.google_tasks_tasklist_endpoint, settings.google_tasks_task_endpoint)):
+        return "tasks"
+    
+    if url.startswith((settings.google_calendar_events_endpoint,
+                       settings.google_calendar_calendars_endpoint,
+                       settings.google_calendar_list_endpoint)):
+        return "calendar"
+    
+    return "other"
 
 def make_google_request(user_id: int, session: Session, method: str, url: str, **kwargs):
     db_token = tokens_service.get_token_by_user_id(user_id, session)
     headers = {
         "Authorization": f"Bearer {db_token.access_token}"
     }
+    labels = {"method": method, "endpoint": endpoint_label(url)}
     try:
-        response = requests.request(method, url, headers=headers, **kwargs)
-        response.raise_for_status()
-        response_data = response.json()
-        return response_data
+        with google_request_latency.time(errors=google_request_errors, **labels):
+            response = requests.request(method, url, headers=headers, **kwargs)
+            response.raise_for_status()
+            # DELETE and clear answer 204 with no body
+            response_data = response.json() if response.content else {}
     
     except Exception as e:
-        print(f"Error making Google request: {e}")
-        return None
\ No newline at end of file
+        log.warning("google.request_failed", method=method, url=url, error=e)
+        return None
+    
+    # Keep the user's search index in step with every resource the tools see or change
+    if labels["endpoint"] != "other":
+        try:
+            search_index.record_google_response(user_id, method, url, kwargs.get("params") or {}, response_data)
+        
+        except Exception:
+            log.exception("search_index.update_failed", user_id=user_id, url=url)
+    
+    return response_data
+
+def request_in_own_session(user_id: int, method: str, url: str, kwargs: Dict[str, Any]):
+    # A Session must not be shared across threads, so every fanned out call opens its own
+    with Session(engine) as session:
+        return make_google_request(user_id, session, method, url, **kwargs)
+
+def fan_out(user_id: int, calls: List[GoogleCall]) -> List[Any]:
+    futures = [fanout_executor.submit(request_in_own_session, user_id, method, url, kwargs) for method, url, kwargs in calls]
+    return [future.result() for future in futures]
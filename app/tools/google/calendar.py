@@ -1,18 +1,22 @@
-from typing import List, Annotated
+from typing import List, Annotated, Optional
+from datetime import datetime, timedelta, timezone
 
+from sqlmodel import Session
 from langchain.tools import tool, BaseTool
 from langgraph.prebuilt import InjectedState
 from langchain_core.runnables import RunnableConfig
 
 from app.tools.google.api_client import make_google_request
-from app.models.calendar import CalendarEvent
+from app.models.calendar import CalendarEvent, CalendarListEntry, EventSearchHit, EventSearchResult
+from app.services.search_index import get_search_index
+import app.services.calendars as calendars_service
 from app.core.config import get_settings
 
 settings = get_settings()
 
 @tool
-def insert_event(event: CalendarEvent, user_id: Annotated[int, InjectedState("user_id")], config: RunnableConfig) -> CalendarEvent:
-    """Create a new calendar event in the user's primary calendar.
+def insert_event(event: CalendarEvent, user_id: Annotated[int, InjectedState("user_id")], config: RunnableConfig, calendar_id: str = "primary") -> CalendarEvent:
+    """Create a new calendar event, in the user's primary calendar unless another is given.
 
     Schedules a new event with a title, start time, and end time.
 
@@ -24,6 +28,7 @@ def insert_event(event: CalendarEvent, user_id: Annotated[int, InjectedState("us
                - 'end': Object with 'dateTime' (ISO 8601 string).
         user_id: Injected user ID.
         config: Injected configuration.
+        calendar_id: The calendar to create the event in (an `id` from list_calendars). Defaults to "primary".
 
     Returns:
         CalendarEvent: The created event object with assigned ID.
@@ -36,16 +41,17 @@ def insert_event(event: CalendarEvent, user_id: Annotated[int, InjectedState("us
     event_data = make_google_request(user_id,
                                     session,
                                     "POST",
-                                    settings.google_calendar_events_endpoint,
-                                    json=event.model_dump_json())
+                                    calendars_service.events_url(calendar_id),
+                                    json=event.model_dump_json(exclude={"calendarId"}))
+    calendars_service.invalidate_events(user_id, calendar_id)
     
     if not event_data:
         return None
     
-    return CalendarEvent.model_validate(event_data)
+    return CalendarEvent.model_validate({**event_data, "calendarId": calendar_id})
 
 @tool
-def get_event(event_id: str, user_id: Annotated[int, InjectedState("user_id")], config: RunnableConfig) -> CalendarEvent:
+def get_event(event_id: str, user_id: Annotated[int, InjectedState("user_id")], config: RunnableConfig, calendar_id: str = "primary") -> CalendarEvent:
     """Retrieve full details of a specific calendar event.
 
     Fetches metadata for an event, including description, location, and attendees.
@@ -54,6 +60,7 @@ def get_event(event_id: str, user_id: Annotated[int, InjectedState("user_id")],
         event_id: The unique identifier of the event (retrieved from list_events or insert_event).
         user_id: Injected user ID.
         config: Injected configuration.
+        calendar_id: The event's `calendarId` from list_events. Defaults to "primary".
 
     Returns:
         CalendarEvent: The requested event object.
@@ -66,48 +73,73 @@ def get_event(event_id: str, user_id: Annotated[int, InjectedState("user_id")],
     event_data = make_google_request(user_id,
                                     session,
                                     "GET",
-                                    f"{settings.google_calendar_events_endpoint}/{event_id}")
+                                    f"{calendars_service.events_url(calendar_id)}/{event_id}")
     
     if not event_data:
         return None
     
-    return CalendarEvent.model_validate(event_data)
+    return CalendarEvent.model_validate({**event_data, "calendarId": calendar_id})
 
 @tool
-def list_events(user_id: Annotated[int, InjectedState("user_id")], config: RunnableConfig) -> List[CalendarEvent]:
-    """List upcoming calendar events from the user's primary calendar.
+def list_events(user_id: Annotated[int, InjectedState("user_id")],
+                config: RunnableConfig,
+                calendars: Optional[List[str]] = None,
+                time_min: Optional[str] = None,
+                time_max: Optional[str] = None,
+                max_results: int = 50) -> List[CalendarEvent]:
+    """List upcoming calendar events across the user's calendars, ordered by start time.
 
     Retrieves a list of future events, useful for checking availability or finding specific events to modify.
 
     Args:
         user_id: Injected user ID.
         config: Injected configuration.
+        calendars: Calendar ids or names to include (e.g., ["Work"]). Defaults to every calendar the user has visible.
+        time_min: Only events ending after this ISO 8601 time. Defaults to now.
+        time_max: Only events starting before this ISO 8601 time.
+        max_results: Maximum number of events to return.
 
     Returns:
-        List[CalendarEvent]: A list of upcoming calendar events.
+        List[CalendarEvent]: Upcoming events, each with the `calendarId` it belongs to.
 
     Note:
-        This tool returns events from the 'primary' calendar. 
+        Pass an event's `calendarId` to get_event, update_event or delete_event.
         If no events are found, returns an empty list.
     """
     
     session = config["configurable"]["session"]
-    event_list_data = make_google_request(user_id,
-                                        session,
-                                        "GET",
-                                        settings.google_calendar_events_endpoint)
     
-    if not event_list_data:
-        return []
+    # Whole minutes keep repeated calls within the per-calendar cache
+    start = calendars_service.parse_time(time_min) if time_min else datetime.now(tz=timezone.utc).replace(second=0, microsecond=0)
+    end = calendars_service.parse_time(time_max) if time_max else None
     
-    events = []
-    for e in event_list_data.get("items"):
-        events.append(CalendarEvent.model_validate(e))
+    events = calendars_service.merged_events(user_id, session, calendars, start, end, max_results)
     
-    return events
+    return [CalendarEvent.model_validate(e) for e in events]
 
 @tool
-def update_event(event_id: str, event: CalendarEvent, user_id: Annotated[int, InjectedState("user_id")], config: RunnableConfig) -> CalendarEvent:
+def list_calendars(user_id: Annotated[int, InjectedState("user_id")], config: RunnableConfig) -> List[CalendarListEntry]:
+    """List the calendars the user can see (primary, work, personal, shared).
+
+    Use this to find the `id` of a calendar by name before creating or moving events in it.
+
+    Args:
+        user_id: Injected user ID.
+        config: Injected configuration.
+
+    Returns:
+        List[CalendarListEntry]: The user's calendars with `id`, `summary` (name), `primary` and `accessRole`.
+
+    Note:
+        The primary calendar is always listed with the id "primary".
+    """
+    
+    session = config["configurable"]["session"]
+    
+    return calendars_service.list_calendars(user_id, session)
+
+@tool
+def update_event(event_id: str, event: CalendarEvent, user_id: Annotated[int, InjectedState("user_id")], config: RunnableConfig, calendar_id: str = "primary") -> CalendarEvent:
     """Update an existing calendar event.
 
     Modifies event details such as rescheduling (start/end times), renaming, or changing description.
@@ -117,6 +149,7 @@ def update_event(event_id: str, event: CalendarEvent, user_id: Annotated[int, In
         event: The updated CalendarEvent object. Ensure start/end times are valid ISO 8601 strings.
         user_id: Injected user ID.
         config: Injected configuration.
+        calendar_id: The event's `calendarId` from list_events. Defaults to "primary".
 
     Returns:
         CalendarEvent: The updated event object.
@@ -129,16 +162,17 @@ def update_event(event_id: str, event: CalendarEvent, user_id: Annotated[int, In
     event_data = make_google_request(user_id,
                                     session,
                                     "PUT",
-                                    f"{settings.google_calendar_events_endpoint}/{event_id}",
-                                    json=event.model_dump_json())
+                                    f"{calendars_service.events_url(calendar_id)}/{event_id}",
+                                    json=event.model_dump_json(exclude={"calendarId"}))
+    calendars_service.invalidate_events(user_id, calendar_id)
     
     if not event_data:
         return None
     
-    return CalendarEvent.model_validate(event_data)
+    return CalendarEvent.model_validate({**event_data, "calendarId": calendar_id})
     
 @tool
-def delete_event(event_id: str, user_id: Annotated[int, InjectedState("user_id")], config: RunnableConfig) -> None:
+def delete_event(event_id: str, user_id: Annotated[int, InjectedState("user_id")], config: RunnableConfig, calendar_id: str = "primary") -> None:
     """Permanently delete a calendar event.
 
     Removes an event from the calendar. This action is irreversible.
@@ -147,6 +181,7 @@ def delete_event(event_id: str, user_id: Annotated[int, InjectedState("user_id")
         event_id: The unique identifier of the event to delete.
         user_id: Injected user ID.
         config: Injected configuration.
+        calendar_id: The event's `calendarId` from list_events. Defaults to "primary".
 
     Returns:
         None
@@ -159,7 +194,80 @@ def delete_event(event_id: str, user_id: Annotated[int, InjectedState("user_id")
     make_google_request(user_id,
                         session,
                         "DELETE",
-                        f"{settings.google_calendar_events_endpoint}/{event_id}")
+                        f"{calendars_service.events_url(calendar_id)}/{event_id}")
+    calendars_service.invalidate_events(user_id, calendar_id)
+
+def _build_event_index(user_id: int, session: Session) -> None:
+    # Each calendar's events within the window replace its rows; the index counts as built only if every calendar loaded
+    index = get_search_index(user_id)
+    now = datetime.now(tz=timezone.utc)
+    window = {"timeMin": calendars_service.rfc3339(now - timedelta(days=settings.search_index_event_past_days)),
+              "timeMax": calendars_service.rfc3339(now + timedelta(days=settings.search_index_event_future_days))}
+    calendars = calendars_service.list_calendars(user_id, session)
+
+    # When the calendar list fails only an uncached primary-only fallback comes back; prune nothing on it
+    complete = calendars_service.calendar_list_cache.get(user_id) is not None
+
+    if complete:
+        index.retain_calendars([c.id for c in calendars])
+
+    for calendar in calendars:
+        params = {"maxResults": 250, "singleEvents": "true", **window}
+        events = []
+
+        while True:
+            event_list_data = make_google_request(user_id,
+                                                  session,
+                                                  "GET",
+                                                  calendars_service.events_url(calendar.id),
+                                                  params=params)
+
+            if event_list_data is None:
+                complete = False
+                break
+
+            events.extend(event_list_data.get("items", []))
+
+            if not event_list_data.get("nextPageToken"):
+                index.upsert_events(calendar.id, events, replace=True)
+                break
+
+            params["pageToken"] = event_list_data["nextPageToken"]
+
+    if complete:
+        index.mark_built("events")
+
+@tool
+def search_events(query: str, user_id: Annotated[int, InjectedState("user_id")], config: RunnableConfig, page: int = 1, page_size: int = 10) -> EventSearchResult:
+    """Search the user's calendar events by words in their title, description or location.
+
+    Use this when the user refers to an event by what it is about (e.g., "the budget sync with finance") instead of listing events and scanning them.
+
+    Args:
+        query: Words to look for. Results must contain all of them if possible, otherwise any of them, best matches first.
+        user_id: Injected user ID.
+        config: Injected configuration.
+        page: Which page of results to return, starting at 1.
+        page_size: Number of results per page.
+
+    Returns:
+        EventSearchResult: The matching events with their start and end times, and `next_page` if more results exist.
+
+    Note:
+        Use the returned `id` and `calendarId` with `get_event`, `update_event` or `delete_event`.
+    """
+
+    session = config["configurable"]["session"]
+    index = get_search_index(user_id)
+
+    if not index.is_built("events"):
+        _build_event_index(user_id, session)
+
+    # One extra row tells whether another page exists
+    rows = index.search_events(query, page_size + 1, (page - 1) * page_size)
+
+    return EventSearchResult(hits=[EventSearchHit.model_validate(r) for r in rows[:page_size]],
+                             next_page=page + 1 if len(rows) > page_size else None)
 
 def get_tools():
     tools = []
@@ -1,12 +1,15 @@
-from typing import List, Annotated
+from typing import Any, Callable, Dict, List, Annotated, Optional, Tuple
 
+from sqlmodel import Session
 from langchain.tools import tool, BaseTool
 from langgraph.prebuilt import InjectedState
 from langchain_core.runnables import RunnableConfig
 
-from app.tools.google.api_client import make_google_request
+from app.tools.google.api_client import GoogleCall, fan_out, fanout_executor, make_google_request
 from app.core.config import get_settings
-from app.models.tasks import TaskList, Task
+from app.core.database import engine
+from app.models.tasks import TaskList, Task, TaskFilter, BulkTaskResult, TaskSearchHit, TaskSearchResult
+from app.services.search_index import get_search_index
 
 settings = get_settings()
 
@@ -87,19 +90,8 @@ def list_tasklists(user_id: Annotated[int, InjectedState("user_id")], config: Ru
     """
     
     session = config["configurable"]["session"]
-    tasklist_list_data = make_google_request(user_id,
-                                        session,
-                                        "GET",
-                                        settings.google_tasks_tasklist_endpoint)
-    
-    if not tasklist_list_data:
-        return []
-
-    tasklists = []
-    for tl in tasklist_list_data.get("items"):
-        tasklists.append(TaskList.model_validate(tl))
     
-    return tasklists
+    return _list_tasklists(user_id, session) or []
 
 @tool
 def update_tasklist(tasklist_id: str, tasklist: TaskList, user_id: Annotated[int, InjectedState("user_id")], config: RunnableConfig) -> TaskList:
@@ -310,6 +302,345 @@ def delete_task(task_id: str, tasklist_id: str, user_id: Annotated[int, Injected
                         f"{settings.google_tasks_task_endpoint}/{tasklist_id}/tasks/{task_id}")
 
 
+def _list_tasklists(user_id: int, session: Session) -> Optional[List[TaskList]]:
+    """Every task list of the user, following pagination; None if any page failed to load."""
+    params = {"maxResults": 100}
+    tasklists = []
+
+    while True:
+        tasklist_list_data = make_google_request(user_id,
+                                                 session,
+                                                 "GET",
+                                                 settings.google_tasks_tasklist_endpoint,
+                                                 params=params)
+
+        if tasklist_list_data is None:
+            return None
+
+        tasklists.extend(TaskList.model_validate(tl) for tl in tasklist_list_data.get("items", []))
+
+        if not tasklist_list_data.get("nextPageToken"):
+            return tasklists
+
+        params["pageToken"] = tasklist_list_data["nextPageToken"]
+
+def _resolve_tasklist(tasklist: str, user_id: int, session: Session) -> Optional[TaskList]:
+    tasklists = _list_tasklists(user_id, session) or []
+    wanted = tasklist.strip().lower()
+
+    # Exact id, then exact title, then partial title
+    for matches in (lambda tl: tl.id == tasklist,
+                    lambda tl: tl.title.lower() == wanted,
+                    lambda tl: wanted in tl.title.lower()):
+        for tl in tasklists:
+            if matches(tl):
+                return tl
+
+    if tasklist == "@default":
+        return TaskList(id="@default", title="@default")
+
+    return None
+
+def _resolve_tasklist_exactly(tasklist: str, user_id: int, session: Session) -> Tuple[Optional[TaskList], Optional[str]]:
+    """The list a destructive bulk tool acts on, matched by exact id or title, or an error saying why there is none."""
+    tasklists = _list_tasklists(user_id, session)
+
+    if tasklists is None:
+        return None, "Task lists could not be loaded; nothing was changed."
+
+    by_id = [tl for tl in tasklists if tl.id == tasklist]
+
+    if by_id:
+        return by_id[0], None
+
+    if tasklist == "@default":
+        return TaskList(id="@default", title="@default"), None
+
+    wanted = tasklist.strip().lower()
+    by_title = [tl for tl in tasklists if tl.title.lower() == wanted]
+
+    if len(by_title) == 1:
+        return by_title[0], None
+
+    if by_title:
+        ids = ", ".join(tl.id for tl in by_title)
+        return None, f"Several task lists are titled '{tasklist}' ({ids}); pass the ID of the one you mean."
+
+    # Partial matches are only suggested, never acted on
+    similar = [f"'{tl.title}'" for tl in tasklists if wanted in tl.title.lower()]
+    hint = f" Did you mean {', '.join(similar)}?" if similar else ""
+
+    return None, f"No task list is titled exactly '{tasklist}'.{hint}"
+
+def _matches(task: Task, task_filter: TaskFilter) -> bool:
+    if task_filter.title_contains and task_filter.title_contains.lower() not in task.title.lower():
+        return False
+
+    if task_filter.status and task.status != task_filter.status:
+        return False
+
+    return True
+
+def _list_tasks(tasklist_id: str, params: Dict[str, Any], user_id: int, session: Session) -> Optional[List[Task]]:
+    """Every task of the list matching `params`, following pagination; None if any page failed to load."""
+    params = {"maxResults": 100, **params}
+    tasks = []
+
+    while True:
+        task_list_data = make_google_request(user_id,
+                                             session,
+                                             "GET",
+                                             f"{settings.google_tasks_task_endpoint}/{tasklist_id}/tasks",
+                                             params=params)
+
+        if task_list_data is None:
+            return None
+
+        tasks.extend(Task.model_validate(t) for t in task_list_data.get("items", []))
+
+        if not task_list_data.get("nextPageToken"):
+            return tasks
+
+        params["pageToken"] = task_list_data["nextPageToken"]
+
+def _find_tasks(tasklist_id: str, task_filter: TaskFilter, user_id: int, session: Session) -> Optional[List[Task]]:
+    # None if the list could not be read, so callers do not report "0 matched" for a failed listing
+    params = {}
+
+    if task_filter.status == "needsAction":
+        params["showCompleted"] = "false"
+    else:
+        params["showHidden"] = "true"
+
+    if task_filter.due_after:
+        params["dueMin"] = task_filter.due_after
+
+    if task_filter.due_before:
+        params["dueMax"] = task_filter.due_before
+
+    tasks = _list_tasks(tasklist_id, params, user_id, session)
+
+    if tasks is None:
+        return None
+
+    return [t for t in tasks if _matches(t, task_filter)]
+
+def _bulk_update(tasklist: str,
+                 task_filter: TaskFilter,
+                 user_id: int,
+                 session: Session,
+                 make_call: Callable[[str, Task], GoogleCall]) -> BulkTaskResult:
+    resolved, error = _resolve_tasklist_exactly(tasklist, user_id, session)
+
+    if not resolved:
+        return BulkTaskResult(error=error)
+
+    tasks = _find_tasks(resolved.id, task_filter, user_id, session)
+
+    if tasks is None:
+        return BulkTaskResult(tasklist_id=resolved.id, error="The tasks of the list could not be loaded; nothing was changed.")
+
+    results = fan_out(user_id, [make_call(resolved.id, t) for t in tasks])
+
+    return BulkTaskResult(tasklist_id=resolved.id,
+                          matched=len(tasks),
+                          succeeded=[t.title for t, result in zip(tasks, results) if result is not None],
+                          failed=[t.title for t, result in zip(tasks, results) if result is None])
+
+@tool
+def find_tasklist(name: str, user_id: Annotated[int, InjectedState("user_id")], config: RunnableConfig) -> TaskList:
+    """Find a task list by its name.
+
+    Resolves a list the user refers to by name (e.g., "Groceries", "my work list") to its task list object in a single step.
+
+    Args:
+        name: The list name as the user said it. Matching is case insensitive and also accepts partial names.
+        user_id: Injected user ID.
+        config: Injected configuration.
+
+    Returns:
+        TaskList: The matching task list, or None if no list matches.
+
+    Note:
+        Prefer this over `list_tasklists` when you only need one list's ID.
+    """
+
+    session = config["configurable"]["session"]
+    return _resolve_tasklist(name, user_id, session)
+
+@tool
+def complete_tasks(tasklist: str, task_filter: TaskFilter, user_id: Annotated[int, InjectedState("user_id")], config: RunnableConfig) -> BulkTaskResult:
+    """Mark every open task that matches a filter as completed, in one step.
+
+    Use this for bulk intents such as "mark everything in Groceries done" or "complete all tasks due before Friday".
+
+    Args:
+        tasklist: The list's exact name or ID ('@default' for the main list); use `find_tasklist` first if unsure.
+        task_filter: Which tasks to complete. Leave fields empty to match every open task in the list.
+        user_id: Injected user ID.
+        config: Injected configuration.
+
+    Returns:
+        BulkTaskResult: How many tasks matched and the titles of the tasks that were and were not completed.
+            If `error` is set, nothing was attempted, e.g. because no list has exactly that name.
+
+    Note:
+        Do NOT loop over `update_task` for this. Already completed tasks are skipped.
+    """
+
+    session = config["configurable"]["session"]
+    open_tasks = task_filter.model_copy(update={"status": "needsAction"})
+
+    return _bulk_update(tasklist, open_tasks, user_id, session,
+                        lambda tasklist_id, t: ("PATCH",
+                                                f"{settings.google_tasks_task_endpoint}/{tasklist_id}/tasks/{t.id}",
+                                                {"json": {"status": "completed"}}))
+
+@tool
+def delete_tasks(tasklist: str, task_filter: TaskFilter, user_id: Annotated[int, InjectedState("user_id")], config: RunnableConfig) -> BulkTaskResult:
+    """Permanently delete every task that matches a filter, in one step.
+
+    Use this for bulk intents such as "delete all tasks mentioning the old project". This cannot be undone.
+
+    Args:
+        tasklist: The list's exact name or ID ('@default' for the main list); use `find_tasklist` first if unsure.
+        task_filter: Which tasks to delete. Leave fields empty to delete every task in the list.
+        user_id: Injected user ID.
+        config: Injected configuration.
+
+    Returns:
+        BulkTaskResult: How many tasks matched and the titles of the tasks that were and were not deleted.
+            If `error` is set, nothing was attempted, e.g. because no list has exactly that name.
+
+    Note:
+        Use with caution. To remove only completed tasks, use `clear_completed_tasks` instead.
+    """
+
+    session = config["configurable"]["session"]
+
+    return _bulk_update(tasklist, task_filter, user_id, session,
+                        lambda tasklist_id, t: ("DELETE",
+                                                f"{settings.google_tasks_task_endpoint}/{tasklist_id}/tasks/{t.id}",
+                                                {}))
+
+@tool
+def move_tasks(tasklist: str, destination_tasklist: str, task_filter: TaskFilter, user_id: Annotated[int, InjectedState("user_id")], config: RunnableConfig) -> BulkTaskResult:
+    """Move every task that matches a filter to another task list, in one step.
+
+    Use this for bulk intents such as "move all shopping tasks to Groceries".
+
+    Args:
+        tasklist: The source list's exact name or ID ('@default' for the main list); use `find_tasklist` first if unsure.
+        destination_tasklist: The target list's exact name or ID.
+        task_filter: Which tasks to move. Leave fields empty to move every task in the list.
+        user_id: Injected user ID.
+        config: Injected configuration.
+
+    Returns:
+        BulkTaskResult: How many tasks matched and the titles of the tasks that were and were not moved.
+            If `error` is set, nothing was attempted, e.g. because no list has exactly that name.
+
+    Note:
+        If the destination list does not exist, nothing is moved; create it first with `insert_tasklist`.
+    """
+
+    session = config["configurable"]["session"]
+    destination, error = _resolve_tasklist_exactly(destination_tasklist, user_id, session)
+
+    if not destination:
+        return BulkTaskResult(error=error)
+
+    return _bulk_update(tasklist, task_filter, user_id, session,
+                        lambda tasklist_id, t: ("POST",
+                                                f"{settings.google_tasks_task_endpoint}/{tasklist_id}/tasks/{t.id}/move",
+                                                {"params": {"destinationTasklist": destination.id}}))
+
+@tool
+def clear_completed_tasks(tasklist: str, user_id: Annotated[int, InjectedState("user_id")], config: RunnableConfig) -> bool:
+    """Remove all completed tasks from a task list.
+
+    Use this when the user wants to clean up a list (e.g., "clear completed tasks"). It is a single request, regardless of how many tasks are completed.
+
+    Args:
+        tasklist: The list's exact name or ID ('@default' for the main list); use `find_tasklist` first if unsure.
+        user_id: Injected user ID.
+        config: Injected configuration.
+
+    Returns:
+        bool: True if the list was cleared, False if no list has exactly that name or ID or the request failed.
+    """
+
+    session = config["configurable"]["session"]
+    resolved, _ = _resolve_tasklist_exactly(tasklist, user_id, session)
+
+    if not resolved:
+        return False
+
+    result = make_google_request(user_id,
+                                 session,
+                                 "POST",
+                                 f"{settings.google_tasks_task_endpoint}/{resolved.id}/clear")
+
+    return result is not None
+
+def _build_task_index(user_id: int, session: Session) -> None:
+    # Each completely listed task list replaces its rows; the index counts as built only if every list loaded
+    index = get_search_index(user_id)
+
+    def index_tasklist(tasklist_id: str) -> bool:
+        with Session(engine) as own_session:
+            tasks = _list_tasks(tasklist_id, {"showHidden": "true"}, user_id, own_session)
+
+        if tasks is None:
+            return False
+
+        index.upsert_tasks(tasklist_id, [t.model_dump() for t in tasks], replace=True)
+        return True
+
+    tasklists = _list_tasklists(user_id, session)
+
+    if tasklists is None:
+        return
+
+    index.retain_tasklists([tl.id for tl in tasklists])
+    futures = [fanout_executor.submit(index_tasklist, tl.id) for tl in tasklists]
+
+    if all([future.result() for future in futures]):
+        index.mark_built("tasks")
+
+@tool
+def search_tasks(query: str, user_id: Annotated[int, InjectedState("user_id")], config: RunnableConfig, page: int = 1, page_size: int = 10) -> TaskSearchResult:
+    """Search all of the user's tasks, across every list, by words in their title or notes.
+
+    Use this when the user refers to a task by what it is about (e.g., "my task about the Q3 budget") instead of listing tasks and scanning them.
+
+    Args:
+        query: Words to look for. Results must contain all of them if possible, otherwise any of them, best matches first.
+        user_id: Injected user ID.
+        config: Injected configuration.
+        page: Which page of results to return, starting at 1.
+        page_size: Number of results per page.
+
+    Returns:
+        TaskSearchResult: The matching tasks with their list IDs, and `next_page` if more results exist.
+
+    Note:
+        Use the returned `id` and `tasklist_id` with `get_task`, `update_task` or `delete_task`.
+    """
+
+    session = config["configurable"]["session"]
+    index = get_search_index(user_id)
+
+    if not index.is_built("tasks"):
+        _build_task_index(user_id, session)
+
+    # One extra row tells whether another page exists
+    rows = index.search_tasks(query, page_size + 1, (page - 1) * page_size)
+
+    return TaskSearchResult(hits=[TaskSearchHit.model_validate(r) for r in rows[:page_size]],
+                            next_page=page + 1 if len(rows) > page_size else None)
+
+
 def get_tools():
     tools = []
     
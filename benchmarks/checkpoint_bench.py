@@ -0,0 +1,159 @@
+"""Bytes and CPU per checkpoint for LangGraph's JsonPlusSerializer and CompactSerializer.
+
+Replays a conversation of `--steps` super-steps the way a checkpointer sees
+it: every step writes the channels whose version changed, i.e. the growing
+message list plus, when the plan or preferences changed, the plan and the
+preferences row. Each serializer writes the same sequence; the report gives
+bytes and serialization CPU time per checkpoint, CPU time to load a
+checkpoint back, and checks that every value round-trips unchanged.
+Compression is measured only when `zstandard` is installed.
+
+    python -m benchmarks.checkpoint_bench --steps 40 --plan-steps 8 --output checkpoint.json
+"""
+from typing import Any, Dict, List
+import argparse
+import json
+import random
+import statistics
+import time
+
+from benchmarks.common import configure_environment, save_results
+
+def build_plan(plan_steps: int, rng: random.Random) -> Any:
+    from app.graphs.models import AgentConfig, AgentType, Plan, PlanStep, Resource, UserConfig
+
+    steps = []
+
+    for i in range(plan_steps):
+        if i % 3 == 2:
+            config = UserConfig(prompt=f"Which calendar should step {i} use?", output_key=f"calendar_{i}")
+
+        else:
+            config = AgentConfig(agent_name=rng.choice(list(AgentType)),
+                                 task_prompt=f"Complete step {i}: gather the details and report back in two sentences.",
+                                 expected_output_key=f"step_{i}_result")
+
+        steps.append(PlanStep(id=f"step_{i}",
+                              title=f"Step {i}",
+                              description=f"Work through part {i} of the weekly plan and note anything blocking.",
+                              dependencies=[f"step_{i - 1}"] if i else [],
+                              config=config,
+                              required_resources=[Resource(name="calendar", description="The user's calendar", required=True)] if i % 2 else []))
+
+    return Plan(steps=steps)
+
+def build_writes(steps: int, plan_steps: int, seed: int) -> List[Dict[str, Any]]:
+    """Channel values written at each super-step."""
+    from datetime import datetime, timezone
+    from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+    from app.graphs.models import StepStatus
+    from app.models.user import UserPreferences
+    # User's relationship to Token only resolves once the token model is mapped
+    from app.models.token import Token  # noqa: F401
+
+    rng = random.Random(seed)
+    plan = build_plan(plan_steps, rng)
+    preferences = UserPreferences(id=1, user_id=1, nickname="Bench", timezone="Europe/Berlin",
+                                  daily_summary_notification=True,
+                                  daily_summary_notification_time=datetime(2025, 1, 1, 8, tzinfo=timezone.utc))
+    messages: List[Any] = []
+    writes = []
+
+    for step in range(steps):
+        kind = step % 3
+
+        if kind == 0:
+            messages.append(HumanMessage(content=f"Turn {step}: move my meetings on Thursday and plan the review.", id=f"m{step}"))
+
+        elif kind == 1:
+            messages.append(AIMessage(content="", id=f"m{step}",
+                                      tool_calls=[{"name": "list_events", "args": {"max_results": 10}, "id": f"call{step}"}],
+                                      usage_metadata={"input_tokens": 1200 + step, "output_tokens": 40, "total_tokens": 1240 + step}))
+
+        else:
+            messages.append(ToolMessage(content=json.dumps([{"summary": f"Event {i}", "start": f"2025-01-0{1 + i % 9}T09:00:00Z"}
+                                                             for i in range(10)]),
+                                        tool_call_id=f"call{step - 1}", id=f"m{step}"))
+
+        values: Dict[str, Any] = {"messages": list(messages)}
+
+        # The plan advances every few steps; channels that did not change are not rewritten
+        if step % 4 == 0:
+            index = (step // 4) % plan_steps
+            plan = plan.model_copy(update={"steps": [s.model_copy(update={"status": StepStatus.COMPLETED}) if i == index else s
+                                                     for i, s in enumerate(plan.steps)]})
+            values["plan"] = plan
+            values["preferences"] = preferences
+
+        writes.append(values)
+
+    return writes
+
+def run_serializer(serde: Any, writes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    sizes, dump_cpu, load_cpu = [], [], []
+    encodings: Dict[str, int] = {}
+    mismatches = 0
+
+    for values in writes:
+        start = time.thread_time()
+        blobs = {channel: serde.dumps_typed(value) for channel, value in values.items()}
+        dump_cpu.append(time.thread_time() - start)
+        sizes.append(sum(len(data) for _, data in blobs.values()))
+
+        for encoding, _ in blobs.values():
+            encodings[encoding] = encodings.get(encoding, 0) + 1
+
+        start = time.thread_time()
+        loaded = {channel: serde.loads_typed(blob) for channel, blob in blobs.items()}
+        load_cpu.append(time.thread_time() - start)
+        mismatches += sum(1 for channel, value in values.items() if loaded[channel] != value)
+
+    return {"checkpoints": len(writes),
+            "total_bytes": sum(sizes),
+            "mean_bytes_per_checkpoint": statistics.fmean(sizes),
+            "last_checkpoint_bytes": sizes[-1],
+            "mean_dump_cpu_ms": statistics.fmean(dump_cpu) * 1000,
+            "mean_load_cpu_ms": statistics.fmean(load_cpu) * 1000,
+            "encodings": encodings,
+            "round_trip_mismatches": mismatches}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=40, help="Super-steps, i.e. checkpoints, in the conversation.")
+    parser.add_argument("--plan-steps", type=int, default=8)
+    parser.add_argument("--compress-min-bytes", type=int, default=4096)
+    parser.add_argument("--compress-level", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="checkpoint_bench.json", help="Where to write the JSON report.")
+    args = parser.parse_args()
+
+    configure_environment()
+
+    from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+    from app.graphs.serde import CompactSerializer, zstd
+
+    writes = build_writes(args.steps, args.plan_steps, args.seed)
+    serializers = {"jsonplus": JsonPlusSerializer(),
+                   "compact": CompactSerializer(compress_min_bytes=2 ** 62)}
+
+    if zstd():
+        serializers["compact+zstd"] = CompactSerializer(compress_min_bytes=args.compress_min_bytes, compress_level=args.compress_level)
+
+    results = {name: run_serializer(serde, writes) for name, serde in serializers.items()}
+    baseline = results["jsonplus"]["total_bytes"]
+
+    for stats in results.values():
+        stats["bytes_vs_jsonplus"] = stats["total_bytes"] / baseline if baseline else 0.0
+
+    print(f"{'serializer':<16}{'bytes/ckpt':>12}{'last bytes':>12}{'dump ms':>10}{'load ms':>10}{'ratio':>8}")
+
+    for name, stats in results.items():
+        print(f"{name:<16}{stats['mean_bytes_per_checkpoint']:>12.0f}{stats['last_checkpoint_bytes']:>12}"
+              f"{stats['mean_dump_cpu_ms']:>10.3f}{stats['mean_load_cpu_ms']:>10.3f}{stats['bytes_vs_jsonplus']:>8.2f}")
+
+    save_results(args.output, "checkpoint", results, vars(args))
+
+if __name__ == "__main__":
+    main()
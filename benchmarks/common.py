@@ -0,0 +1,116 @@
+"""Shared helpers for the benchmark scripts.
+
+Benchmarks import the app, which reads its settings at import time, so call
+`configure_environment()` before importing anything from `app`.
+"""
+from typing import Callable, Dict, List, Optional
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+
+def configure_environment(overrides: Optional[Dict[str, str]] = None) -> None:
+    from cryptography.fernet import Fernet
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="ops-bench-"), "bench.db")
+    defaults = {"CLIENT_ID": "bench-client",
+                "CLIENT_SECRET": "bench-secret",
+                "REDIRECT_URI": "http://127.0.0.1/auth/oauth2/google/token",
+                "SCOPE": "https://www.googleapis.com/auth/tasks https://www.googleapis.com/auth/calendar",
+                "DB_URL": f"sqlite:///{db_path}",
+                "FERNET_ENCRYPTION_KEY": Fernet.generate_key().decode(),
+                "GEMINI_API_KEY": "bench",
+                "TAVILY_API_KEY": "bench",
+                "LANGSMITH_TRACING": "false",
+                "SESSION_MIDDLEWARE_SECRET_KEY": "bench-session-secret",
+                "GOOGLE_AUTH_ENDPOINT": "http://127.0.0.1/auth",
+                "GOOGLE_TOKEN_ENDPOINT": "http://127.0.0.1/token",
+                "GOOGLE_USERINFO_ENDPOINT": "http://127.0.0.1/userinfo",
+                "GOOGLE_TASKS_TASKLIST_ENDPOINT": "http://127.0.0.1/tasks/v1/users/@me/lists",
+                "GOOGLE_TASKS_TASK_ENDPOINT": "http://127.0.0.1/tasks/v1/lists",
+                "GOOGLE_CALENDAR_EVENTS_ENDPOINT": "http://127.0.0.1/calendar/v3/calendars/primary/events"}
+    defaults.update(overrides or {})
+
+    for key, value in defaults.items():
+        os.environ[key] = value
+
+def seed_user(email: str = "bench@example.com") -> int:
+    """Create a user with preferences and a long-lived token; returns the user id."""
+    from datetime import datetime, timedelta, timezone
+    from sqlmodel import Session
+
+    from app.core.database import engine, create_db_and_tables
+    from app.models.user import User, UserPreferences
+    from app.models.token import Token
+
+    create_db_and_tables()
+
+    with Session(engine) as session:
+        user = User(email=email, first_name="Bench", last_name="User")
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+
+        session.add(UserPreferences(user_id=user.id))
+        session.add(Token(user_id=user.id,
+                          access_token="bench-access-token",
+                          refresh_token="bench-refresh-token",
+                          expires_at=datetime.now(tz=timezone.utc) + timedelta(days=1),
+                          refresh_token_expires_at=datetime.now(tz=timezone.utc) + timedelta(days=30),
+                          scope=os.environ["SCOPE"]))
+        session.commit()
+
+        return user.id
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def summarize(samples: List[float], elapsed: Optional[float] = None) -> Dict[str, float]:
+    """Latency summary in milliseconds; `elapsed` is the wall time of the whole run."""
+    elapsed = elapsed if elapsed is not None else sum(samples)
+
+    return {"count": len(samples),
+            "mean_ms": statistics.fmean(samples) * 1000 if samples else 0.0,
+            "p50_ms": percentile(samples, 50) * 1000,
+            "p95_ms": percentile(samples, 95) * 1000,
+            "p99_ms": percentile(samples, 99) * 1000,
+            "throughput_per_s": len(samples) / elapsed if elapsed else 0.0}
+
+def measure(fn: Callable[[], object], iterations: int, warmup: int = 5) -> Dict[str, float]:
+    for _ in range(warmup):
+        fn()
+
+    samples = []
+    start = time.perf_counter()
+
+    for _ in range(iterations):
+        call_start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - call_start)
+
+    return summarize(samples, time.perf_counter() - start)
+
+def print_table(results: Dict[str, Dict[str, float]]) -> None:
+    print(f"{'benchmark':<32}{'count':>8}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ops/s':>10}")
+
+    for name, stats in results.items():
+        print(f"{name:<32}{stats['count']:>8}{stats['mean_ms']:>10.3f}{stats['p50_ms']:>10.3f}"
+              f"{stats['p95_ms']:>10.3f}{stats['p99_ms']:>10.3f}{stats['throughput_per_s']:>10.1f}")
+
+def save_results(path: str, name: str, results: Dict[str, object], parameters: Dict[str, object]) -> None:
+    report = {"benchmark": name,
+              "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+              "python": platform.python_version(),
+              "platform": platform.platform(),
+              "parameters": parameters,
+              "results": results}
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
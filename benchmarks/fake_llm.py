@@ -0,0 +1,120 @@
+"""Deterministic stand-in for `ChatGoogleGenerativeAI` used by the benchmarks."""
+from typing import Any, Callable, Dict, List, Optional, Sequence, Type
+import json
+import threading
+import time
+
+from pydantic import BaseModel, PrivateAttr
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.prompt_values import PromptValue
+from langchain_core.runnables import Runnable, RunnableLambda
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from app.core.prompt_cache import get_context_cache
+from app.graphs.models import AgentConfig, AgentType, Plan, PlanStep, SearchQuery, SearchQueryList
+
+Script = Callable[[List[BaseMessage], Dict[str, Any]], AIMessage]
+
+def scripted_plan() -> Plan:
+    return Plan(steps=[
+        PlanStep(id="1",
+                 title="Collect open tasks",
+                 description="List the open tasks in the default list.",
+                 config=AgentConfig(agent_name=AgentType.OPS,
+                                    task_prompt="List open tasks in @default.",
+                                    expected_output_key="open_tasks")),
+        PlanStep(id="2",
+                 title="Schedule focus time",
+                 description="Book a calendar block for the most urgent task.",
+                 dependencies=["1"],
+                 config=AgentConfig(agent_name=AgentType.OPS,
+                                    task_prompt="Create a one hour event for the most urgent task.",
+                                    expected_output_key="focus_event")),
+    ])
+
+def default_script(messages: List[BaseMessage], kwargs: Dict[str, Any]) -> AIMessage:
+    system_prompt = next((str(m.content) for m in messages if isinstance(m, SystemMessage)), "")
+
+    if "Master Architect" in system_prompt:
+        content = ('<thought title="Plan">Two ops steps cover the goal.</thought>\n'
+                   f"### PLAN ###\n```json\n{scripted_plan().model_dump_json()}\n```")
+        return AIMessage(content=content)
+
+    return AIMessage(content="Scripted response.")
+
+def default_structured(schema: Type[BaseModel], messages: List[BaseMessage]) -> BaseModel:
+    if schema is SearchQueryList:
+        return SearchQueryList(queries=[SearchQuery(query=f"scripted query {i}") for i in range(3)])
+
+    return schema()
+
+class ScriptedChatModel(BaseChatModel):
+    """Chat model that sleeps `latency_s` and answers from a deterministic script."""
+
+    latency_s: float = 0.0
+    script: Script = default_script
+    structured_script: Callable[[Type[BaseModel], List[BaseMessage]], BaseModel] = default_structured
+
+    _calls: int = PrivateAttr(default=0)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    @property
+    def calls(self) -> int:
+        return self._calls
+
+    def _record_call(self) -> None:
+        with self._lock:
+            self._calls += 1
+
+        if self.latency_s:
+            time.sleep(self.latency_s)
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        self._record_call()
+        cached_tokens = 0
+
+        # Rebuild the prompt Gemini would see for a cached_content name from the local cache
+        if kwargs.get("cached_content"):
+            prefix = get_context_cache().contents[kwargs["cached_content"]]
+            messages = [SystemMessage(content=prefix)] + list(messages)
+            cached_tokens = len(prefix) // 4
+
+        message = self.script(messages, kwargs)
+        prompt_tokens = sum(len(str(m.content)) for m in messages) // 4
+        message.usage_metadata = {"input_tokens": prompt_tokens,
+                                  "output_tokens": len(str(message.content)) // 4,
+                                  "total_tokens": prompt_tokens + len(str(message.content)) // 4,
+                                  "input_token_details": {"cache_read": cached_tokens}}
+
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any) -> Runnable:
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def with_structured_output(self, schema: Any, **kwargs: Any) -> Runnable:
+        def respond(value: Any) -> BaseModel:
+            messages = value.to_messages() if isinstance(value, PromptValue) else list(value)
+            self._record_call()
+            return self.structured_script(schema, messages)
+
+        return RunnableLambda(respond)
+
+def tool_call_script(tool_name: str, args: Dict[str, Any]) -> Script:
+    """Script that calls `tool_name` once per turn, then answers with the tool result."""
+
+    def script(messages: List[BaseMessage], kwargs: Dict[str, Any]) -> AIMessage:
+        if kwargs.get("tools") and messages[-1].type != "tool":
+            return AIMessage(content="", tool_calls=[{"name": tool_name, "args": args, "id": f"call-{len(messages)}"}])
+
+        if messages[-1].type == "tool":
+            return AIMessage(content=f"Tool result: {json.dumps(str(messages[-1].content)[:200])}")
+
+        return default_script(messages, kwargs)
+
+    return script
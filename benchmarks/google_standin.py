@@ -0,0 +1,392 @@
+"""Offline stand-in for the Google Tasks and Calendar REST endpoints.
+
+Implements the subset of the API the tools in `app/tools/google/` talk to, on
+top of in-memory data, with configurable latency, error injection and page
+size. Point the `google_*_endpoint` settings at a running instance with
+`standin_env(base_url)`.
+"""
+from typing import Any, Dict, List, Optional
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+import asyncio
+import json
+import random
+import socket
+import threading
+import time
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+import uvicorn
+
+@dataclass
+class StandinConfig:
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    page_size: int = 100
+    seed: int = 0
+
+@dataclass
+class StandinData:
+    tasklists: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    tasks: Dict[str, Dict[str, Dict[str, Any]]] = field(default_factory=dict)
+    calendars: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    events: Dict[str, Dict[str, Dict[str, Any]]] = field(default_factory=dict)
+
+def _now() -> datetime:
+    return datetime.now(tz=timezone.utc)
+
+def _rfc3339(value: datetime) -> str:
+    return value.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+def _new_id(rng: random.Random) -> str:
+    # From the caller's seeded generator, so seeded data and inserts get the same ids on every run
+    return "%022x" % rng.getrandbits(88)
+
+WORDS = ["budget", "review", "groceries", "call", "report", "Q3", "planning", "sync", "deploy", "invoice",
+         "dentist", "gym", "roadmap", "email", "draft", "design", "hiring", "launch", "retro", "travel"]
+
+def seed_data(data: StandinData,
+              tasklists: int = 3,
+              tasks_per_list: int = 50,
+              calendars: int = 1,
+              events_per_calendar: int = 100,
+              seed: int = 0) -> StandinData:
+    rng = random.Random(seed)
+    now = _now()
+
+    for i in range(tasklists):
+        tasklist_id = "@default" if i == 0 else _new_id(rng)
+        data.tasklists[tasklist_id] = {"kind": "tasks#taskList",
+                                       "id": tasklist_id,
+                                       "title": "My Tasks" if i == 0 else f"List {i} {rng.choice(WORDS)}",
+                                       "updated": _rfc3339(now)}
+        data.tasks[tasklist_id] = {}
+
+        for j in range(tasks_per_list):
+            task_id = _new_id(rng)
+            completed = rng.random() < 0.3
+            data.tasks[tasklist_id][task_id] = {"kind": "tasks#task",
+                                                "id": task_id,
+                                                "title": " ".join(rng.sample(WORDS, 3)),
+                                                "notes": " ".join(rng.choices(WORDS, k=12)),
+                                                "status": "completed" if completed else "needsAction",
+                                                "completed": _rfc3339(now) if completed else None,
+                                                "due": _rfc3339(now + timedelta(days=rng.randint(-5, 30))),
+                                                "updated": _rfc3339(now),
+                                                "position": f"{j:020d}"}
+
+    for i in range(calendars):
+        calendar_id = "primary" if i == 0 else f"{_new_id(rng)}@group.calendar.google.com"
+        data.calendars[calendar_id] = {"kind": "calendar#calendarListEntry",
+                                       "id": calendar_id,
+                                       "summary": "Primary" if i == 0 else f"Calendar {i}",
+                                       "primary": i == 0,
+                                       "accessRole": "owner"}
+        data.events[calendar_id] = {}
+
+        for _ in range(events_per_calendar):
+            event_id = _new_id(rng)
+            start = now + timedelta(hours=rng.randint(-48, 24 * 30))
+            data.events[calendar_id][event_id] = {"kind": "calendar#event",
+                                                  "id": event_id,
+                                                  "status": "confirmed",
+                                                  "summary": " ".join(rng.sample(WORDS, 2)),
+                                                  "description": " ".join(rng.choices(WORDS, k=20)),
+                                                  "location": rng.choice(["Office", "Zoom", "Home", None]),
+                                                  "start": {"dateTime": _rfc3339(start)},
+                                                  "end": {"dateTime": _rfc3339(start + timedelta(minutes=rng.choice([15, 30, 60])))},
+                                                  "attendees": []}
+
+    return data
+
+def _paginate(items: List[Dict[str, Any]], request: Request, default_page_size: int) -> Dict[str, Any]:
+    page_size = int(request.query_params.get("maxResults", default_page_size))
+    offset = int(request.query_params.get("pageToken", 0))
+    page = {"items": items[offset:offset + page_size]}
+
+    if offset + page_size < len(items):
+        page["nextPageToken"] = str(offset + page_size)
+
+    return page
+
+async def _body(request: Request) -> Dict[str, Any]:
+    body = await request.json()
+
+    # The tools send `model_dump_json()` through `json=`, which double encodes
+    if isinstance(body, str):
+        body = json.loads(body)
+
+    return {k: v for k, v in body.items() if v is not None}
+
+def _not_found() -> JSONResponse:
+    return JSONResponse({"error": {"code": 404, "message": "Not Found"}}, status_code=404)
+
+def create_standin_app(config: Optional[StandinConfig] = None, data: Optional[StandinData] = None) -> FastAPI:
+    app = FastAPI()
+    app.state.config = config or StandinConfig()
+    app.state.data = data or StandinData()
+    app.state.requests = 0
+    app.state.rng = random.Random(app.state.config.seed)
+    # Its own stream: ids from `rng` would repeat the ones seed_data drew from the same seed
+    app.state.id_rng = random.Random(f"ids-{app.state.config.seed}")
+
+    @app.middleware("http")
+    async def simulate_network(request: Request, call_next):
+        cfg: StandinConfig = app.state.config
+        app.state.requests += 1
+
+        if request.url.path.startswith("/_standin"):
+            return await call_next(request)
+
+        delay = cfg.latency_ms + app.state.rng.uniform(0, cfg.latency_jitter_ms)
+
+        if delay:
+            await asyncio.sleep(delay / 1000)
+
+        if cfg.error_rate and app.state.rng.random() < cfg.error_rate:
+            return JSONResponse({"error": {"code": cfg.error_status, "message": "Injected error"}},
+                                status_code=cfg.error_status)
+
+        return await call_next(request)
+
+    @app.post("/_standin/config")
+    async def update_config(request: Request):
+        for key, value in (await request.json()).items():
+            setattr(app.state.config, key, value)
+        return {"config": app.state.config.__dict__}
+
+    @app.post("/_standin/seed")
+    async def reseed(request: Request):
+        app.state.data = seed_data(StandinData(), **(await request.json()))
+        return {"tasklists": len(app.state.data.tasklists), "calendars": len(app.state.data.calendars)}
+
+    # Tasks: task lists
+    @app.get("/tasks/v1/users/@me/lists")
+    def list_tasklists(request: Request):
+        return {"kind": "tasks#taskLists",
+                **_paginate(list(app.state.data.tasklists.values()), request, app.state.config.page_size)}
+
+    @app.post("/tasks/v1/users/@me/lists")
+    async def insert_tasklist(request: Request):
+        tasklist = {**await _body(request), "kind": "tasks#taskList", "id": _new_id(app.state.id_rng), "updated": _rfc3339(_now())}
+        app.state.data.tasklists[tasklist["id"]] = tasklist
+        app.state.data.tasks[tasklist["id"]] = {}
+        return tasklist
+
+    @app.get("/tasks/v1/users/@me/lists/{tasklist_id}")
+    def get_tasklist(tasklist_id: str):
+        return app.state.data.tasklists.get(tasklist_id) or _not_found()
+
+    @app.api_route("/tasks/v1/users/@me/lists/{tasklist_id}", methods=["PUT", "PATCH"])
+    async def update_tasklist(tasklist_id: str, request: Request):
+        tasklist = app.state.data.tasklists.get(tasklist_id)
+
+        if not tasklist:
+            return _not_found()
+
+        tasklist.update({**await _body(request), "id": tasklist_id, "updated": _rfc3339(_now())})
+        return tasklist
+
+    @app.delete("/tasks/v1/users/@me/lists/{tasklist_id}")
+    def delete_tasklist(tasklist_id: str):
+        if app.state.data.tasklists.pop(tasklist_id, None) is None:
+            return _not_found()
+
+        app.state.data.tasks.pop(tasklist_id, None)
+        return Response(status_code=204)
+
+    # Tasks: tasks
+    @app.get("/tasks/v1/lists/{tasklist_id}/tasks")
+    def list_tasks(tasklist_id: str, request: Request):
+        tasks = app.state.data.tasks.get(tasklist_id)
+
+        if tasks is None:
+            return _not_found()
+
+        items = list(tasks.values())
+        params = request.query_params
+
+        if params.get("showCompleted", "true") == "false":
+            items = [t for t in items if t["status"] != "completed"]
+
+        if params.get("dueMin"):
+            items = [t for t in items if t.get("due") and t["due"] >= params["dueMin"]]
+
+        if params.get("dueMax"):
+            items = [t for t in items if t.get("due") and t["due"] < params["dueMax"]]
+
+        return {"kind": "tasks#tasks", **_paginate(items, request, app.state.config.page_size)}
+
+    @app.post("/tasks/v1/lists/{tasklist_id}/tasks")
+    async def insert_task(tasklist_id: str, request: Request):
+        if tasklist_id not in app.state.data.tasks:
+            return _not_found()
+
+        task = {"status": "needsAction", **await _body(request), "kind": "tasks#task", "id": _new_id(app.state.id_rng), "updated": _rfc3339(_now())}
+        app.state.data.tasks[tasklist_id][task["id"]] = task
+        return task
+
+    @app.post("/tasks/v1/lists/{tasklist_id}/clear")
+    def clear_tasks(tasklist_id: str):
+        tasks = app.state.data.tasks.get(tasklist_id)
+
+        if tasks is None:
+            return _not_found()
+
+        for task_id in [t["id"] for t in tasks.values() if t["status"] == "completed"]:
+            del tasks[task_id]
+
+        return Response(status_code=204)
+
+    @app.get("/tasks/v1/lists/{tasklist_id}/tasks/{task_id}")
+    def get_task(tasklist_id: str, task_id: str):
+        return app.state.data.tasks.get(tasklist_id, {}).get(task_id) or _not_found()
+
+    @app.api_route("/tasks/v1/lists/{tasklist_id}/tasks/{task_id}", methods=["PUT", "PATCH"])
+    async def update_task(tasklist_id: str, task_id: str, request: Request):
+        task = app.state.data.tasks.get(tasklist_id, {}).get(task_id)
+
+        if not task:
+            return _not_found()
+
+        task.update({**await _body(request), "id": task_id, "updated": _rfc3339(_now())})
+
+        if task["status"] == "completed" and not task.get("completed"):
+            task["completed"] = _rfc3339(_now())
+
+        return task
+
+    @app.delete("/tasks/v1/lists/{tasklist_id}/tasks/{task_id}")
+    def delete_task(tasklist_id: str, task_id: str):
+        if app.state.data.tasks.get(tasklist_id, {}).pop(task_id, None) is None:
+            return _not_found()
+
+        return Response(status_code=204)
+
+    @app.post("/tasks/v1/lists/{tasklist_id}/tasks/{task_id}/move")
+    def move_task(tasklist_id: str, task_id: str, request: Request):
+        task = app.state.data.tasks.get(tasklist_id, {}).pop(task_id, None)
+
+        if task is None:
+            return _not_found()
+
+        destination = request.query_params.get("destinationTasklist", tasklist_id)
+        app.state.data.tasks.setdefault(destination, {})[task_id] = task
+        return task
+
+    # Calendar
+    @app.get("/calendar/v3/users/me/calendarList")
+    def list_calendars(request: Request):
+        return {"kind": "calendar#calendarList",
+                **_paginate(list(app.state.data.calendars.values()), request, app.state.config.page_size)}
+
+    @app.get("/calendar/v3/calendars/{calendar_id}/events")
+    def list_events(calendar_id: str, request: Request):
+        events = app.state.data.events.get(calendar_id)
+
+        if events is None:
+            return _not_found()
+
+        items = list(events.values())
+        params = request.query_params
+
+        if params.get("timeMin"):
+            items = [e for e in items if e["end"]["dateTime"] > params["timeMin"]]
+
+        if params.get("timeMax"):
+            items = [e for e in items if e["start"]["dateTime"] < params["timeMax"]]
+
+        if params.get("orderBy") == "startTime":
+            items.sort(key=lambda e: e["start"]["dateTime"])
+
+        return {"kind": "calendar#events", **_paginate(items, request, app.state.config.page_size)}
+
+    @app.post("/calendar/v3/calendars/{calendar_id}/events")
+    async def insert_event(calendar_id: str, request: Request):
+        if calendar_id not in app.state.data.events:
+            return _not_found()
+
+        event = {"attendees": [], **await _body(request), "kind": "calendar#event", "id": _new_id(app.state.id_rng), "status": "confirmed"}
+        app.state.data.events[calendar_id][event["id"]] = event
+        return event
+
+    @app.get("/calendar/v3/calendars/{calendar_id}/events/{event_id}")
+    def get_event(calendar_id: str, event_id: str):
+        return app.state.data.events.get(calendar_id, {}).get(event_id) or _not_found()
+
+    @app.api_route("/calendar/v3/calendars/{calendar_id}/events/{event_id}", methods=["PUT", "PATCH"])
+    async def update_event(calendar_id: str, event_id: str, request: Request):
+        event = app.state.data.events.get(calendar_id, {}).get(event_id)
+
+        if not event:
+            return _not_found()
+
+        event.update({**await _body(request), "id": event_id})
+        return event
+
+    @app.delete("/calendar/v3/calendars/{calendar_id}/events/{event_id}")
+    def delete_event(calendar_id: str, event_id: str):
+        if app.state.data.events.get(calendar_id, {}).pop(event_id, None) is None:
+            return _not_found()
+
+        return Response(status_code=204)
+
+    return app
+
+def standin_env(base_url: str) -> Dict[str, str]:
+    """Settings overrides pointing the Google tools at a stand-in instance."""
+    return {"GOOGLE_TASKS_TASKLIST_ENDPOINT": f"{base_url}/tasks/v1/users/@me/lists",
+            "GOOGLE_TASKS_TASK_ENDPOINT": f"{base_url}/tasks/v1/lists",
+            "GOOGLE_CALENDAR_EVENTS_ENDPOINT": f"{base_url}/calendar/v3/calendars/primary/events",
+            "GOOGLE_CALENDAR_LIST_ENDPOINT": f"{base_url}/calendar/v3/users/me/calendarList",
+            "GOOGLE_CALENDAR_CALENDARS_ENDPOINT": f"{base_url}/calendar/v3/calendars"}
+
+class StandinServer:
+    """Runs a stand-in app with uvicorn on a background thread."""
+
+    def __init__(self, app: FastAPI, host: str = "127.0.0.1", port: int = 0):
+        if not port:
+            with socket.socket() as sock:
+                sock.bind((host, 0))
+                port = sock.getsockname()[1]
+
+        self.app = app
+        self.base_url = f"http://{host}:{port}"
+        self._server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    def __enter__(self) -> "StandinServer":
+        self._thread.start()
+
+        while not self._server.started:
+            time.sleep(0.01)
+
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.should_exit = True
+        self._thread.join()
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the offline Google Tasks/Calendar stand-in.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--tasklists", type=int, default=3)
+    parser.add_argument("--tasks-per-list", type=int, default=50)
+    parser.add_argument("--events", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    data = seed_data(StandinData(), tasklists=args.tasklists, tasks_per_list=args.tasks_per_list,
+                     events_per_calendar=args.events)
+    standin = create_standin_app(StandinConfig(latency_ms=args.latency_ms, error_rate=args.error_rate), data)
+
+    for key, value in standin_env(f"http://127.0.0.1:{args.port}").items():
+        print(f"{key}={value}")
+
+    uvicorn.run(standin, host="127.0.0.1", port=args.port, log_level="warning")
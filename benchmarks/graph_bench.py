@@ -0,0 +1,136 @@
+"""End-to-end benchmark of chat turns (`POST /api/chat` plus polling the job) with a scripted chat model.
+
+Every `ChatGoogleGenerativeAI` in the graphs is replaced with a deterministic
+`ScriptedChatModel` that sleeps a configurable time per call, Google APIs are
+served by the offline stand-in, and the real app runs under uvicorn. Many
+simulated users then send turns concurrently. The report covers turn latency
+percentiles, throughput, graph-framework overhead per turn (turn latency minus
+the scripted LLM time) and memory growth per conversation thread. Latency
+comes from a pass with tracing off; memory is traced in a second pass with
+fresh users, because tracemalloc slows every allocation. With
+`--approve` every proposed plan is approved through `POST /api/chat/resume`
+and the approval latency is reported separately.
+
+    python -m benchmarks.graph_bench --users 20 --turns 5 --llm-latency-ms 50 --output graph.json
+"""
+from typing import Dict, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import base64
+import json
+import time
+import tracemalloc
+
+from benchmarks.common import configure_environment, save_results, seed_user, summarize
+from benchmarks.google_standin import (
+    StandinConfig,
+    StandinData,
+    StandinServer,
+    create_standin_app,
+    seed_data,
+    standin_env,
+)
+
+def session_cookie(secret_key: str, session: Dict[str, object]) -> str:
+    # Same encoding as starlette's SessionMiddleware
+    from itsdangerous import TimestampSigner
+
+    data = base64.b64encode(json.dumps(session).encode("utf-8"))
+    return TimestampSigner(secret_key).sign(data).decode("utf-8")
+
+def run_user(base_url: str, cookie: str, turns: int, approve: bool) -> Tuple[List[float], List[float]]:
+    import requests
+
+    http = requests.Session()
+    http.cookies.set("session", cookie)
+    samples = []
+    approvals = []
+
+    for turn in range(turns):
+        start = time.perf_counter()
+        response = http.post(f"{base_url}/api/chat/", json={"message": f"Plan my week, turn {turn}"})
+        response.raise_for_status()
+        job = response.json()
+
+        while job["status"] in ("queued", "running"):
+            time.sleep(0.01)
+            job = http.get(f"{base_url}/api/chat/jobs/{job['job_id']}").json()
+
+        samples.append(time.perf_counter() - start)
+
+        if approve and (job.get("result") or {}).get("steps"):
+            start = time.perf_counter()
+            http.post(f"{base_url}/api/chat/resume", json={}).raise_for_status()
+            approvals.append(time.perf_counter() - start)
+
+    return samples, approvals
+
+def run_users(base_url: str, cookies: List[str], turns: int, approve: bool) -> Tuple[List[float], List[float], float]:
+    with ThreadPoolExecutor(max_workers=len(cookies)) as pool:
+        start = time.perf_counter()
+        futures = [pool.submit(run_user, base_url, cookie, turns, approve) for cookie in cookies]
+        per_user = [future.result() for future in futures]
+        elapsed = time.perf_counter() - start
+
+    samples = [sample for turns, _ in per_user for sample in turns]
+    approvals = [sample for _, user_approvals in per_user for sample in user_approvals]
+
+    return samples, approvals, elapsed
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0)
+    parser.add_argument("--google-latency-ms", type=float, default=0.0)
+    parser.add_argument("--approve", action="store_true", help="Approve each proposed plan through the resume endpoint.")
+    parser.add_argument("--output", default="graph_bench.json", help="Where to write the JSON report.")
+    args = parser.parse_args()
+
+    standin = create_standin_app(StandinConfig(latency_ms=args.google_latency_ms), seed_data(StandinData()))
+
+    with StandinServer(standin) as google:
+        # Users send turns back to back; keep the per-user rate limit out of the latency numbers
+        configure_environment({**standin_env(google.base_url),
+                               "ADMISSION_USER_RATE_PER_MINUTE": "1000000",
+                               "ADMISSION_USER_BURST": str(args.turns)})
+
+        from app.core.config import get_settings
+        from app.core.llm import override_chat_model
+        from benchmarks.fake_llm import ScriptedChatModel
+        import main as app_main
+
+        fake = ScriptedChatModel(latency_s=args.llm_latency_ms / 1000)
+        override_chat_model(fake)
+        secret_key = get_settings().session_middleware_secret_key
+        cookies = [session_cookie(secret_key, {"user_id": seed_user(f"bench{i}@example.com")}) for i in range(args.users)]
+        memory_cookies = [session_cookie(secret_key, {"user_id": seed_user(f"bench-memory{i}@example.com")}) for i in range(args.users)]
+
+        with StandinServer(app_main.app) as server:
+            samples, approvals, elapsed = run_users(server.base_url, cookies, args.turns, args.approve)
+            llm_calls = fake.calls
+
+            tracemalloc.start()
+            memory_before = tracemalloc.get_traced_memory()[0]
+            run_users(server.base_url, memory_cookies, args.turns, args.approve)
+            memory_after, memory_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+    latency = summarize(samples, elapsed)
+    llm_calls_per_turn = llm_calls / len(samples)
+    scripted_llm_ms = llm_calls_per_turn * args.llm_latency_ms
+    results = {"turn_latency": latency,
+               "llm_calls_per_turn": llm_calls_per_turn,
+               "scripted_llm_ms_per_turn": scripted_llm_ms,
+               "framework_overhead_ms_per_turn": latency["mean_ms"] - scripted_llm_ms,
+               "memory_bytes_per_thread": (memory_after - memory_before) / args.users,
+               "memory_peak_bytes": memory_peak}
+
+    if approvals:
+        results["approval_latency"] = summarize(approvals)
+
+    print(json.dumps(results, indent=2))
+    save_results(args.output, "graph", results, vars(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Import-time profile of the app, to track startup and worker-spawn cost.
+
+Runs `python -X importtime -c "import main"` in a fresh interpreter (what every
+uvicorn worker pays on spawn), then reports total import time, wall time and
+the slowest modules by cumulative and self time. `--first-use` also times
+building the chat model and the supervisor graph, the cost moved out of
+startup and onto the first request.
+
+    python -m benchmarks.import_profile --top 25 --output import_profile.json
+"""
+from typing import Dict, List
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.common import configure_environment, save_results
+
+FIRST_USE_SNIPPET = """
+import time
+import main
+start = time.perf_counter()
+from app.core.llm import get_chat_model
+get_chat_model()
+from app.graphs.supervisor import get_supervisor_graph
+get_supervisor_graph(set(), set())
+print(f"FIRST_USE {time.perf_counter() - start}")
+"""
+
+def parse_importtime(stderr: str) -> List[Dict[str, object]]:
+    modules = []
+
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        modules.append({"module": name.strip(),
+                        "depth": (len(name) - len(name.lstrip())) // 2,
+                        "self_ms": int(self_us) / 1000,
+                        "cumulative_ms": int(cumulative_us) / 1000})
+
+    return modules
+
+def profile(snippet: str) -> Dict[str, object]:
+    start = time.perf_counter()
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", snippet],
+                             capture_output=True, text=True, env=os.environ.copy())
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    if process.returncode:
+        raise RuntimeError(process.stderr)
+
+    modules = parse_importtime(process.stderr)
+    result = {"wall_ms": wall_ms,
+              "import_ms": sum(m["cumulative_ms"] for m in modules if m["depth"] == 0),
+              "modules_imported": len(modules),
+              "modules": modules}
+
+    for line in process.stdout.splitlines():
+        if line.startswith("FIRST_USE "):
+            result["first_use_ms"] = float(line.split()[1]) * 1000
+
+    return result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--first-use", action="store_true", help="Also time lazy initialization after import.")
+    parser.add_argument("--output", help="Write results as JSON to this path.")
+    args = parser.parse_args()
+
+    configure_environment()
+    result = profile(FIRST_USE_SNIPPET if args.first_use else "import main")
+    modules = result.pop("modules")
+    heavy_imports = ("langchain", "langgraph", "langchain_google_genai", "langchain_tavily", "google.genai")
+
+    result["heavy_modules_at_startup"] = sorted({m["module"].split(".")[0] for m in modules
+                                                 if m["module"].startswith(heavy_imports)})
+    result["top_cumulative"] = sorted(modules, key=lambda m: m["cumulative_ms"], reverse=True)[:args.top]
+    result["top_self"] = sorted(modules, key=lambda m: m["self_ms"], reverse=True)[:args.top]
+
+    print(f"wall time: {result['wall_ms']:.1f} ms, import time: {result['import_ms']:.1f} ms, "
+          f"modules: {result['modules_imported']}")
+
+    if "first_use_ms" in result:
+        print(f"first use (model + supervisor graph): {result['first_use_ms']:.1f} ms")
+
+    print(f"heavy packages imported at startup: {', '.join(result['heavy_modules_at_startup']) or 'none'}")
+    print(f"\n{'cumulative ms':>14}{'self ms':>10}  module")
+
+    for m in result["top_cumulative"]:
+        print(f"{m['cumulative_ms']:>14.1f}{m['self_ms']:>10.1f}  {m['module']}")
+
+    if args.output:
+        save_results(args.output, "import_profile", result, vars(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Simulated day of the daily-summary scheduler, driven by a fake clock.
+
+Seeds users spread over several timezones whose send times cluster on a few
+local hours, points the Google endpoints at the offline stand-in and the chat
+model at a `ScriptedChatModel`, then steps a fake clock through a whole day,
+ticking the scheduler at every step. The report compares the generation peak
+per simulated minute with the send-time peak (what generating on the hour
+would cost) and gives delivery lag in simulated time.
+
+    python -m benchmarks.scheduler_bench --users 200 --step-seconds 60 --output scheduler.json
+"""
+from typing import Dict, List
+from concurrent.futures import wait
+from datetime import datetime, time, timedelta, timezone
+from collections import Counter
+import argparse
+import json
+import random
+
+from benchmarks.common import configure_environment, percentile, save_results, seed_user
+from benchmarks.google_standin import StandinConfig, StandinData, StandinServer, create_standin_app, seed_data, standin_env
+
+TIMEZONES = ["UTC", "Europe/London", "Europe/Berlin", "Asia/Jerusalem", "America/New_York", "America/Los_Angeles", "Asia/Tokyo"]
+SEND_HOURS = [7, 8, 9]
+
+class FakeClock:
+    def __init__(self, start: datetime):
+        self.now = start
+
+    def __call__(self) -> datetime:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += timedelta(seconds=seconds)
+
+def seed_preferences(users: int, seed: int) -> None:
+    from sqlmodel import Session, select
+
+    from app.core.database import engine
+    from app.models.user import UserPreferences
+
+    rng = random.Random(seed)
+
+    for i in range(users):
+        user_id = seed_user(f"summary{i}@example.com")
+
+        with Session(engine) as session:
+            preferences = session.exec(select(UserPreferences).where(UserPreferences.user_id == user_id)).one()
+            preferences.timezone = rng.choice(TIMEZONES)
+            preferences.daily_summary_notification = True
+            preferences.daily_summary_notification_time = datetime.combine(datetime.now().date(), time(rng.choice(SEND_HOURS)))
+            session.add(preferences)
+            session.commit()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--step-seconds", type=float, default=60)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0)
+    parser.add_argument("--google-latency-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="scheduler_bench.json", help="Where to write the JSON report.")
+    args = parser.parse_args()
+
+    standin = create_standin_app(StandinConfig(latency_ms=args.google_latency_ms), seed_data(StandinData(), seed=args.seed))
+
+    with StandinServer(standin) as google:
+        configure_environment(standin_env(google.base_url))
+
+        from app.core.llm import override_chat_model
+        from app.services.scheduler import DailySummaryScheduler
+        from benchmarks.fake_llm import ScriptedChatModel
+
+        override_chat_model(ScriptedChatModel(latency_s=args.llm_latency_ms / 1000))
+        seed_preferences(args.users, args.seed)
+
+        clock = FakeClock(datetime.now(tz=timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0))
+        lags: List[float] = []
+        generated_per_minute: Dict[str, int] = Counter()
+        send_times: Dict[str, int] = Counter()
+
+        def deliver(summary) -> None:
+            scheduled_for = summary.scheduled_for.replace(tzinfo=timezone.utc)
+            lags.append((clock() - scheduled_for).total_seconds())
+            send_times[scheduled_for.strftime("%H:%M")] += 1
+
+        scheduler = DailySummaryScheduler(clock=clock, deliver=deliver, workers=args.workers)
+        end = clock() + timedelta(hours=args.hours)
+
+        while clock() < end:
+            futures = scheduler.tick()
+            wait(futures)
+            generated_per_minute[clock().strftime("%H:%M")] += sum(1 for f in futures if f.result() is not None)
+            clock.advance(args.step_seconds)
+
+        scheduler.stop()
+
+    results = {"generated": sum(generated_per_minute.values()),
+               "delivered": len(lags),
+               "generation_peak_per_minute": max(generated_per_minute.values(), default=0),
+               "send_time_peak_per_minute": max(send_times.values(), default=0),
+               "delivery_lag_p50_s": percentile(lags, 50),
+               "delivery_lag_p95_s": percentile(lags, 95),
+               "delivery_lag_max_s": max(lags, default=0.0)}
+
+    print(json.dumps(results, indent=2))
+    save_results(args.output, "scheduler", results, vars(args))
+
+if __name__ == "__main__":
+    main()
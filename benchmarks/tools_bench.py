@@ -0,0 +1,97 @@
+"""Microbenchmarks for the Google tool layer against the offline stand-in.
+
+Separates the cost of a tool call into raw HTTP round trip, response parsing
+and the full LangChain tool invocation, so client-layer changes can be
+measured without live Google accounts.
+
+    python -m benchmarks.tools_bench --tasks-per-list 500 --latency-ms 20 --output tools.json
+"""
+import argparse
+
+from benchmarks.common import configure_environment, measure, print_table, save_results, seed_user
+from benchmarks.google_standin import (
+    StandinConfig,
+    StandinData,
+    StandinServer,
+    create_standin_app,
+    seed_data,
+    standin_env,
+)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--tasklists", type=int, default=3)
+    parser.add_argument("--tasks-per-list", type=int, default=100)
+    parser.add_argument("--events", type=int, default=250)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--output", help="Write results as JSON to this path.")
+    args = parser.parse_args()
+
+    data = seed_data(StandinData(), tasklists=args.tasklists, tasks_per_list=args.tasks_per_list,
+                     events_per_calendar=args.events)
+    standin = create_standin_app(StandinConfig(latency_ms=args.latency_ms, page_size=args.page_size), data)
+
+    with StandinServer(standin) as server:
+        configure_environment(standin_env(server.base_url))
+
+        import requests
+        from sqlmodel import Session
+
+        from app.core.config import get_settings
+        from app.core.database import engine
+        from app.models.tasks import Task
+        from app.models.calendar import CalendarEvent
+        from app.tools.google.tasks import list_tasks, get_task, list_tasklists, insert_task
+        from app.tools.google.calendar import list_events
+
+        settings = get_settings()
+        user_id = seed_user()
+        tasklist_id = "@default"
+        task_id = next(iter(data.tasks[tasklist_id]))
+        task_items = list(data.tasks[tasklist_id].values())
+        event_items = list(data.events["primary"].values())
+        http = requests.Session()
+
+        with Session(engine) as session:
+            config = {"configurable": {"session": session}}
+            results = {
+                "http.get_task_raw": measure(
+                    lambda: http.get(f"{settings.google_tasks_task_endpoint}/{tasklist_id}/tasks/{task_id}").content,
+                    args.iterations),
+                "http.list_tasks_raw": measure(
+                    lambda: http.get(f"{settings.google_tasks_task_endpoint}/{tasklist_id}/tasks").content,
+                    args.iterations),
+                "parse.task_page": measure(
+                    lambda: [Task.model_validate(t) for t in task_items[:args.page_size]],
+                    args.iterations),
+                "parse.event_page": measure(
+                    lambda: [CalendarEvent.model_validate(e) for e in event_items[:args.page_size]],
+                    args.iterations),
+                "tool.get_task": measure(
+                    lambda: get_task.invoke({"task_id": task_id, "tasklist_id": tasklist_id, "user_id": user_id}, config=config),
+                    args.iterations),
+                "tool.list_tasks": measure(
+                    lambda: list_tasks.invoke({"tasklist_id": tasklist_id, "user_id": user_id}, config=config),
+                    args.iterations),
+                "tool.list_tasklists": measure(
+                    lambda: list_tasklists.invoke({"user_id": user_id}, config=config),
+                    args.iterations),
+                "tool.list_events": measure(
+                    lambda: list_events.invoke({"user_id": user_id}, config=config),
+                    args.iterations),
+                "tool.insert_task": measure(
+                    lambda: insert_task.invoke({"task": {"title": "bench", "status": "needsAction", "id": None},
+                                                "tasklist_id": tasklist_id,
+                                                "user_id": user_id}, config=config),
+                    args.iterations),
+            }
+
+    print_table(results)
+
+    if args.output:
+        save_results(args.output, "tools", results, vars(args))
+
+if __name__ == "__main__":
+    main()
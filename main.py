@@ -2,33 +2,46 @@ import os
 from datetime import datetime, timezone
 
 from fastapi import FastAPI, Request
-from fastapi.templating import Jinja2Templates
 from starlette.middleware.sessions import SessionMiddleware
+from starlette.middleware.gzip import GZipMiddleware
 from dotenv import load_dotenv
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, PlainTextResponse
 
-from app.core.database import create_db_and_tables, SessionDep
-from app.api import auth, chat
+from app.core.database import create_db_and_tables, AsyncSessionDep
+from app.api import auth, chat, summaries
 import app.services.tokens as tokens_service
+import app.services.jobs as jobs_service
+from app.core.metrics import render_metrics
+from app.core.assets import page_response, static_response
+from app.services.scheduler import start_scheduler, stop_scheduler
+from app.core.events import stop_event_log
 
 
 load_dotenv()
 
 app = FastAPI()
-templates = Jinja2Templates(directory="app/templates")
 
 app.add_middleware(
     SessionMiddleware,
     secret_key=os.getenv("SESSION_MIDDLEWARE_SECRET_KEY"),
 )
+app.add_middleware(GZipMiddleware, minimum_size=1024)
     
 
 @app.on_event("startup")
 def on_startup():
     create_db_and_tables()
+    jobs_service.recover_jobs()
+    start_scheduler()
+
+@app.on_event("shutdown")
+def on_shutdown():
+    stop_scheduler()
+    stop_event_log()
     
 app.include_router(auth.router)
 app.include_router(chat.router)
+app.include_router(summaries.router)
 
 @app.get("/")
 def login_page(request: Request):
@@ -37,34 +50,43 @@ def login_page(request: Request):
     if user_id:
         return RedirectResponse(url="/chat", status_code=302)
     
-    return templates.TemplateResponse("login.html", {"request": request})
+    return page_response(request, "login.html")
 
 @app.get("/chat")
-def chat_page(request: Request, session: SessionDep):
+async def chat_page(request: Request, session: AsyncSessionDep):
     user_id = request.session.get("user_id")
     
     if not user_id:
         return RedirectResponse(url="/", status_code=302)
     
-    token = tokens_service.get_token_by_user_id(user_id, session)
-    
-    if not token:
-        request.session.clear()
-        return RedirectResponse(url="/", status_code=302)
+    if "refresh_token_expires_at" not in request.session:
+        token = await tokens_service.get_token_by_user_id_async(user_id, session)
+        
+        if not token:
+            request.session.clear()
+            return RedirectResponse(url="/", status_code=302)
+        
+        auth.store_token_expiry(request, token)
     
-    refresh_token_expires_at = token.refresh_token_expires_at.replace(tzinfo=timezone.utc)
+    now = datetime.now(tz=timezone.utc).timestamp()
     
-    if refresh_token_expires_at < datetime.now(tz=timezone.utc):
+    if request.session["refresh_token_expires_at"] < now:
         request.session.clear()
         return RedirectResponse(url="/", status_code=302)
     
-    access_token_expires_at = token.expires_at.replace(tzinfo=timezone.utc)
-    
-    if access_token_expires_at < datetime.now(tz=timezone.utc):
+    if request.session["access_token_expires_at"] < now:
         return RedirectResponse(url="/auth/oauth2/google/refresh")
     
-    return templates.TemplateResponse("chat.html", {"request": request})
+    return page_response(request, "chat.html")
+
+@app.get("/static/{path:path}")
+def static_asset(path: str, request: Request):
+    return static_response(request, path)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
 
 @app.get("/editor")
 def editor_page(request: Request):
-    return templates.TemplateResponse("editor.html", {"request": request})
\ No newline at end of file
+    return page_response(request, "editor.html")
\ No newline at end of file
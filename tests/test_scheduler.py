@@ -0,0 +1,158 @@
+"""End to end ticks of the daily-summary scheduler, driven by a fake clock.
+
+Google is the offline stand-in from the benchmarks and the chat model is a
+`ScriptedChatModel`, so a tick runs the real claim, fetch, generate and
+deliver path against a throwaway SQLite database.
+"""
+from concurrent.futures import wait
+from datetime import datetime, time, timedelta, timezone
+import tempfile
+
+import pytest
+
+from benchmarks.common import configure_environment, seed_user
+from benchmarks.google_standin import StandinConfig, StandinData, StandinServer, create_standin_app, seed_data, standin_env
+from benchmarks.scheduler_bench import FakeClock
+
+@pytest.fixture(scope="module")
+def standin():
+    app = create_standin_app(StandinConfig(), seed_data(StandinData(), tasklists=2, tasks_per_list=5, events_per_calendar=5))
+
+    with StandinServer(app) as google:
+        data_dir = tempfile.mkdtemp(prefix="ops-test-")
+        configure_environment({**standin_env(google.base_url),
+                               "SEARCH_INDEX_DIR": f"{data_dir}/search_index",
+                               "MEMORY_DIR": f"{data_dir}/memory"})
+
+        from app.core.llm import override_chat_model
+        from benchmarks.fake_llm import ScriptedChatModel
+
+        override_chat_model(ScriptedChatModel())
+        yield app
+
+def opt_in(email: str, send_at: time) -> int:
+    from sqlmodel import Session, select
+
+    from app.core.database import engine
+    from app.models.user import UserPreferences
+
+    user_id = seed_user(email)
+
+    with Session(engine) as session:
+        preferences = session.exec(select(UserPreferences).where(UserPreferences.user_id == user_id)).one()
+        preferences.daily_summary_notification = True
+        preferences.daily_summary_notification_time = datetime.combine(datetime.now().date(), send_at)
+        session.add(preferences)
+        session.commit()
+
+    return user_id
+
+def run_until(scheduler, clock: FakeClock, end: datetime, step_seconds: float = 60) -> None:
+    while clock() < end:
+        wait(scheduler.tick())
+        clock.advance(step_seconds)
+
+def summary_row(user_id: int):
+    from sqlmodel import Session, select
+
+    from app.core.database import engine
+    from app.models.summary import DailySummary
+
+    with Session(engine) as session:
+        return session.exec(select(DailySummary).where(DailySummary.user_id == user_id)).first()
+
+def test_tick_generates_and_delivers_on_time(standin):
+    from app.services.scheduler import DailySummaryScheduler
+
+    user_id = opt_in("on-time@example.com", time(8))
+    midnight = datetime.now(tz=timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    clock = FakeClock(midnight + timedelta(hours=6))
+    delivered = []
+    scheduler = DailySummaryScheduler(clock=clock, deliver=lambda summary: delivered.append((summary.user_id, clock())), workers=2)
+
+    try:
+        run_until(scheduler, clock, midnight + timedelta(hours=8, minutes=5))
+
+    finally:
+        scheduler.stop()
+
+    summary = summary_row(user_id)
+
+    assert summary.content == "Scripted response."
+    assert summary.generated_at.replace(tzinfo=timezone.utc) < midnight + timedelta(hours=8)
+    assert [user for user, _ in delivered].count(user_id) == 1
+    assert next(at for user, at in delivered if user == user_id) == midnight + timedelta(hours=8)
+
+def test_google_outage_is_retried_not_summarized(standin):
+    from app.services.scheduler import DailySummaryScheduler
+    from app.services.calendars import calendar_events_cache, calendar_list_cache
+
+    user_id = opt_in("outage@example.com", time(10))
+    midnight = datetime.now(tz=timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    clock = FakeClock(midnight + timedelta(hours=8, minutes=59))
+    scheduler = DailySummaryScheduler(clock=clock, deliver=lambda summary: None, workers=2)
+    calendar_list_cache.clear()
+    calendar_events_cache.clear()
+
+    try:
+        standin.state.config.error_rate = 1.0
+        run_until(scheduler, clock, midnight + timedelta(hours=9, minutes=45))
+
+        assert summary_row(user_id) is None
+
+        standin.state.config.error_rate = 0.0
+        run_until(scheduler, clock, midnight + timedelta(hours=11))
+
+    finally:
+        standin.state.config.error_rate = 0.0
+        scheduler.stop()
+
+    summary = summary_row(user_id)
+
+    assert summary.content == "Scripted response."
+    assert summary.delivered_at is not None
+
+def test_calendar_outage_is_not_summarized_as_empty_day(standin, monkeypatch):
+    import app.services.calendars as calendars_service
+    from app.services.scheduler import DailySummaryScheduler
+
+    user_id = opt_in("calendar-outage@example.com", time(12))
+    midnight = datetime.now(tz=timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    clock = FakeClock(midnight + timedelta(hours=10, minutes=59))
+    scheduler = DailySummaryScheduler(clock=clock, deliver=lambda summary: None, workers=2)
+
+    # Tasks still load; only the calendars fail
+    monkeypatch.setattr(calendars_service, "_first_page", lambda user_id, calendar_id, params: None)
+
+    try:
+        run_until(scheduler, clock, midnight + timedelta(hours=12, minutes=5))
+
+    finally:
+        scheduler.stop()
+
+    assert summary_row(user_id) is None
+
+def test_concurrent_workers_deliver_once(standin):
+    from app.services.scheduler import DailySummaryScheduler
+
+    user_id = opt_in("deliver-once@example.com", time(14))
+    midnight = datetime.now(tz=timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    clock = FakeClock(midnight + timedelta(hours=12, minutes=59))
+    delivered = []
+    other = DailySummaryScheduler(clock=clock, deliver=lambda summary: delivered.append(("other", summary.user_id)), workers=1)
+
+    def deliver(summary) -> None:
+        # A second worker ticks while this one is still delivering
+        other.deliver_due(clock())
+        delivered.append(("first", summary.user_id))
+
+    scheduler = DailySummaryScheduler(clock=clock, deliver=deliver, workers=2)
+
+    try:
+        run_until(scheduler, clock, midnight + timedelta(hours=14, minutes=5))
+
+    finally:
+        scheduler.stop()
+        other.stop()
+
+    assert [worker for worker, user in delivered if user == user_id] == ["first"]